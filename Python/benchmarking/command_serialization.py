@@ -0,0 +1,103 @@
+from time import perf_counter
+import numpy as np
+from tdw.tdw_utils import TDWUtils
+from tdw.command_serialization.command_serializer import CommandSerializer
+from tdw.command_serialization.orjson_command_serializer import OrjsonCommandSerializer
+from tdw.command_serialization.static_command import StaticCommand
+
+
+"""
+Benchmark the speed of serializing commands in Python. This doesn't require a build.
+
+Each frame teleports and rotates increasing quantities of objects, plus the same static commands every frame.
+
+This will output the serialization time per frame for:
+
+1. `json.dumps(commands).encode("utf-8")` (the previous behavior of `Controller.communicate(commands)`)
+2. `CommandSerializer` (the default serializer)
+3. `CommandSerializer` plus `StaticCommand`s
+4. `OrjsonCommandSerializer` plus `StaticCommand`s, if orjson is installed
+
+Then, this will output the time to convert the numpy positions and rotations to Vector3s and Vector4s with:
+
+1. `TDWUtils.array_to_vector3()` and `TDWUtils.array_to_vector4()`
+2. `CommandSerializer.array_to_vector3()` and `CommandSerializer.array_to_vector4()`
+3. `CommandSerializer.arrays_to_vector3s()` and `CommandSerializer.arrays_to_vector4s()`
+"""
+
+
+def get_commands(quantity: int, static: bool) -> list:
+    commands = list()
+    for command in [{"$type": "step_physics", "frames": 1},
+                    {"$type": "send_transforms", "frequency": "once"},
+                    {"$type": "send_rigidbodies", "frequency": "once"},
+                    {"$type": "send_collisions", "enter": True, "stay": False, "exit": False, "collision_types": ["obj"]}]:
+        commands.append(StaticCommand(command) if static else command)
+    positions = np.random.uniform(-1, 1, size=(quantity, 3))
+    rotations = np.random.uniform(-1, 1, size=(quantity, 4))
+    for i in range(quantity):
+        commands.extend([{"$type": "teleport_object",
+                          "position": TDWUtils.array_to_vector3(positions[i]),
+                          "id": i},
+                         {"$type": "rotate_object_to",
+                          "rotation": TDWUtils.array_to_vector4(rotations[i]),
+                          "id": i}])
+    return commands
+
+
+def convert_per_vector_tdw_utils(positions: np.ndarray, rotations: np.ndarray) -> list:
+    return [TDWUtils.array_to_vector3(p) for p in positions] + [TDWUtils.array_to_vector4(r) for r in rotations]
+
+
+def convert_per_vector(positions: np.ndarray, rotations: np.ndarray) -> list:
+    return [CommandSerializer.array_to_vector3(p) for p in positions] + \
+           [CommandSerializer.array_to_vector4(r) for r in rotations]
+
+
+def convert_all(positions: np.ndarray, rotations: np.ndarray) -> list:
+    return CommandSerializer.arrays_to_vector3s(positions) + CommandSerializer.arrays_to_vector4s(rotations)
+
+
+def get_time(serialize, commands: list, num_trials: int) -> float:
+    t0 = perf_counter()
+    for trial in range(num_trials):
+        serialize(commands)
+    return (perf_counter() - t0) / num_trials * 1000
+
+
+if __name__ == "__main__":
+    import json
+    default_serializer = CommandSerializer()
+    serializers = [("json.dumps()", lambda c: json.dumps(c).encode("utf-8"), False),
+                   ("CommandSerializer", default_serializer.serialize, False),
+                   ("CommandSerializer + StaticCommand", default_serializer.serialize, True)]
+    try:
+        orjson_serializer = OrjsonCommandSerializer()
+        serializers.append(("OrjsonCommandSerializer + StaticCommand", orjson_serializer.serialize, True))
+    except Exception as e:
+        print(e)
+    output = "| Objects | " + " | ".join([s[0] for s in serializers]) + " |\n| --- |" + " --- |" * len(serializers) + "\n"
+    for quantity in [1, 10, 100, 1000]:
+        row = [str(quantity)]
+        for name, serialize, static in serializers:
+            cmds = get_commands(quantity=quantity, static=static)
+            t = get_time(serialize=serialize, commands=cmds, num_trials=max(10, 10000 // quantity))
+            row.append(f"{round(t, 3)} ms ({len(serialize(cmds))} bytes)")
+        output += "| " + " | ".join(row) + " |\n"
+    print(output)
+    converters = [("TDWUtils", convert_per_vector_tdw_utils),
+                  ("CommandSerializer.array_to_vector3()", convert_per_vector),
+                  ("CommandSerializer.arrays_to_vector3s()", convert_all)]
+    output = "| Objects | " + " | ".join([c[0] for c in converters]) + " |\n| --- |" + " --- |" * len(converters) + "\n"
+    for quantity in [1, 10, 100, 1000]:
+        row = [str(quantity)]
+        ps = np.random.uniform(-1, 1, size=(quantity, 3))
+        rs = np.random.uniform(-1, 1, size=(quantity, 4))
+        for name, convert in converters:
+            num_trials = max(10, 10000 // quantity)
+            t0 = perf_counter()
+            for trial in range(num_trials):
+                convert(ps, rs)
+            row.append(f"{round((perf_counter() - t0) / num_trials * 1000, 4)} ms")
+        output += "| " + " | ".join(row) + " |\n"
+    print(output)
@@ -0,0 +1,107 @@
+from time import perf_counter, sleep
+from pathlib import Path
+from typing import Optional
+from tempfile import TemporaryDirectory
+import numpy as np
+from tdw.flatbuffers.builder import Builder
+from tdw.FBOutput import Images as Imags, ImagePass, PassMask
+from tdw.output_data import Images
+from tdw.add_ons.image_capture import ImageCapture
+from tdw.image_sinks.image_sink import ImageSink
+from tdw.image_sinks.async_image_sink import AsyncImageSink
+from tdw.image_sinks.sharded_image_sink import ShardedImageSink
+from tdw.image_sinks.sharded_image_reader import ShardedImageReader
+
+
+"""
+Benchmark the time that `ImageCapture.on_send(resp)` blocks the controller. This doesn't require a build.
+
+Each frame has an `_img` pass and an `_id` pass of random bytes. To simulate a slow network filesystem, each `Images` takes an extra 20 ms to save.
+
+This will output the time per frame of `on_send(resp)`, and the total time including `close()`, for:
+
+1. `ImageSink` (the default behavior)
+2. `AsyncImageSink` with 1 and 4 writer threads
+
+Then, this will output the time to write and read the same frames (without the extra 20 ms) as separate files with `ImageSink` and as tar shards with `ShardedImageSink`.
+"""
+
+
+class SlowImageSink(ImageSink):
+    def write(self, images: Images, path: Path, avatar_id: str, frame: int, metadata: Optional[dict] = None) -> None:
+        sleep(0.02)
+        super().write(images=images, path=path, avatar_id=avatar_id, frame=frame, metadata=metadata)
+
+
+def get_images(avatar_id: str, size: int, rng: np.random.RandomState) -> bytes:
+    b = Builder(0)
+    passes = list()
+    for pass_mask, extension in zip([PassMask.PassMask._img, PassMask.PassMask._id], [0, 1]):
+        image = b.CreateByteVector(rng.bytes(size))
+        ImagePass.ImagePassStart(b)
+        ImagePass.ImagePassAddPassMask(b, pass_mask)
+        ImagePass.ImagePassAddImage(b, image)
+        ImagePass.ImagePassAddExtension(b, extension)
+        passes.append(ImagePass.ImagePassEnd(b))
+    Imags.ImagesStartPassesVector(b, len(passes))
+    for p in reversed(passes):
+        b.PrependUOffsetTRelative(p)
+    passes_vector = b.EndVector(len(passes))
+    avatar_id_string = b.CreateString(avatar_id)
+    Imags.ImagesStart(b)
+    Imags.ImagesAddAvatarId(b, avatar_id_string)
+    Imags.ImagesAddWidth(b, 256)
+    Imags.ImagesAddHeight(b, 256)
+    Imags.ImagesAddPasses(b, passes_vector)
+    root = Imags.ImagesEnd(b)
+    # Add the output data ID.
+    b.Prep(b.minalign, 8)
+    for c in reversed(b"imag"):
+        b.PrependByte(c)
+    b.PrependUOffsetTRelative(root)
+    b.finished = True
+    return bytes(b.Output())
+
+
+if __name__ == "__main__":
+    num_frames = 200
+    random = np.random.RandomState(0)
+    frames = [[get_images(avatar_id="a", size=50000, rng=random), i.to_bytes(4, "little")] for i in range(num_frames)]
+    output = "| Sink | `on_send()` (ms per frame) | Total (s) |\n| --- | --- | --- |\n"
+    for name, get_sink in zip(["`ImageSink`", "`AsyncImageSink` (1 thread)", "`AsyncImageSink` (4 threads)"],
+                              [lambda: SlowImageSink(),
+                               lambda: AsyncImageSink(sink=SlowImageSink(), max_queue_size=num_frames, num_threads=1),
+                               lambda: AsyncImageSink(sink=SlowImageSink(), max_queue_size=num_frames, num_threads=4)]):
+        with TemporaryDirectory() as temp_directory:
+            capture = ImageCapture(path=temp_directory, sink=get_sink())
+            capture.initialized = True
+            t0 = perf_counter()
+            for resp in frames:
+                capture.on_send(resp)
+            on_send_time = (perf_counter() - t0) / num_frames * 1000
+            capture.sink.close()
+            total_time = perf_counter() - t0
+        output += f"| {name} | {round(on_send_time, 3)} | {round(total_time, 2)} |\n"
+    print(output)
+    output = "| Sink | Write (s) | Read (s) | Files |\n| --- | --- | --- | --- |\n"
+    for name, sink in zip(["`ImageSink`", "`ShardedImageSink`"], [ImageSink(), ShardedImageSink()]):
+        with TemporaryDirectory() as temp_directory:
+            path = Path(temp_directory)
+            capture = ImageCapture(path=path, sink=sink)
+            capture.initialized = True
+            t0 = perf_counter()
+            for resp in frames:
+                capture.on_send(resp)
+            sink.close()
+            write_time = perf_counter() - t0
+            t0 = perf_counter()
+            if isinstance(sink, ShardedImageSink):
+                for sample in ShardedImageReader(path=path):
+                    pass
+            else:
+                for f in sorted(path.joinpath("a").iterdir()):
+                    f.read_bytes()
+            read_time = perf_counter() - t0
+            num_files = len([f for f in path.rglob("*") if f.is_file()])
+        output += f"| {name} | {round(write_time, 3)} | {round(read_time, 3)} | {num_files} |\n"
+    print(output)
@@ -0,0 +1,89 @@
+import sys
+import re
+from subprocess import run
+from argparse import ArgumentParser
+from typing import List, Tuple
+
+
+"""
+Benchmark how long it takes to import the main entry points of the `tdw` module. This doesn't require a build.
+
+Each module is imported in a new Python process with `python -X importtime`, so that no module is already cached.
+
+This will output a table of the total (cumulative) import time of each module, the median of several trials, and the slowest modules that each module imports.
+"""
+
+
+MODULES: List[str] = ["tdw.controller",
+                      "tdw.async_controller",
+                      "tdw.tdw_utils",
+                      "tdw.output_data",
+                      "tdw.librarian",
+                      "tdw.frame_index",
+                      "tdw.add_ons.object_manager",
+                      "tdw.add_ons.third_person_camera",
+                      "tdw.add_ons.image_capture"]
+# Example: `import time:       707 |      24753 |   zmq`
+IMPORT_TIME_REGEX = re.compile(r"^import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(.*)$")
+
+
+def get_import_times(module: str) -> List[Tuple[str, int, int]]:
+    """
+    :param module: The name of the module.
+
+    :return: A list of (module, self time, cumulative time) tuples in microseconds, one per module imported by `import module`. This excludes modules that were imported at startup, for example by `site`.
+    """
+
+    stderr = run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                 capture_output=True, text=True, check=True).stderr
+    times: List[Tuple[str, int, int]] = list()
+    for line in stderr.split("\n"):
+        match = IMPORT_TIME_REGEX.search(line)
+        if match is None:
+            continue
+        name = match.group(4).strip()
+        times.append((name, int(match.group(1)), int(match.group(2))))
+        # This is a top-level import. Child modules are listed before their parent.
+        if len(match.group(3)) == 1:
+            if name == module:
+                return times
+            times.clear()
+    return times
+
+
+def get_total(module: str, times: List[Tuple[str, int, int]]) -> int:
+    """
+    :param module: The name of the module.
+    :param times: The import times.
+
+    :return: The cumulative import time of the module in microseconds.
+    """
+
+    for name, self_time, cumulative_time in times:
+        if name == module:
+            return cumulative_time
+    return 0
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--modules", nargs="+", default=MODULES, help="The modules to import.")
+    parser.add_argument("--trials", type=int, default=5, help="The number of times each module is imported.")
+    parser.add_argument("--top", type=int, default=5, help="The number of slowest imported modules to list.")
+    args = parser.parse_args()
+    output = "| Module | Import time (ms) | Slowest imports (cumulative ms) |\n| --- | --- | --- |\n"
+    for m in args.modules:
+        totals: List[int] = list()
+        trial_times: List[Tuple[str, int, int]] = list()
+        for i in range(args.trials):
+            trial_times = get_import_times(module=m)
+            totals.append(get_total(module=m, times=trial_times))
+        totals.sort()
+        total = totals[len(totals) // 2] / 1000
+        # List the slowest top-level packages and tdw modules, excluding the module itself.
+        slowest = sorted([t for t in trial_times if t[0] != m and ("." not in t[0] or t[0].startswith("tdw."))],
+                         key=lambda t: t[2], reverse=True)[:args.top]
+        output += f"| `{m}` | {round(total, 1)} | " + \
+                  ", ".join([f"`{name}` ({round(cumulative_time / 1000, 1)})" for name, self_time, cumulative_time in slowest]) + \
+                  " |\n"
+    print(output)
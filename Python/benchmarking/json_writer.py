@@ -0,0 +1,67 @@
+from time import perf_counter
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import numpy as np
+from tdw.add_ons.json_writer import JsonWriter
+
+
+"""
+Benchmark the speed of `JsonWriter`. This doesn't require a build.
+
+Each frame, `JsonWriter` serializes an object that is similar to an `ObjectManager`: Static data for 200 objects that doesn't change, and the positions and rotations of 10 moving objects.
+
+This will output the time per frame of writing the frames and of reading every frame, the time to read one random frame, and the total size on disk, for:
+
+1. One JSON file per object per frame (the default behavior)
+2. A JSONL file (`streaming=True`)
+3. A gzipped JSONL file (`streaming=True, compress=True`)
+4. A gzipped JSONL file of deltas (`streaming=True, compress=True, delta=True`)
+"""
+
+
+class ObjectData:
+    def __init__(self, rng: np.random.RandomState):
+        self.static = {i: {"name": f"model_{i}",
+                           "category": "category",
+                           "mass": float(rng.uniform(1, 10)),
+                           "size": rng.uniform(0, 1, 3).tolist(),
+                           "segmentation_color": rng.randint(0, 255, 3).tolist()} for i in range(200)}
+        self.positions = {i: np.zeros(3) for i in range(200)}
+        self.rotations = {i: np.zeros(4) for i in range(200)}
+
+
+def get_size(directory: Path) -> int:
+    return sum([p.stat().st_size for p in directory.iterdir()])
+
+
+if __name__ == "__main__":
+    num_frames = 500
+    output = "| Writer | Write (ms per frame) | Read (ms per frame) | Random read (ms) | Size (MB) |\n| --- | --- | --- | --- | --- |\n"
+    for name, kwargs in zip(["Files", "JSONL", "JSONL (gzip)", "JSONL (gzip, delta)"],
+                            [dict(), {"streaming": True}, {"streaming": True, "compress": True},
+                             {"streaming": True, "compress": True, "delta": True}]):
+        random = np.random.RandomState(0)
+        data = ObjectData(rng=random)
+        with TemporaryDirectory() as temp_directory:
+            writer = JsonWriter(objects={"object_manager": data}, output_directory=temp_directory, **kwargs)
+            t0 = perf_counter()
+            for i in range(num_frames):
+                for j in range(10):
+                    data.positions[j] = random.uniform(-1, 1, 3)
+                    data.rotations[j] = random.uniform(-1, 1, 4)
+                writer.on_send([])
+            writer.close()
+            write_time = (perf_counter() - t0) / num_frames * 1000
+            t0 = perf_counter()
+            for i in range(num_frames):
+                writer.read(i)
+            read_time = (perf_counter() - t0) / num_frames * 1000
+            # Read a frame just before a keyframe.
+            writer.close()
+            t0 = perf_counter()
+            writer.read(num_frames - 2)
+            random_read_time = (perf_counter() - t0) * 1000
+            size = get_size(writer.output_directory) / 1048576
+        output += f"| {name} | {round(write_time, 3)} | {round(read_time, 3)} | {round(random_read_time, 3)} | " \
+                  f"{round(size, 2)} |\n"
+    print(output)
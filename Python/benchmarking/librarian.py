@@ -0,0 +1,167 @@
+from time import perf_counter
+from platform import system
+from multiprocessing import get_context
+from typing import List, Optional, Tuple
+import random
+import numpy as np
+from tdw.controller import Controller
+from tdw.tdw_utils import TDWUtils
+from tdw.librarian import ModelLibrarian, ModelRecord, MaterialLibrarian
+
+
+"""
+Benchmark the speed of librarian lookups and of building a scene's commands in Python. This doesn't require a build.
+
+This will output the time of:
+
+1. `get_record(name)` and `search_records(search)` with a linear search of `records` (the previous behavior) and with the librarian's indices.
+2. Creating `add_object` and `add_physics_object` commands for many objects, as a proc-gen scene would.
+3. Creating a librarian without and with a cached library file.
+4. Selecting every model whose footprint fits within a rectangle by iterating through the records and with the librarian's query index.
+5. Creating the commands to add many physics objects with `Controller.get_add_physics_object()` per object and with `Controller.get_add_physics_objects()`.
+6. (Linux only) The total private memory of worker processes that each create a librarian and get every record, with a normal librarian and with a read-only librarian.
+"""
+
+
+def get_record_linear(librarian: ModelLibrarian, name: str) -> Optional[ModelRecord]:
+    records = [r for r in librarian.records if r.name == name]
+    if len(records) == 0:
+        return None
+    else:
+        return records[0]
+
+
+def search_records_linear(librarian: ModelLibrarian, search: str) -> List[ModelRecord]:
+    return [r for r in librarian.records if search in r.name]
+
+
+def get_time(function, args: list) -> float:
+    t0 = perf_counter()
+    for arg in args:
+        function(arg)
+    return (perf_counter() - t0) / len(args) * 1000000
+
+
+def get_models_in_footprint_linear(librarian: ModelLibrarian, footprint: Tuple[float, float]) -> List[str]:
+    model_names = list()
+    for record in librarian.records:
+        extents = TDWUtils.get_bounds_extents(bounds=record.bounds)
+        if extents[0] <= footprint[0] and extents[2] <= footprint[1]:
+            model_names.append(record.name)
+    return model_names
+
+
+def get_models_in_footprint_indexed(librarian: ModelLibrarian, footprint: Tuple[float, float]) -> List[str]:
+    query_index = librarian.get_query_index()
+    return query_index.get_names(query_index.get_mask(footprint=footprint, rotate=False))
+
+
+def get_private_memory() -> int:
+    private_memory = 0
+    with open("/proc/self/smaps_rollup", "rt") as f:
+        for line in f.readlines():
+            if line.startswith("Private_Clean:") or line.startswith("Private_Dirty:"):
+                private_memory += int(line.split()[1])
+    return private_memory
+
+
+def get_worker_memory(read_only: bool, names: List[str]) -> int:
+    private_memory = get_private_memory()
+    librarian = ModelLibrarian("models_core.json", read_only=read_only)
+    for name in names:
+        librarian.get_record(name)
+    return get_private_memory() - private_memory
+
+
+def build_scene(names: List[str]) -> float:
+    t0 = perf_counter()
+    commands = list()
+    for name in names:
+        object_id = Controller.get_unique_id()
+        commands.append(Controller.get_add_object(model_name=name, object_id=object_id))
+        commands.extend(Controller.get_add_physics_object(model_name=name,
+                                                          object_id=object_id + 1,
+                                                          default_physics_values=False))
+    return len(names) / (perf_counter() - t0)
+
+
+def build_physics_objects(names: List[str], positions: np.ndarray, rotations: np.ndarray) -> Tuple[float, int]:
+    t0 = perf_counter()
+    commands = list()
+    for i in range(len(names)):
+        commands.extend(Controller.get_add_physics_object(model_name=names[i],
+                                                          object_id=i,
+                                                          position=TDWUtils.array_to_vector3(positions[i]),
+                                                          rotation=TDWUtils.array_to_vector3(rotations[i])))
+    return len(names) / (perf_counter() - t0), len(commands)
+
+
+def build_physics_objects_batch(names: List[str], positions: np.ndarray, rotations: np.ndarray) -> Tuple[float, int]:
+    t0 = perf_counter()
+    commands = Controller.get_add_physics_objects(model_names=names,
+                                                  object_ids=list(range(len(names))),
+                                                  positions=positions,
+                                                  rotations=rotations)
+    return len(names) / (perf_counter() - t0), len(commands)
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    lib = ModelLibrarian("models_core.json")
+    Controller.MODEL_LIBRARIANS["models_core.json"] = lib
+    model_names = [random.choice(lib.records).name for _ in range(5000)]
+    searches = [name[:random.randint(3, len(name))] for name in random.sample(model_names, 500)]
+    # Create the search index.
+    lib.search_records(searches[0])
+    output = f"Records: {len(lib.records)}\n\n| Test | Linear | Indexed |\n| --- | --- | --- |\n"
+    output += f"| `get_record(name)` (µs) | {round(get_time(lambda n: get_record_linear(lib, n), model_names), 2)} | " \
+              f"{round(get_time(lib.get_record, model_names), 2)} |\n"
+    output += f"| `search_records(search)` (µs) | {round(get_time(lambda s: search_records_linear(lib, s), searches), 2)} | " \
+              f"{round(get_time(lib.search_records, searches), 2)} |\n"
+    # Use the previous linear `get_record(name)` to build the scene.
+    lib.get_record = lambda n: get_record_linear(lib, n)
+    linear = build_scene(model_names)
+    del lib.get_record
+    indexed = build_scene(model_names)
+    output += f"| Scene building (objects per second) | {round(linear)} | {round(indexed)} |"
+    print(output)
+    output = "\n| Library | Uncached (ms) | Cached (ms) |\n| --- | --- | --- |\n"
+    for library, librarian_type in zip(["models_core.json", "materials_med.json"], [ModelLibrarian, MaterialLibrarian]):
+        cache_path = librarian_type(library)._get_cache_path()
+        cache_path.unlink()
+        t0 = perf_counter()
+        librarian_type(library)
+        uncached = (perf_counter() - t0) * 1000
+        t0 = perf_counter()
+        librarian_type(library)
+        cached = (perf_counter() - t0) * 1000
+        output += f"| `{library}` | {round(uncached, 2)} | {round(cached, 2)} |\n"
+    print(output)
+    footprints = [(float(w), float(d)) for w, d in np.random.RandomState(0).uniform(0.1, 2, size=(100, 2))]
+    # Create the query index.
+    lib.get_query_index()
+    output = f"| Test | Linear | Indexed |\n| --- | --- | --- |\n" \
+             f"| Models in footprint (µs) | {round(get_time(lambda f: get_models_in_footprint_linear(lib, f), footprints), 2)} | " \
+             f"{round(get_time(lambda f: get_models_in_footprint_indexed(lib, f), footprints), 2)} |"
+    print(output)
+    # Use models that have default physics values so that the benchmark doesn't require models_full.json.
+    from tdw.physics_audio.object_audio_static import DEFAULT_OBJECT_AUDIO_STATIC_DATA
+    physics_model_names = [name for name in model_names if name in DEFAULT_OBJECT_AUDIO_STATIC_DATA]
+    object_positions = np.random.RandomState(0).uniform(-5, 5, size=(len(physics_model_names), 3))
+    object_rotations = np.random.RandomState(1).uniform(0, 360, size=(len(physics_model_names), 3))
+    output = "\n| Builder | Objects per second | Commands per object |\n| --- | --- | --- |\n"
+    for builder, function in zip(["`get_add_physics_object()`", "`get_add_physics_objects()`"],
+                                 [build_physics_objects, build_physics_objects_batch]):
+        objects_per_second, num_commands = function(physics_model_names, object_positions, object_rotations)
+        output += f"| {builder} | {round(objects_per_second)} | {round(num_commands / len(physics_model_names), 2)} |\n"
+    print(output)
+    if system() == "Linux":
+        output = "\n| Workers | Normal (KB) | Read-only (KB) |\n| --- | --- | --- |\n"
+        context = get_context("fork")
+        for num_workers in [1, 4, 16]:
+            row = list()
+            for read_only in [False, True]:
+                with context.Pool(num_workers) as pool:
+                    row.append(sum(pool.starmap(get_worker_memory, [(read_only, model_names)] * num_workers)))
+            output += f"| {num_workers} | {row[0]} | {row[1]} |\n"
+        print(output)
@@ -0,0 +1,61 @@
+from time import perf_counter
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from json import dumps
+from tdw.add_ons.logger import Logger
+from tdw.add_ons.log_playback import LogPlayback
+
+
+"""
+Benchmark the speed of `Logger` and `LogPlayback`. This doesn't require a build.
+
+Each frame, `Logger` logs a list of commands that is similar to the commands of a typical controller: Forces and a `send_transforms` command.
+
+This will output the time per frame of logging the commands, the time of loading the log with `LogPlayback`, and the total size on disk, for:
+
+1. Opening the log file and writing the commands per frame (the previous behavior of `Logger`)
+2. `Logger` without compression
+3. `Logger` with gzip compression
+4. `Logger` with zlib compression
+"""
+
+
+def get_commands(frame: int) -> list:
+    commands = [{"$type": "apply_force_to_object",
+                 "id": i,
+                 "force": {"x": frame * 0.01, "y": 0, "z": i * 0.5}} for i in range(20)]
+    commands.append({"$type": "send_transforms",
+                     "frequency": "once"})
+    return commands
+
+
+if __name__ == "__main__":
+    num_frames = 20000
+    frames = [get_commands(i) for i in range(num_frames)]
+    frame_bytes = [(i + 1).to_bytes(4, "big") for i in range(num_frames)]
+    output = "| Logger | Log (ms per frame) | Load (s) | Size (MB) |\n| --- | --- | --- | --- |\n"
+    for name, compression in zip(["Per-frame open", "Buffered", "Buffered (gzip)", "Buffered (zlib)"],
+                                 [None, None, "gzip", "zlib"]):
+        with TemporaryDirectory() as temp_directory:
+            path = Path(temp_directory).joinpath("log.txt")
+            if name == "Per-frame open":
+                t0 = perf_counter()
+                for commands in frames:
+                    with path.open("at", encoding="utf-8") as f:
+                        f.write(dumps(commands) + "\n")
+                log_time = (perf_counter() - t0) / num_frames * 1000
+            else:
+                logger = Logger(path=path, compression=compression)
+                t0 = perf_counter()
+                for commands, frame in zip(frames, frame_bytes):
+                    logger.before_send(commands)
+                    logger.on_send([frame])
+                logger.close()
+                log_time = (perf_counter() - t0) / num_frames * 1000
+            t0 = perf_counter()
+            playback = LogPlayback()
+            playback.load(path)
+            load_time = perf_counter() - t0
+            size = sum([p.stat().st_size for p in Logger.get_paths(path)]) / 1048576
+        output += f"| {name} | {round(log_time, 4)} | {round(load_time, 3)} | {round(size, 2)} |\n"
+    print(output)
@@ -0,0 +1,55 @@
+from time import perf_counter
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List
+import numpy as np
+from tdw.add_ons.output_data_writer import OutputDataWriter
+from tdw.episode_file.episode_file_reader import EpisodeFileReader
+
+
+"""
+Benchmark the speed of `OutputDataWriter`. This doesn't require a build.
+
+Each frame is a response with random byte arrays whose sizes are similar to transforms, rigidbodies, and collision data, plus the frame number.
+
+This will output the time per frame of writing and reading the frames, and the total size on disk, for:
+
+1. Per-frame base64 text files (the default behavior)
+2. A binary episode file (`binary=True`)
+"""
+
+
+def get_frames(num_frames: int, element_sizes: List[int]) -> List[List[bytes]]:
+    rng = np.random.RandomState(0)
+    return [[rng.bytes(size) for size in element_sizes] + [i.to_bytes(4, "little")] for i in range(num_frames)]
+
+
+def get_size(directory: Path) -> int:
+    return sum([p.stat().st_size for p in directory.iterdir()])
+
+
+if __name__ == "__main__":
+    output = "| Frame size | Writer | Write (ms per frame) | Read (ms per frame) | Size (MB) |\n| --- | --- | --- | --- | --- |\n"
+    for sizes in [[1000, 1000, 200], [100000, 100000, 20000]]:
+        frames = get_frames(num_frames=1000, element_sizes=sizes)
+        for binary in [False, True]:
+            with TemporaryDirectory() as temp_directory:
+                writer = OutputDataWriter(output_directory=temp_directory, binary=binary)
+                t0 = perf_counter()
+                for frame in frames:
+                    writer.on_send(frame)
+                writer.close()
+                write_time = (perf_counter() - t0) / len(frames) * 1000
+                t0 = perf_counter()
+                if binary:
+                    reader = EpisodeFileReader(path=writer.output_directory.joinpath(OutputDataWriter.EPISODE_FILENAME))
+                    for resp in reader:
+                        pass
+                    reader.close()
+                else:
+                    for i in range(len(frames)):
+                        writer.read(i)
+                read_time = (perf_counter() - t0) / len(frames) * 1000
+                output += f"| {sum(sizes)} bytes | {'Binary' if binary else 'Text'} | {round(write_time, 3)} | " \
+                          f"{round(read_time, 3)} | {round(get_size(writer.output_directory) / 1048576, 2)} |\n"
+    print(output)
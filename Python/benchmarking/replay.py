@@ -0,0 +1,70 @@
+from argparse import ArgumentParser
+from tdw.controller import Controller
+from tdw.tdw_utils import TDWUtils
+from tdw.replay_build import ReplayBuild
+from tdw.add_ons.benchmark import Benchmark
+from tdw.add_ons.object_manager import ObjectManager
+from tdw.add_ons.collision_manager import CollisionManager
+from tdw.add_ons.response_recorder import ResponseRecorder
+
+
+"""
+Benchmark Python-side overhead (add-ons and output data deserialization) without a build.
+
+First, record a scene with a real build:
+
+`python3 replay.py --record`
+
+Then, replay the recording (this doesn't require a build or a GPU):
+
+`python3 replay.py`
+"""
+
+
+def record(path: str, num_frames: int) -> None:
+    c = Controller()
+    c.add_ons.extend([ObjectManager(transforms=True, rigidbodies=True, bounds=True),
+                      CollisionManager(enter=True, stay=True, exit=True, objects=True, environment=True),
+                      ResponseRecorder(path=path)])
+    commands = [TDWUtils.create_empty_room(12, 12)]
+    object_id = 0
+    for x in range(-4, 5):
+        for z in range(-4, 5):
+            commands.extend(Controller.get_add_physics_object(model_name="cube",
+                                                              library="models_flex.json",
+                                                              object_id=object_id,
+                                                              position={"x": x * 0.5, "y": 3, "z": z * 0.5}))
+            object_id += 1
+    c.communicate(commands)
+    for i in range(num_frames):
+        c.communicate([])
+    c.communicate({"$type": "terminate"})
+
+
+def replay(path: str, port: int, num_frames: int) -> None:
+    process = ReplayBuild.launch(path=path, port=port)
+    c = Controller(port=port, check_version=False, launch_build=False)
+    b = Benchmark()
+    c.add_ons.extend([ObjectManager(transforms=True, rigidbodies=True, bounds=True),
+                      CollisionManager(enter=True, stay=True, exit=True, objects=True, environment=True),
+                      b])
+    b.start()
+    for i in range(num_frames):
+        c.communicate([])
+    b.stop()
+    print(f"FPS: {round(b.fps)}")
+    c.communicate({"$type": "terminate"})
+    process.wait()
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("--path", type=str, default="replay.tdwe", help="The path to the recording file.")
+    parser.add_argument("--record", action="store_true", help="Record with a real build instead of replaying.")
+    parser.add_argument("--port", type=int, default=1071, help="The port number.")
+    parser.add_argument("--num_frames", type=int, default=2000, help="The number of frames.")
+    args = parser.parse_args()
+    if args.record:
+        record(path=args.path, num_frames=args.num_frames)
+    else:
+        replay(path=args.path, port=args.port, num_frames=args.num_frames)
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional, Set
 from abc import ABC, abstractmethod
 
 
@@ -12,6 +12,8 @@ class AddOn(ABC):
     We recommend that new TDW users use add-ons in their controllers, while more experienced users might prefer to have more fine-grained control. Add-ons are a new feature in TDW as of v1.9.0 and we're still in the process of updating our example controllers.
 
     To attach an add-on, append it to the `add_ons` list. Every time `Controller.communicate(commands)` is called, the add-on will evaluate the response from the build via `on_send(resp)`.
+
+    Add-ons can read output data from a shared [`FrameIndex`](../frame_index.md) via `FrameIndex.get(resp)` instead of iterating through `resp`. This way, each output data object is deserialized only once per frame, regardless of how many add-ons read it.
     """
 
     def __init__(self):
@@ -27,6 +29,10 @@ class AddOn(ABC):
         If True, this module has been initialized.
         """
         self.initialized: bool = False
+        """:field
+        The [IDs of the output data](../../api/output_data.md) that this add-on reads in `on_send(resp)`, for example `{"tran", "coll"}`. If not None, the `resp` list passed to `on_send(resp)` will only include output data of these types (plus the frame number as the last element). If None, `resp` will include all output data. Built-in add-ons set this only if they aren't subclassed, so that a subclass's `on_send(resp)` still receives all output data. To filter the output data of a subclass, set this in the subclass's constructor.
+        """
+        self.output_data_ids: Optional[Set[str]] = None
 
     @abstractmethod
     def get_initialization_commands(self) -> List[dict]:
@@ -15,6 +15,9 @@ class Benchmark(AddOn):
 
         super().__init__()
         self.initialized = True
+        # This add-on doesn't read any output data. Subclasses might read output data in `on_send(resp)`, so only filter `resp` for this class.
+        if type(self) is Benchmark:
+            self.output_data_ids = set()
         """:field
         A list of time elapsed per `communicate()` call.
         """
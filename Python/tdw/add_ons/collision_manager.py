@@ -1,5 +1,6 @@
 from typing import Dict, List
-from tdw.output_data import OutputData, Collision, EnvironmentCollision
+from tdw.output_data import Collision, EnvironmentCollision
+from tdw.frame_index import FrameIndex
 from tdw.collision_data.collision_obj_obj import CollisionObjObj
 from tdw.collision_data.collision_obj_env import CollisionObjEnv
 from tdw.int_pair import IntPair
@@ -42,6 +43,9 @@ class CollisionManager(AddOn):
         Key = the object ID. Value = [The collision.](../collision_data/collision_obj_env.md)
         """
         self.env_collisions: Dict[int, CollisionObjEnv] = dict()
+        # Subclasses might read other output data in `on_send(resp)`, so only filter `resp` for this class.
+        if type(self) is CollisionManager:
+            self.output_data_ids = {"coll", "enco"}
 
     def get_initialization_commands(self) -> List[dict]:
         return [self._send_collision_commands]
@@ -49,15 +53,14 @@ class CollisionManager(AddOn):
     def on_send(self, resp: List[bytes]) -> None:
         self.obj_collisions.clear()
         self.env_collisions.clear()
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            if r_id == "coll":
-                collision = Collision(resp[i])
-                # Get the pair of IDs in this collision and use it as a key.
-                ids = IntPair(int1=collision.get_collider_id(), int2=collision.get_collidee_id())
-                coo = CollisionObjObj(collision=collision)
-                self.obj_collisions[ids] = coo
-            elif r_id == "enco":
-                collision = EnvironmentCollision(resp[i])
-                coe = CollisionObjEnv(collision=collision)
-                self.env_collisions[collision.get_object_id()] = coe
+        frame_index = FrameIndex.get(resp)
+        collision: Collision
+        for collision in frame_index.get_output_data("coll"):
+            # Get the pair of IDs in this collision and use it as a key.
+            ids = IntPair(int1=collision.get_collider_id(), int2=collision.get_collidee_id())
+            coo = CollisionObjObj(collision=collision)
+            self.obj_collisions[ids] = coo
+        env_collision: EnvironmentCollision
+        for env_collision in frame_index.get_output_data("enco"):
+            coe = CollisionObjEnv(collision=env_collision)
+            self.env_collisions[env_collision.get_object_id()] = coe
@@ -115,7 +115,7 @@ class Drone(AddOn):
         commands = [{"$type": "add_drone", 
                      "id": self.drone_id,
                      "name": self._name,
-                     "url": self._record.get_url(), 
+                     "url": Controller.get_asset_bundle_url(self._record.get_url()), 
                      "position": self.initial_position,
                      "rotation": self.initial_rotation,
                      "rise_speed": self._rise_speed,
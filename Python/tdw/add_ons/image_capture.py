@@ -1,9 +1,11 @@
-from typing import List, Union, Dict
+from typing import List, Union, Dict, Optional
 from pathlib import Path
 from PIL.Image import Image
 from tdw.add_ons.add_on import AddOn
 from tdw.tdw_utils import TDWUtils
-from tdw.output_data import OutputData, Images
+from tdw.output_data import Images, CameraMatrices, SegmentationColors
+from tdw.frame_index import FrameIndex
+from tdw.image_sinks.image_sink import ImageSink
 
 
 class ImageCapture(AddOn):
@@ -38,17 +40,23 @@ class ImageCapture(AddOn):
 
     c.communicate({"$type": "terminate"})
     ```
+
+    When the `terminate` command is sent, this add-on saves the images of the last frame and then closes its sink (see: `ImageSink.close()`). This ensures that images queued by an [`AsyncImageSink`](../image_sinks/async_image_sink.md) are saved before the process exits. To close the sink earlier, call `close()`.
     """
 
     # A list of valid pass masks.
     _PASS_MASKS: List[str] = list(Images.PASS_MASKS.values())
 
-    def __init__(self, path: Union[str, Path], avatar_ids: List[str] = None, png: bool = False, pass_masks: List[str] = None):
+    def __init__(self, path: Union[str, Path], avatar_ids: List[str] = None, png: bool = False, pass_masks: List[str] = None,
+                 sink: ImageSink = None, camera_matrices: bool = False, segmentation_colors: bool = False):
         """
         :param path: The path to the output directory.
         :param avatar_ids: The IDs of the avatars that will capture and save images. If empty, all avatars will capture and save images. Note that these avatars must already exist in the scene (if you've added the avatars via a [`ThirdPersonCamera` add-on](third_person_camera.md), you must add the `ThirdPersonCamera` first, *then* `ImageCapture`).
         :param png: If True, images will be lossless png files. If False, images will be jpgs. Usually, jpg is sufficient.
         :param pass_masks: A list of image passes that will be captured by the avatars. If None, defaults to `["_img"]`. For a description of each of pass mask, [read this](https://github.com/threedworld-mit/tdw/blob/master/Documentation/api/command_api.md#set_pass_masks).
+        :param sink: The [`ImageSink`](../image_sinks/image_sink.md) that saves images to disk. If None, each image pass is saved immediately as a separate file. To save images in a background thread, set this to an [`AsyncImageSink`](../image_sinks/async_image_sink.md).
+        :param camera_matrices: If True, request camera matrices whenever images are requested and pass them to `sink` as per-frame metadata.
+        :param segmentation_colors: If True, request segmentation colors whenever images are requested and pass them to `sink` as per-frame metadata. This is slower than capturing images without segmentation colors.
         """
 
         super().__init__()
@@ -72,6 +80,10 @@ class ImageCapture(AddOn):
             self.avatar_ids: List[str] = []
         else:
             self.avatar_ids: List[str] = avatar_ids
+        """:field
+        The [`ImageSink`](../image_sinks/image_sink.md) that saves images to disk.
+        """
+        self.sink: ImageSink = ImageSink() if sink is None else sink
         # If True, encode the _img pass as a png.
         self._png: bool = png
         # A list of pass mask commands to send on the next frame.
@@ -80,11 +92,24 @@ class ImageCapture(AddOn):
         self._frequency: str = "always"
         # If True, save images per frame.
         self._save: bool = True
+        # If True, request camera matrices and save them as metadata.
+        self._camera_matrices: bool = camera_matrices
+        # If True, request segmentation colors and save them as metadata.
+        self._segmentation_colors: bool = segmentation_colors
+        # If True, the `terminate` command was sent this frame.
+        self._terminate: bool = False
 
         """:field
         Raw [`Images` output data](../../api/output_data.md#Images) from the build. Key = The ID of the avatar. This is updated per frame. If an avatar didn't capture an image on this frame, it won't be in this dictionary.
         """
         self.images: Dict[str, Images] = dict()
+        # Subclasses might read other output data in `on_send(resp)`, so only filter `resp` for this class.
+        if type(self) is ImageCapture:
+            self.output_data_ids = {"imag"}
+            if self._camera_matrices:
+                self.output_data_ids.add("cama")
+            if self._segmentation_colors:
+                self.output_data_ids.add("segm")
 
     def get_initialization_commands(self) -> List[dict]:
         commands = [{"$type": "set_img_pass_encoding",
@@ -92,38 +117,58 @@ class ImageCapture(AddOn):
         # Get the pass masks.
         commands.extend(self._pass_mask_commands)
         # Begin by sending images for the next frame.
-        commands.append({"$type": "send_images",
-                         "frequency": "once",
-                         "ids": self.avatar_ids})
+        commands.extend(self._get_send_images_commands(frequency="once"))
         return commands
 
     def on_send(self, resp: List[bytes]) -> None:
         got_images = False
         self.images.clear()
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            if r_id == "imag":
-                images = Images(resp[i])
-                a = images.get_avatar_id()
-                # Store the image data.
-                self.images[a] = images
-                if self._save and (len(self.avatar_ids) == 0 or a in self.avatar_ids):
-                    output_dir = self.path.joinpath(a)
-                    if not output_dir.exists():
-                        output_dir.mkdir(parents=True)
-                    # Save images.
-                    TDWUtils.save_images(images=images,
-                                         output_directory=str(output_dir.resolve()),
-                                         filename=TDWUtils.zero_padding(self.frame, 4))
-                    got_images = True
+        frame_index = FrameIndex.get(resp)
+        # Get the camera matrices per avatar.
+        camera_matrices: Dict[str, CameraMatrices] = dict()
+        if self._camera_matrices:
+            for cama in frame_index.get_output_data("cama"):
+                camera_matrices[cama.get_avatar_id()] = cama
+        # Get the segmentation colors.
+        segmentation_colors: Optional[SegmentationColors] = None
+        if self._segmentation_colors:
+            for segm in frame_index.get_output_data("segm"):
+                segmentation_colors = segm
+        images: Images
+        for images in frame_index.get_output_data("imag"):
+            a = images.get_avatar_id()
+            # Store the image data.
+            self.images[a] = images
+            if self._save and (len(self.avatar_ids) == 0 or a in self.avatar_ids):
+                # Save images.
+                self.sink.write(images=images, path=self.path, avatar_id=a, frame=self.frame,
+                                metadata=self._get_metadata(images=images,
+                                                            camera_matrices=camera_matrices.get(a),
+                                                            segmentation_colors=segmentation_colors))
+                got_images = True
         if got_images:
             self.frame += 1
         # If we're requesting images per-frame, send the command.
         # We can't use the "always" value because of cases like that Magnebot that will turn off image capture.
         if self._frequency == "always":
-            self.commands.append({"$type": "send_images",
-                                  "frequency": "once",
-                                  "ids": self.avatar_ids})
+            self.commands.extend(self._get_send_images_commands(frequency="once"))
+        # Save every queued image before the build quits.
+        if self._terminate:
+            self._terminate = False
+            self.close()
+
+    def before_send(self, commands: List[dict]) -> None:
+        for command in commands:
+            if command["$type"] == "terminate":
+                self._terminate = True
+                break
+
+    def close(self) -> None:
+        """
+        Close the sink. This waits until every image has been saved. This is called automatically when the `terminate` command is sent.
+        """
+
+        self.sink.close()
 
     def set(self, frequency: str = "always", avatar_ids: List[str] = None, pass_masks: List[str] = None, save: bool = True) -> None:
         """
@@ -147,9 +192,7 @@ class ImageCapture(AddOn):
             pass
         # Send images once or never.
         elif self._frequency == "once" or self._frequency == "never":
-            self.commands.append({"$type": "send_images",
-                                  "frequency": self._frequency,
-                                  "ids": self.avatar_ids})
+            self.commands.extend(self._get_send_images_commands(frequency=self._frequency))
         else:
             raise Exception(f"Invalid frequency: {self._frequency}")
 
@@ -183,3 +226,48 @@ class ImageCapture(AddOn):
                 raise Exception(f"Invalid pass mask: {pm}")
         return [{"$type": "set_pass_masks", "pass_masks": pass_masks, "avatar_id": a} for a in self.avatar_ids]
 
+    def _get_send_images_commands(self, frequency: str) -> List[dict]:
+        """
+        :param frequency: The frequency at which images are sent.
+
+        :return: A list of commands to send images and, if needed, camera matrices and segmentation colors.
+        """
+
+        commands = [{"$type": "send_images",
+                     "frequency": frequency,
+                     "ids": self.avatar_ids}]
+        if self._camera_matrices:
+            commands.append({"$type": "send_camera_matrices",
+                             "frequency": frequency,
+                             "ids": self.avatar_ids})
+        if self._segmentation_colors:
+            commands.append({"$type": "send_segmentation_colors",
+                             "frequency": frequency})
+        return commands
+
+    def _get_metadata(self, images: Images, camera_matrices: Optional[CameraMatrices],
+                      segmentation_colors: Optional[SegmentationColors]) -> Optional[dict]:
+        """
+        :param images: The `Images` output data.
+        :param camera_matrices: The `CameraMatrices` output data of the avatar, if any.
+        :param segmentation_colors: The `SegmentationColors` output data, if any.
+
+        :return: The per-frame metadata of the images. If this add-on doesn't request camera matrices or segmentation colors, this is None.
+        """
+
+        if not self._camera_matrices and not self._segmentation_colors:
+            return None
+        metadata = {"avatar_id": images.get_avatar_id(),
+                    "sensor_name": images.get_sensor_name(),
+                    "frame": self.frame,
+                    "width": images.get_width(),
+                    "height": images.get_height()}
+        if camera_matrices is not None:
+            metadata["projection_matrix"] = camera_matrices.get_projection_matrix().tolist()
+            metadata["camera_matrix"] = camera_matrices.get_camera_matrix().tolist()
+        if segmentation_colors is not None:
+            metadata["segmentation_colors"] = [{"id": segmentation_colors.get_object_id(i),
+                                                "color": segmentation_colors.get_object_color(i).tolist(),
+                                                "name": segmentation_colors.get_object_name(i)}
+                                               for i in range(segmentation_colors.get_num())]
+        return metadata
@@ -1,5 +1,7 @@
-from json import dumps, loads
-from typing import List, Union, Dict
+from bisect import bisect_right
+from gzip import GzipFile
+from json import loads
+from typing import List, Union, Dict, Tuple, Optional, BinaryIO, TextIO
 from pathlib import Path
 from tdw.add_ons.writer import Writer
 from tdw.backend.encoder import Encoder
@@ -22,18 +24,42 @@ class JsonWriter(Writer[Union[dict, Dict[str, dict]]]):
     - Some classes, namely those in the `tdw.FBOutput` namespace, can't readily be serialized to a dictionary; their values are instead set to null.
     - Enum values are converted to their string representation i.e. `value.name`.
     - Dictionaries that have non-string keys have all of their keys converted into strings i.e. `str(key)`.
+
+    If `streaming=True`, every frame is instead appended as one compact line to a single [JSONL](https://jsonlines.org/) file, `frames.jsonl`, in the output directory. Each line is a dictionary: `{"frame": frame, "data": data}` where `data` is a dictionary of every object's data. If `compress=True`, the file is gzipped: `frames.jsonl.gz`. Call `close()` at the end of the simulation to write any buffered frames.
+
+    If `delta=True` as well, most lines only include data that changed since the previous frame: `{"frame": frame, "delta": delta, "removed": removed}`. `delta` is a nested dictionary of the values that changed. Nested dictionaries that changed are themselves deltas; every other value (including lists) is replaced. `removed` is a list of key paths that were removed, and is omitted if nothing was removed. This is much smaller than the full data when most of the data is static, for example an [`ObjectManager`](object_manager.md)'s static object data.
+
+    Every `keyframe_interval` frames, the full data is written (in delta mode) and the byte offset of the frame is appended to an index file, for example `frames.jsonl.idx`. `read(frame)` uses the index to reconstruct any frame by reading forward from the nearest preceding keyframe.
+    """
+
+    """:class_var
+    The name of the JSONL file in the output directory if `streaming=True`. If `compress=True`, `.gz` is appended to the filename.
     """
+    STREAM_FILENAME: str = "frames.jsonl"
+    """:class_var
+    The file extension appended to the name of the JSONL file to get the name of the keyframe index file.
+    """
+    INDEX_EXTENSION: str = ".idx"
 
     def __init__(self, objects: Dict[str, object], output_directory: Union[str, Path], indent: int = 2,
-                 include_hidden_fields: bool = False, zero_padding: int = 8):
+                 include_hidden_fields: bool = False, zero_padding: int = 8, streaming: bool = False,
+                 compress: bool = False, delta: bool = False, keyframe_interval: int = 100):
         """
         :param objects: A dictionary of objects to serialize. Key = A name or identifier for the object, for example `"robot"`. Value = A data object, for example a [`Robot`](robot.md).
         :param output_directory: The root output directory as a string or [`Path`](https://docs.python.org/3/library/pathlib.html). If this doesn't exist, it will be created.
-        :param indent: The indentation level of the output JSON strings.
+        :param indent: The indentation level of the output JSON strings. Ignored if `streaming=True`.
         :param include_hidden_fields: If True, include hidden fields in the JSON data i.e. any fields which have names that begin with `_`. This will give you *all* of the data, but often you won't want this. Many TDW classes hold megabytes of data in hidden fields, which is trivial to do in memory but serializing this data can be very slow.
-        :param zero_padding: How many zeros to append to the file name. By default, the name of the file of the first frame will be `00000000.txt`.
+        :param zero_padding: How many zeros to append to the file name. By default, the name of the file of the first frame will be `00000000.txt`. Ignored if `streaming=True`.
+        :param streaming: If True, append every frame to a single JSONL file rather than writing one JSON file per object per frame.
+        :param compress: If True, gzip the JSONL file. Requires `streaming=True`.
+        :param delta: If True, write only the data that changed since the previous frame, except on keyframes. Requires `streaming=True`.
+        :param keyframe_interval: If `streaming=True`, write a keyframe every this many frames. Smaller values make `read(frame)` faster but, if `delta=True`, make the file larger.
         """
 
+        if (compress or delta) and not streaming:
+            raise Exception("`compress` and `delta` require `streaming=True`")
+        if keyframe_interval < 1:
+            raise Exception(f"Invalid keyframe interval: {keyframe_interval}")
         super().__init__(output_directory=output_directory, zero_padding=zero_padding)
         # Set the hidden fields class variable.
         Encoder.INCLUDE_HIDDEN_FIELDS = include_hidden_fields
@@ -41,37 +67,93 @@ class JsonWriter(Writer[Union[dict, Dict[str, dict]]]):
         A dictionary of objects to serialize. Key = A name or identifier for the object, for example `"robot"`. Value = A data object, for example a [`Robot`](robot.md).
         """
         self.objects: Dict[str, object] = objects
-        self._encoder: Encoder = Encoder()
+        """:field
+        If True, every frame is appended to a single JSONL file.
+        """
+        self.streaming: bool = streaming
+        """:field
+        If True, the JSONL file is gzipped.
+        """
+        self.compress: bool = compress
+        """:field
+        If True, only data that changed since the previous frame is written, except on keyframes.
+        """
+        self.delta: bool = delta
+        """:field
+        If `streaming=True`, a keyframe is written every this many frames.
+        """
+        self.keyframe_interval: int = keyframe_interval
         self._indent: int = indent
+        self._encoder: Encoder = Encoder(indent=indent)
+        # The encoder used for JSONL lines.
+        self._compact_encoder: Encoder = Encoder(separators=(",", ":"))
+        # The JSONL file.
+        self._file: Optional[BinaryIO] = None
+        # If `compress == True`, this wraps `self._file`. A new gzip member is started at each keyframe so that it can be decompressed starting from the keyframe.
+        self._gzip: Optional[GzipFile] = None
+        # The keyframe index file.
+        self._index_file: Optional[TextIO] = None
+        # The keyframes. Each element is a tuple: The frame number and the byte offset of the frame in the JSONL file.
+        self._keyframes: List[Tuple[int, int]] = list()
+        # If True, the next frame written to the JSONL file is a keyframe.
+        self._next_keyframe: bool = True
+        # The data of the previous frame. This is used to calculate deltas.
+        self._previous: Optional[dict] = None
+        # The JSONL file opened for reading. This is kept open so that consecutive frames can be read without seeking.
+        self._read_file: Optional[BinaryIO] = None
+        # The frame number and data of the frame that was read most recently.
+        self._read_frame: int = -1
+        self._read_data: Optional[dict] = None
 
     def on_send(self, resp: List[bytes]) -> None:
-        for name in self.objects:
-            self._get_path(name=name, frame_number=self._frame_count).write_text(dumps(self._encoder.encode(self.objects[name]),
-                                                                                       indent=self._indent),
-                                                                                 encoding="utf-8")
+        if self.streaming:
+            self._write_frame()
+        else:
+            for name in self.objects:
+                self._get_path(name=name, frame_number=self._frame_count).write_text(self._encoder.encode(self.objects[name]),
+                                                                                     encoding="utf-8")
         self._frame_count += 1
 
     def read(self, path: Union[str, Path, int]) -> Union[dict, Dict[str, dict]]:
         """
         Read saved ouput data.
 
-        :param path: The path to the frame file. This can be a string or [`Path`](https://docs.python.org/3/library/pathlib.html) file path or an integer. If this is an integer, it represents the frame number; the file is assumed to be in `self.output_directory`.
+        :param path: The path to the frame file. This can be a string or [`Path`](https://docs.python.org/3/library/pathlib.html) file path or an integer. If this is an integer, it represents the frame number; the file is assumed to be in `self.output_directory`. If `streaming=True`, this must be an integer. In streaming mode, the returned dictionaries may share unchanged data with dictionaries returned for other frames, so copy them before modifying them.
 
         :return: If `path` is a string or a `Path`, this will return a dictionary. If `path` is an integer, this will return a *dictionary of dictionaries* where the key is the object name (e.g. `"robot"`) and the value is the corresponding dictionary.
         """
 
+        if self.streaming:
+            if not isinstance(path, int):
+                raise Exception(path)
+            return self._read_frame_from_stream(path)
         if isinstance(path, str):
-            return loads(Path(path).read_text(encoding="utf-8"))
+            return JsonWriter._loads(Path(path).read_text(encoding="utf-8"))
         elif isinstance(path, Path):
-            return loads(path.read_text(encoding="utf-8"))
+            return JsonWriter._loads(path.read_text(encoding="utf-8"))
         elif isinstance(path, int):
             data = dict()
             for name in self.objects:
-                data[name] = loads(self._get_path(name=name, frame_number=path).read_text(encoding="utf-8"))
+                data[name] = JsonWriter._loads(self._get_path(name=name, frame_number=path).read_text(encoding="utf-8"))
             return data
         else:
             raise Exception(path)
 
+    def close(self) -> None:
+        """
+        If `streaming=True`, write any buffered frames and close the JSONL file. Frames sent after this is called will be appended to the same file unless `reset()` was called.
+        """
+
+        self._close_stream()
+        self._close_read_file()
+
+    def get_stream_path(self) -> Path:
+        """
+        :return: The path to the JSONL file if `streaming=True`.
+        """
+
+        return self.output_directory.joinpath(JsonWriter.STREAM_FILENAME + (".gz" if self.compress else ""))
+
     def _get_path(self, name: str, frame_number: int) -> Path:
         """
         :param name: The object name.
@@ -81,3 +163,237 @@ class JsonWriter(Writer[Union[dict, Dict[str, dict]]]):
         """
 
         return self.output_directory.joinpath(f"{name}_{str(frame_number).zfill(self._zero_padding)}.json")
+
+    def _write_frame(self) -> None:
+        """
+        Append the data of every object to the JSONL file.
+        """
+
+        # Start a new file after `reset()`.
+        if self._frame_count == 0 and self._file is not None:
+            self._close_stream()
+        if self._file is None:
+            self._open_stream(overwrite=self._frame_count == 0)
+        keyframe = self._next_keyframe or self._frame_count % self.keyframe_interval == 0
+        self._next_keyframe = False
+        if keyframe:
+            # End the current gzip member. The keyframe is the start of a new gzip member.
+            if self._gzip is not None:
+                self._gzip.close()
+            offset = self._file.tell()
+            if self.compress:
+                self._gzip = GzipFile(fileobj=self._file, mode="wb", compresslevel=6)
+            self._keyframes.append((self._frame_count, offset))
+            self._index_file.write(f"{self._frame_count} {offset}\n")
+        encoded = self._compact_encoder.encode(self.objects)
+        if self.delta and not keyframe:
+            data = loads(encoded)
+            delta, removed = JsonWriter._get_delta(previous=self._previous, current=data)
+            record = {"frame": self._frame_count, "delta": delta}
+            if len(removed) > 0:
+                record["removed"] = removed
+            line = self._compact_encoder.encode(record)
+            self._previous = data
+        else:
+            line = f'{{"frame":{self._frame_count},"data":{encoded}}}'
+            if self.delta:
+                self._previous = loads(encoded)
+        (self._file if self._gzip is None else self._gzip).write(line.encode("utf-8") + b"\n")
+
+    def _open_stream(self, overwrite: bool) -> None:
+        """
+        Open the JSONL file and the index file for writing.
+
+        :param overwrite: If True, overwrite any existing files. If False, append to them.
+        """
+
+        self._close_read_file()
+        path = self.get_stream_path()
+        if overwrite:
+            self._keyframes.clear()
+        elif len(self._keyframes) == 0:
+            self._keyframes.extend(self._read_keyframes())
+        self._file = path.open("wb" if overwrite else "ab")
+        self._index_file = path.parent.joinpath(path.name + JsonWriter.INDEX_EXTENSION).open("w" if overwrite else "a")
+        self._next_keyframe = True
+        self._previous = None
+
+    def _close_stream(self) -> None:
+        """
+        Close the JSONL file and the index file.
+        """
+
+        if self._file is None:
+            return
+        if self._gzip is not None:
+            self._gzip.close()
+            self._gzip = None
+        self._file.close()
+        self._file = None
+        self._index_file.close()
+        self._index_file = None
+        self._previous = None
+
+    def _close_read_file(self) -> None:
+        """
+        Close the JSONL file that is opened for reading.
+        """
+
+        if self._read_file is not None:
+            self._read_file.close()
+            self._read_file = None
+        self._read_frame = -1
+        self._read_data = None
+
+    def _read_keyframes(self) -> List[Tuple[int, int]]:
+        """
+        :return: The keyframes in the index file. Each element is a tuple: The frame number and the byte offset of the frame in the JSONL file.
+        """
+
+        path = self.get_stream_path()
+        index_path = path.parent.joinpath(path.name + JsonWriter.INDEX_EXTENSION)
+        if not index_path.exists():
+            # The first frame is always a keyframe.
+            return [(0, 0)]
+        keyframes = list()
+        for line in index_path.read_text().split("\n"):
+            if line != "":
+                frame, offset = line.split(" ")
+                keyframes.append((int(frame), int(offset)))
+        return keyframes
+
+    def _read_frame_from_stream(self, frame: int) -> Dict[str, dict]:
+        """
+        :param frame: The frame number.
+
+        :return: The data of each object on the frame.
+        """
+
+        # Make sure that every frame that has been written can be read.
+        if self._file is not None:
+            if self._gzip is not None:
+                self._gzip.flush()
+            self._file.flush()
+            self._index_file.flush()
+            keyframes = self._keyframes
+        else:
+            if len(self._keyframes) == 0:
+                self._keyframes.extend(self._read_keyframes())
+            keyframes = self._keyframes
+        if frame < 0:
+            raise Exception(f"Invalid frame: {frame}")
+        keyframe_frame, offset = keyframes[max(bisect_right(keyframes, (frame, float("inf"))) - 1, 0)]
+        # Read forward from the previous frame if there isn't a keyframe between the two frames.
+        if self._read_file is None or frame < self._read_frame or keyframe_frame > self._read_frame:
+            self._close_read_file()
+            raw = self.get_stream_path().open("rb")
+            raw.seek(offset)
+            self._read_file = GzipFile(fileobj=raw, mode="rb") if self.compress else raw
+        elif frame == self._read_frame:
+            return self._read_data
+        # The most recent line of full data that hasn't been deserialized yet. Lines are deserialized only if they're needed.
+        data_line: Optional[bytes] = None
+        while True:
+            try:
+                line = self._read_file.readline()
+            except EOFError:
+                # The gzip file is incomplete, for example because it hasn't been closed.
+                line = b""
+            if line == b"" or not line.endswith(b"\n"):
+                self._close_read_file()
+                raise Exception(f"Frame not found: {frame}")
+            # Each line begins with: {"frame":<frame>,
+            comma = line.index(b",", 9)
+            self._read_frame = int(line[9:comma])
+            if line.startswith(b'"data"', comma + 1):
+                data_line = line
+            else:
+                if data_line is not None:
+                    self._read_data = loads(data_line)["data"]
+                    data_line = None
+                record = loads(line)
+                self._read_data = JsonWriter._apply_delta(data=self._read_data, delta=record["delta"])
+                if "removed" in record:
+                    for key_path in record["removed"]:
+                        self._read_data = JsonWriter._remove(data=self._read_data, key_path=key_path)
+            if self._read_frame == frame:
+                if data_line is not None:
+                    self._read_data = loads(data_line)["data"]
+                return self._read_data
+
+    @staticmethod
+    def _loads(text: str) -> dict:
+        """
+        :param text: The text of a JSON file.
+
+        :return: The deserialized data.
+        """
+
+        data = loads(text)
+        # Older versions of `JsonWriter` wrote each object as a JSON string.
+        if isinstance(data, str):
+            return loads(data)
+        return data
+
+    @staticmethod
+    def _get_delta(previous: dict, current: dict) -> Tuple[dict, List[List[str]]]:
+        """
+        :param previous: The data of the previous frame.
+        :param current: The data of the current frame.
+
+        :return: Tuple: A nested dictionary of the values that changed, and a list of key paths that were removed.
+        """
+
+        delta = dict()
+        removed = list()
+        for key in current:
+            value = current[key]
+            if key not in previous:
+                delta[key] = value
+                continue
+            previous_value = previous[key]
+            if value == previous_value:
+                continue
+            # Get the delta of nested dictionaries.
+            if isinstance(value, dict) and isinstance(previous_value, dict):
+                sub_delta, sub_removed = JsonWriter._get_delta(previous=previous_value, current=value)
+                delta[key] = sub_delta
+                removed.extend([[key] + key_path for key_path in sub_removed])
+            else:
+                delta[key] = value
+        removed.extend([[key] for key in previous if key not in current])
+        return delta, removed
+
+    @staticmethod
+    def _apply_delta(data: dict, delta: dict) -> dict:
+        """
+        :param data: The data of the previous frame. This isn't modified.
+        :param delta: A nested dictionary of the values that changed.
+
+        :return: The data of the current frame.
+        """
+
+        data = dict(data)
+        for key in delta:
+            value = delta[key]
+            if isinstance(value, dict) and isinstance(data.get(key), dict):
+                data[key] = JsonWriter._apply_delta(data=data[key], delta=value)
+            else:
+                data[key] = value
+        return data
+
+    @staticmethod
+    def _remove(data: dict, key_path: List[str]) -> dict:
+        """
+        :param data: The data. This isn't modified.
+        :param key_path: The key path of the value to remove.
+
+        :return: The data without the value.
+        """
+
+        data = dict(data)
+        if len(key_path) == 1:
+            del data[key_path[0]]
+        else:
+            data[key_path[0]] = JsonWriter._remove(data=data[key_path[0]], key_path=key_path[1:])
+        return data
@@ -1,7 +1,9 @@
+import zlib
 from pathlib import Path
-from typing import List, Union
+from typing import List, Union, Iterator
 from json import loads
 from tdw.add_ons.add_on import AddOn
+from tdw.add_ons.logger import Logger
 
 
 class LogPlayback(AddOn):
@@ -26,6 +28,8 @@ class LogPlayback(AddOn):
         """
         Load a log file. This will deserialize all of the commands in the log file and add each list of commands to `self.record`. Per `communicate()` call (i.e. when `on_send(resp)` is invoked), this add-on will pop the first list of commands and add it to `self.commands`; in other words, it will send each list of commands exactly as they were sent when they were logged.
 
+        If the log was split into multiple files (`log.txt`, `log.txt.1`, etc.), every file is loaded in order. Compressed log files are decompressed.
+
         :param path: The path to the log file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
         """
 
@@ -35,10 +39,52 @@ class LogPlayback(AddOn):
         else:
             p: Path = path
         assert p.exists(), f"Log not found: {p}"
-        # Open the file. Strip the file of empty lines. Remove Windows line breaks. Split along line breaks.
-        for commands_text in p.read_text(encoding="utf-8").strip().replace("\r", "").split("\n"):
-            # Deserialize the list of commands and append it.
-            self.playback.append(loads(commands_text))
+        for log_path in Logger.get_paths(p):
+            for line in LogPlayback._read_lines(log_path):
+                # Skip empty lines. Remove Windows line breaks.
+                line = line.strip()
+                if len(line) > 0:
+                    # Deserialize the list of commands and append it.
+                    self.playback.append(loads(line))
+
+    @staticmethod
+    def _read_lines(path: Path) -> Iterator[bytes]:
+        """
+        Read a log file one line at a time without reading the whole file into memory.
+
+        :param path: The path to the log file.
+
+        :return: The lines of the log file, decompressed if needed.
+        """
+
+        with path.open("rb") as f:
+            header = f.read(2)
+            f.seek(0)
+            # Text log files start with a list of commands.
+            if header[:1] == b"[" or len(header) == 0:
+                for line in f:
+                    yield line
+                return
+            # Decompress gzip (1f 8b) or zlib (78) data. The file can contain more than one compressed stream.
+            decompressor = zlib.decompressobj(32 + zlib.MAX_WBITS)
+            remainder = b""
+            while True:
+                chunk = f.read(1048576)
+                if len(chunk) == 0:
+                    break
+                while len(chunk) > 0:
+                    data = decompressor.decompress(chunk)
+                    lines = (remainder + data).split(b"\n")
+                    remainder = lines.pop()
+                    for line in lines:
+                        yield line
+                    # Start decompressing the next stream.
+                    if decompressor.eof:
+                        chunk = decompressor.unused_data
+                        decompressor = zlib.decompressobj(32 + zlib.MAX_WBITS)
+                    else:
+                        chunk = b""
+            yield remainder
 
     def get_initialization_commands(self) -> List[dict]:
         return []
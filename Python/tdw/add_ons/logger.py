@@ -1,8 +1,12 @@
+import zlib
+from gzip import GzipFile
 from pathlib import Path
-from typing import List, Union
-from json import dumps
+from time import time
+from typing import List, Tuple, Union, Optional, BinaryIO, TextIO
+from weakref import finalize
 from tdw.output_data import OutputData, LogMessage
 from tdw.add_ons.add_on import AddOn
+from tdw.command_serialization.command_serializer import CommandSerializer
 
 
 class Logger(AddOn):
@@ -22,28 +26,63 @@ class Logger(AddOn):
     ```
 
     The log file can be automatically re-loaded into another controller using the [`LogPlayback`](log_playback.md) add-on.
+
+    Each list of commands is written as one line of JSON. Lines are buffered in memory and written to the log file when the buffer is larger than `buffer_size`, when the buffer is older than `flush_interval` seconds, when the `terminate` command is sent, when `flush()`, `close()`, or `reset()` is called, and when the logger is garbage-collected or the Python process exits.
+
+    If `compression` is `"gzip"` or `"zlib"`, the log file is compressed. If `max_file_size` is greater than 0, a new log file is started when the current log file is larger than `max_file_size` bytes: `log.txt`, then `log.txt.1`, then `log.txt.2`, etc.
+
+    The logger also writes an index file next to the log file, for example `log.txt.idx`. Each line of the index file corresponds to a line of the log: The build's frame number when the commands were sent, the time as a Unix timestamp, and the index of the log file (0 for `log.txt`, 1 for `log.txt.1`, etc.). To read the index file, call `Logger.read_index(path)`.
+    """
+
+    """:class_var
+    The valid values of `compression`, other than None.
+    """
+    COMPRESSION_TYPES: List[str] = ["gzip", "zlib"]
+    """:class_var
+    The file extension appended to the name of the log file to get the name of the index file.
     """
+    INDEX_EXTENSION: str = ".idx"
 
-    def __init__(self, path: Union[str, Path], overwrite: bool = True, log_commands_in_build: bool = False):
+    def __init__(self, path: Union[str, Path], overwrite: bool = True, log_commands_in_build: bool = False,
+                 buffer_size: int = 1048576, flush_interval: float = 5, compression: str = None,
+                 max_file_size: int = 0):
         """
         :param path: The path to the log file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
         :param overwrite: If True and a log file already exists at `path`, overwrite the file.
         :param log_commands_in_build: If True, the build will log every message received and every command executed in the [Player log](https://docs.unity3d.com/Manual/LogFiles.html).
+        :param buffer_size: Write the buffered commands to the log file when the buffer is larger than this many bytes.
+        :param flush_interval: Write the buffered commands to the log file when the oldest buffered commands were logged more than this many seconds ago.
+        :param compression: If `"gzip"` or `"zlib"`, compress the log file. If None, the log file is a text file.
+        :param max_file_size: If greater than 0, start a new log file when the current log file is larger than this many bytes. The size is checked whenever the buffer is written, so log files can be slightly larger than this.
         """
 
         super().__init__()
+        if compression is not None and compression not in Logger.COMPRESSION_TYPES:
+            raise Exception(f"Invalid compression: {compression}")
         # If True, the build will log every message received and every command executed in the Player log.
         self._log_commands_in_build: bool = log_commands_in_build
-        # Get or create the playback file path.
-        if isinstance(path, str):
-            self._path: Path = Path(path)
-        else:
-            self._path: Path = path
-        if not self._path.parent.exists():
-            self._path.parent.mkdir(parents=True)
-        # Remove an existing log file.
-        if overwrite and self._path.exists():
-            self._path.unlink()
+        # Subclasses might read other output data in `on_send(resp)`, so only filter `resp` for this class.
+        if type(self) is Logger:
+            self.output_data_ids = {"logm"}
+        # The maximum size of the buffer in bytes.
+        self._buffer_size: int = buffer_size
+        # The maximum age of the buffer in seconds.
+        self._flush_interval: float = flush_interval
+        # The compression type, if any.
+        self._compression: Optional[str] = compression
+        # The maximum size of a log file in bytes.
+        self._max_file_size: int = max_file_size
+        # This is used to serialize commands, including numpy arrays and static commands.
+        self._serializer: CommandSerializer = CommandSerializer()
+        # The time at which the first buffered commands were logged.
+        self._buffer_time: float = 0
+        # The most recent frame number received from the build.
+        self._frame: int = 0
+        # The buffered commands and the log files.
+        self._writer: _LogWriter = _LogWriter(path=path, overwrite=overwrite, compression=compression,
+                                              max_file_size=max_file_size)
+        # Write the buffered commands when the logger is garbage-collected or when Python exits.
+        self._finalizer: finalize = finalize(self, self._writer.close)
 
     def on_send(self, resp: List[bytes]) -> None:
         for i in range(len(resp) - 1):
@@ -52,6 +91,8 @@ class Logger(AddOn):
             if r_id == "logm":
                 log = LogMessage(resp[i])
                 print(f"[FROM BUILD] {log.get_message_type()} from {log.get_object_type()}: {log.get_message()}")
+        # Remember the frame number for the index.
+        self._frame = int.from_bytes(resp[-1], byteorder="big")
 
     def get_initialization_commands(self) -> List[dict]:
         commands = [{"$type": "send_log_messages"}]
@@ -61,19 +102,198 @@ class Logger(AddOn):
         return commands
 
     def before_send(self, commands: List[dict]) -> None:
-        # Log the commands.
-        with self._path.open("at", encoding="utf-8") as f:
-            f.write(dumps(commands) + "\n")
+        # Buffer the commands.
+        line = self._serializer.serialize(commands) + b"\n"
+        now = time()
+        if len(self._writer.buffer) == 0:
+            self._buffer_time = now
+        self._writer.append(line=line, frame=self._frame, timestamp=now)
+        # Write the buffer.
+        if self._writer.buffered_size >= self._buffer_size or now - self._buffer_time >= self._flush_interval:
+            self.flush()
+        # Write the buffer before the build quits.
+        else:
+            for command in commands:
+                if command["$type"] == "terminate":
+                    self.flush()
+                    break
+
+    def flush(self) -> None:
+        """
+        Write the buffered commands to the log file.
+        """
+
+        self._writer.flush()
+
+    def close(self) -> None:
+        """
+        Write the buffered commands to the log file and close the log file. If more commands are logged, they will be appended to the log file. If the log file is already closed, this doesn't do anything.
+        """
+
+        self._writer.close()
 
     def reset(self, path: Union[str, Path], overwrite: bool = True) -> None:
         """
-        Reset the logger.
+        Reset the logger. The buffered commands will be written to the current log file, which will then be closed.
 
         :param path: The path to the log file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
         :param overwrite: If True and a log file already exists at `path`, overwrite the file.
         """
 
+        # Close the current log file.
+        self._finalizer()
         self.initialized = False
+        self._writer = _LogWriter(path=path, overwrite=overwrite, compression=self._compression,
+                                  max_file_size=self._max_file_size)
+        self._finalizer = finalize(self, self._writer.close)
+
+    @staticmethod
+    def get_paths(path: Union[str, Path]) -> List[Path]:
+        """
+        :param path: The path to the first log file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+
+        :return: The paths to each log file that exists, in order: `log.txt`, `log.txt.1`, `log.txt.2`, etc.
+        """
+
+        if isinstance(path, str):
+            path = Path(path)
+        paths = list()
+        while True:
+            p = Logger._get_path(path=path, file_index=len(paths))
+            if not p.exists():
+                return paths
+            paths.append(p)
+
+    @staticmethod
+    def read_index(path: Union[str, Path]) -> List[Tuple[int, float, int]]:
+        """
+        Read the index file of a log.
+
+        :param path: The path to the first log file (not the index file) as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+
+        :return: A list of tuples, one per line of the log: The build's frame number when the commands were sent, the time as a Unix timestamp, and the index of the log file.
+        """
+
+        if isinstance(path, str):
+            path = Path(path)
+        index = list()
+        for line in path.parent.joinpath(path.name + Logger.INDEX_EXTENSION).read_text().split("\n"):
+            if line != "":
+                frame, timestamp, file_index = line.split(" ")
+                index.append((int(frame), float(timestamp), int(file_index)))
+        return index
+
+    @staticmethod
+    def _get_path(path: Path, file_index: int) -> Path:
+        """
+        :param path: The path to the first log file.
+        :param file_index: The index of the log file.
+
+        :return: The path to the log file.
+        """
+
+        if file_index == 0:
+            return path
+        return path.parent.joinpath(f"{path.name}.{file_index}")
+
+
+class _LogWriter:
+    """
+    Buffer serialized commands and write them to the log files. This is separate from `Logger` so that it can be closed when the `Logger` is garbage-collected.
+    """
+
+    def __init__(self, path: Union[str, Path], overwrite: bool, compression: Optional[str], max_file_size: int):
+        """
+        :param path: The path to the log file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+        :param overwrite: If True and a log file already exists at `path`, overwrite the file.
+        :param compression: If `"gzip"` or `"zlib"`, compress the log file. If None, the log file is a text file.
+        :param max_file_size: If greater than 0, start a new log file when the current log file is larger than this many bytes.
+        """
+
+        # The compression type, if any.
+        self._compression: Optional[str] = compression
+        # The maximum size of a log file in bytes.
+        self._max_file_size: int = max_file_size
+        # The buffered lines of serialized commands.
+        self.buffer: List[bytes] = list()
+        # The size of the buffer in bytes.
+        self.buffered_size: int = 0
+        # The buffered lines of the index file: The frame number and the timestamp.
+        self._index_buffer: List[Tuple[int, float]] = list()
+        # The current log file.
+        self._file: Optional[BinaryIO] = None
+        # If `compression == "gzip"`, this wraps `self._file`.
+        self._gzip: Optional[GzipFile] = None
+        # If `compression == "zlib"`, this compresses data written to `self._file`.
+        self._zlib = None
+        # The index file.
+        self._index_file: Optional[TextIO] = None
+        # The index of the current log file.
+        self._file_index: int = 0
+        # The path to the first log file. This is set in `_set_path()`.
+        self._path: Path = Path()
+        self._set_path(path=path, overwrite=overwrite)
+
+    def append(self, line: bytes, frame: int, timestamp: float) -> None:
+        """
+        Buffer a line of serialized commands.
+
+        :param line: The serialized commands, including the trailing newline.
+        :param frame: The build's frame number.
+        :param timestamp: The time as a Unix timestamp.
+        """
+
+        self.buffer.append(line)
+        self.buffered_size += len(line)
+        self._index_buffer.append((frame, timestamp))
+
+    def flush(self) -> None:
+        """
+        Write the buffered commands to the log file.
+        """
+
+        if len(self.buffer) == 0:
+            return
+        if self._file is None:
+            self._open_file(append=True)
+        # Start a new log file.
+        elif self._max_file_size > 0 and self._file.tell() >= self._max_file_size:
+            self._close_file()
+            self._file_index += 1
+            self._open_file(append=False)
+        data = b"".join(self.buffer)
+        if self._gzip is not None:
+            self._gzip.write(data)
+            # Make the data readable without closing the file.
+            self._gzip.flush()
+        elif self._zlib is not None:
+            self._file.write(self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH))
+        else:
+            self._file.write(data)
+        self._file.flush()
+        self._index_file.write("".join([f"{frame} {round(timestamp, 6)} {self._file_index}\n"
+                                        for frame, timestamp in self._index_buffer]))
+        self._index_file.flush()
+        self.buffer.clear()
+        self._index_buffer.clear()
+        self.buffered_size = 0
+
+    def close(self) -> None:
+        """
+        Write the buffered commands to the log file and close the log file. If the log file is already closed, this doesn't do anything.
+        """
+
+        self.flush()
+        self._close_file()
+
+    def _set_path(self, path: Union[str, Path], overwrite: bool) -> None:
+        """
+        Set the path to the log file.
+
+        :param path: The path to the log file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+        :param overwrite: If True and a log file already exists at `path`, overwrite the file.
+        """
+
         # Get or create the playback file path.
         if isinstance(path, str):
             self._path = Path(path)
@@ -81,6 +301,48 @@ class Logger(AddOn):
             self._path = path
         if not self._path.parent.exists():
             self._path.parent.mkdir(parents=True)
-        # Delete an existing log.
-        if overwrite and self._path.exists():
-            self._path.unlink()
+        paths = Logger.get_paths(self._path)
+        # Remove an existing log file.
+        if overwrite:
+            for p in paths:
+                p.unlink()
+            index_path = self._path.parent.joinpath(self._path.name + Logger.INDEX_EXTENSION)
+            if index_path.exists():
+                index_path.unlink()
+            self._file_index = 0
+        # Append to the last log file.
+        else:
+            self._file_index = max(len(paths) - 1, 0)
+
+    def _open_file(self, append: bool) -> None:
+        """
+        Open the current log file and the index file.
+
+        :param append: If True, append to the log file if it exists.
+        """
+
+        self._file = Logger._get_path(path=self._path, file_index=self._file_index).open("ab" if append else "wb")
+        if self._compression == "gzip":
+            self._gzip = GzipFile(fileobj=self._file, mode="wb", compresslevel=6)
+        elif self._compression == "zlib":
+            self._zlib = zlib.compressobj(6)
+        if self._index_file is None:
+            self._index_file = self._path.parent.joinpath(self._path.name + Logger.INDEX_EXTENSION).open("at")
+
+    def _close_file(self) -> None:
+        """
+        Close the current log file and the index file.
+        """
+
+        if self._file is None:
+            return
+        if self._gzip is not None:
+            self._gzip.close()
+            self._gzip = None
+        elif self._zlib is not None:
+            self._file.write(self._zlib.flush(zlib.Z_FINISH))
+            self._zlib = None
+        self._file.close()
+        self._file = None
+        self._index_file.close()
+        self._index_file = None
@@ -1,7 +1,7 @@
 from typing import Dict, List
 import numpy as np
-from tdw.output_data import OutputData, Transforms, Rigidbodies, Bounds, SegmentationColors, Categories, \
-    StaticRigidbodies
+from tdw.output_data import Transforms, Rigidbodies, Bounds, SegmentationColors, Categories, StaticRigidbodies
+from tdw.frame_index import FrameIndex
 from tdw.add_ons.add_on import AddOn
 from tdw.object_data.object_static import ObjectStatic
 from tdw.object_data.transform import Transform
@@ -110,6 +110,9 @@ class ObjectManager(AddOn):
         self._send_transforms: str = "always" if transforms else "never"
         self._send_rigidbodies: str = "always" if rigidbodies else "never"
         self._send_bounds: str = "always" if bounds else "once"
+        # Subclasses might read other output data in `on_send(resp)`, so only filter `resp` for this class.
+        if type(self) is ObjectManager:
+            self.output_data_ids = {"segm", "boun", "srig", "cate", "tran", "rigi"}
         """:field
         [The static object data.](../object_data/object_static.md) Key = The ID of the object.
         """
@@ -143,6 +146,7 @@ class ObjectManager(AddOn):
                  "frequency": self._send_transforms}]
 
     def on_send(self, resp: List[bytes]) -> None:
+        frame_index = FrameIndex.get(resp)
         # Cache static data.
         if not self._cached_static_data:
             self._cached_static_data = True
@@ -152,34 +156,32 @@ class ObjectManager(AddOn):
             static_rigidbodies: Dict[int, _StaticRigidbody] = dict()
             sizes: Dict[int, np.ndarray] = dict()
             categories: Dict[int, str] = dict()
-            for i in range(len(resp) - 1):
-                r_id = OutputData.get_data_type_id(resp[i])
-                # Get the name and the segmentation color.
-                if r_id == "segm":
-                    segm = SegmentationColors(resp[i])
-                    for j in range(segm.get_num()):
-                        object_id = segm.get_object_id(j)
-                        segmentation_colors[object_id] = np.array(segm.get_object_color(j))
-                        names[object_id] = segm.get_object_name(j).lower()
-                        categories[object_id] = segm.get_object_category(j)
-                elif r_id == "boun":
-                    boun = Bounds(resp[i])
-                    for j in range(boun.get_num()):
-                        sizes[boun.get_id(j)] = np.array([float(np.abs(boun.get_right(j)[0] - boun.get_left(j)[0])),
-                                                          float(np.abs(boun.get_top(j)[1] - boun.get_bottom(j)[1])),
-                                                          float(np.abs(boun.get_front(j)[2] - boun.get_back(j)[2]))])
-                elif r_id == "srig":
-                    srig = StaticRigidbodies(resp[i])
-                    for j in range(srig.get_num()):
-                        static_rigidbodies[srig.get_id(j)] = _StaticRigidbody(mass=srig.get_mass(j),
-                                                                              kinematic=srig.get_kinematic(j),
-                                                                              dynamic_friction=srig.get_dynamic_friction(j),
-                                                                              static_friction=srig.get_static_friction(j),
-                                                                              bounciness=srig.get_bounciness(j))
-                elif r_id == "cate":
-                    cate = Categories(resp[i])
-                    for j in range(cate.get_num_categories()):
-                        self.categories[cate.get_category_name(j)] = np.array(cate.get_category_color(j))
+            # Get the name and the segmentation color.
+            segm: SegmentationColors
+            for segm in frame_index.get_output_data("segm"):
+                for j in range(segm.get_num()):
+                    object_id = segm.get_object_id(j)
+                    segmentation_colors[object_id] = np.array(segm.get_object_color(j))
+                    names[object_id] = segm.get_object_name(j).lower()
+                    categories[object_id] = segm.get_object_category(j)
+            boun: Bounds
+            for boun in frame_index.get_output_data("boun"):
+                for j in range(boun.get_num()):
+                    sizes[boun.get_id(j)] = np.array([float(np.abs(boun.get_right(j)[0] - boun.get_left(j)[0])),
+                                                      float(np.abs(boun.get_top(j)[1] - boun.get_bottom(j)[1])),
+                                                      float(np.abs(boun.get_front(j)[2] - boun.get_back(j)[2]))])
+            srig: StaticRigidbodies
+            for srig in frame_index.get_output_data("srig"):
+                for j in range(srig.get_num()):
+                    static_rigidbodies[srig.get_id(j)] = _StaticRigidbody(mass=srig.get_mass(j),
+                                                                          kinematic=srig.get_kinematic(j),
+                                                                          dynamic_friction=srig.get_dynamic_friction(j),
+                                                                          static_friction=srig.get_static_friction(j),
+                                                                          bounciness=srig.get_bounciness(j))
+            cate: Categories
+            for cate in frame_index.get_output_data("cate"):
+                for j in range(cate.get_num_categories()):
+                    self.categories[cate.get_category_name(j)] = np.array(cate.get_category_color(j))
             # Cache the sorted data.
             for object_id in segmentation_colors:
                 self.objects_static[object_id] = ObjectStatic(object_id=object_id,
@@ -196,30 +198,28 @@ class ObjectManager(AddOn):
         self.transforms.clear()
         self.rigidbodies.clear()
         self.bounds.clear()
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            if r_id == "tran":
-                tran = Transforms(resp[i])
-                for j in range(tran.get_num()):
-                    self.transforms[tran.get_id(j)] = Transform(position=tran.get_position(j),
-                                                                rotation=tran.get_rotation(j),
-                                                                forward=tran.get_forward(j))
-            elif r_id == "rigi":
-                rigi = Rigidbodies(resp[i])
-                for j in range(rigi.get_num()):
-                    self.rigidbodies[rigi.get_id(j)] = Rigidbody(velocity=rigi.get_velocity(j),
-                                                                 angular_velocity=rigi.get_angular_velocity(j),
-                                                                 sleeping=rigi.get_sleeping(j))
-            elif r_id == "boun":
-                boun = Bounds(resp[i])
-                for j in range(boun.get_num()):
-                    self.bounds[boun.get_id(j)] = Bound(front=boun.get_front(j),
-                                                        back=boun.get_back(j),
-                                                        left=boun.get_left(j),
-                                                        right=boun.get_right(j),
-                                                        top=boun.get_top(j),
-                                                        bottom=boun.get_bottom(j),
-                                                        center=boun.get_center(j))
+        tran: Transforms
+        for tran in frame_index.get_output_data("tran"):
+            for j in range(tran.get_num()):
+                self.transforms[tran.get_id(j)] = Transform(position=tran.get_position(j),
+                                                            rotation=tran.get_rotation(j),
+                                                            forward=tran.get_forward(j))
+        rigi: Rigidbodies
+        for rigi in frame_index.get_output_data("rigi"):
+            for j in range(rigi.get_num()):
+                self.rigidbodies[rigi.get_id(j)] = Rigidbody(velocity=rigi.get_velocity(j),
+                                                             angular_velocity=rigi.get_angular_velocity(j),
+                                                             sleeping=rigi.get_sleeping(j))
+        boun: Bounds
+        for boun in frame_index.get_output_data("boun"):
+            for j in range(boun.get_num()):
+                self.bounds[boun.get_id(j)] = Bound(front=boun.get_front(j),
+                                                    back=boun.get_back(j),
+                                                    left=boun.get_left(j),
+                                                    right=boun.get_right(j),
+                                                    top=boun.get_top(j),
+                                                    bottom=boun.get_bottom(j),
+                                                    center=boun.get_center(j))
 
     def reset(self) -> None:
         """
@@ -1,29 +1,77 @@
 from base64 import b64encode, b64decode
 from json import loads, dumps
-from typing import List, Union
+from typing import List, Union, Optional
 from pathlib import Path
 from tdw.add_ons.writer import Writer
+from tdw.episode_file.episode_file_writer import EpisodeFileWriter
+from tdw.episode_file.episode_file_reader import EpisodeFileReader
 
 
 class OutputDataWriter(Writer[List[bytes]]):
     """
     Save raw output byte data to disk per frame. This data is encoded into base64 strings and saved as text files.
+
+    If `binary=True`, every frame is instead appended to a single binary episode file, `episode.tdwe`, in the output directory. This is faster, smaller, and doesn't create one file per frame. Call `close()` at the end of the episode to write the episode file's index. After `reset()`, the next frame starts a new episode file that overwrites the previous one. To read the episode file, use an [`EpisodeFileReader`](../episode_file/episode_file_reader.md).
+
+    To convert per-frame text files to an episode file, call `OutputDataWriter.convert(directory, path)`.
     """
 
+    """:class_var
+    The name of the episode file in the output directory if `binary=True`.
+    """
+    EPISODE_FILENAME: str = "episode.tdwe"
+
+    def __init__(self, output_directory: Union[str, Path], zero_padding: int = 8, binary: bool = False):
+        """
+        :param output_directory: The root output directory as a string or [`Path`](https://docs.python.org/3/library/pathlib.html). If this doesn't exist, it will be created.
+        :param zero_padding: How many zeros to append to the file name. By default, the name of the file of the first frame will be `00000000.txt`. Ignored if `binary=True`.
+        :param binary: If True, append every frame to a single binary episode file rather than saving each frame as a text file.
+        """
+
+        super().__init__(output_directory=output_directory, zero_padding=zero_padding)
+        """:field
+        If True, every frame is appended to a single binary episode file.
+        """
+        self.binary: bool = binary
+        # The writer of the episode file.
+        self._episode_file_writer: Optional[EpisodeFileWriter] = None
+        # The reader of the episode file. This is created the first time that a frame is read.
+        self._episode_file_reader: Optional[EpisodeFileReader] = None
+
     def on_send(self, resp: List[bytes]) -> None:
-        # Encode `resp` to base64 and save it to a file named after the frame number.
-        self._get_path(self._frame_count).write_text(dumps([b64encode(r).decode("ascii") for r in resp]))
+        if self.binary:
+            # Start a new episode file after `reset()`.
+            if self._frame_count == 0 and self._episode_file_writer is not None:
+                self.close()
+            if self._episode_file_writer is None:
+                self._episode_file_writer = EpisodeFileWriter(path=self.output_directory.joinpath(OutputDataWriter.EPISODE_FILENAME),
+                                                              overwrite=self._frame_count == 0)
+            self._episode_file_writer.write(resp)
+        else:
+            # Encode `resp` to base64 and save it to a file named after the frame number.
+            self._get_path(self._frame_count).write_text(dumps([b64encode(r).decode("ascii") for r in resp]))
         self._frame_count += 1
 
     def read(self, path: Union[str, Path, int]) -> List[bytes]:
         """
         Read saved ouput data.
 
-        :param path: The path to the frame file. This can be a string or [`Path`](https://docs.python.org/3/library/pathlib.html) file path or an integer. If this is an integer, it represents the frame number; the file is assumed to be in `self.output_directory`.
+        :param path: The path to the frame file. This can be a string or [`Path`](https://docs.python.org/3/library/pathlib.html) file path or an integer. If this is an integer, it represents the frame number; the file is assumed to be in `self.output_directory`. If `binary=True`, this must be an integer.
 
         :return: A list of bytes that was saved as base64 data, equivalent to the return value of a `c.communicate(commands)` call (i.e. `resp` as it usually appears in our example controllers).
         """
 
+        if self.binary:
+            if not isinstance(path, int):
+                raise Exception(path)
+            if self._episode_file_writer is not None:
+                self._episode_file_writer.flush()
+            # Read the episode file again if frames were added since it was last read.
+            if self._episode_file_reader is None or self._episode_file_reader.get_num_frames() <= path:
+                if self._episode_file_reader is not None:
+                    self._episode_file_reader.close()
+                self._episode_file_reader = EpisodeFileReader(path=self.output_directory.joinpath(OutputDataWriter.EPISODE_FILENAME))
+            return [bytes(r) for r in self._episode_file_reader.get_frame(path)]
         if isinstance(path, str):
             text = Path(path).read_text()
         elif isinstance(path, Path):
@@ -34,6 +82,40 @@ class OutputDataWriter(Writer[List[bytes]]):
             raise Exception(path)
         return [b64decode(r) for r in loads(text)]
 
+    def close(self) -> None:
+        """
+        If `binary=True`, write the index of the episode file and close it. Frames sent after this is called will be appended to the same episode file unless `reset()` was called.
+        """
+
+        if self._episode_file_writer is not None:
+            self._episode_file_writer.close()
+            self._episode_file_writer = None
+        if self._episode_file_reader is not None:
+            self._episode_file_reader.close()
+            self._episode_file_reader = None
+
+    @staticmethod
+    def convert(directory: Union[str, Path], path: Union[str, Path]) -> int:
+        """
+        Convert per-frame text files saved by an `OutputDataWriter` to a binary episode file.
+
+        :param directory: The directory of the text files as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+        :param path: The path to the episode file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html). If the file exists, it will be overwritten.
+
+        :return: The number of frames.
+        """
+
+        if isinstance(directory, str):
+            directory = Path(directory)
+        # Sort the files by frame number.
+        paths = sorted([p for p in directory.iterdir() if p.suffix == ".txt" and p.stem.isdigit()],
+                       key=lambda p: int(p.stem))
+        writer = EpisodeFileWriter(path=path, overwrite=True)
+        for p in paths:
+            writer.write([b64decode(r) for r in loads(p.read_text())])
+        writer.close()
+        return len(paths)
+
     def _get_path(self, frame_number: int) -> Path:
         """
         :param frame_number: The frame number.
@@ -11,6 +11,7 @@ import scipy.signal as sg
 from scipy.ndimage import gaussian_filter1d, uniform_filter1d
 from pydub import AudioSegment
 from tdw.tdw_utils import TDWUtils
+from tdw.controller import Controller
 from tdw.librarian import ModelRecord
 from tdw.output_data import OutputData, Rigidbodies, StaticRobot, SegmentationColors, StaticRigidbodies, \
     RobotJointVelocities, StaticOculusTouch, AudioSourceDone, Bounds
@@ -26,6 +27,7 @@ from tdw.physics_audio.scrape_material import ScrapeMaterial
 from tdw.object_data.rigidbody import Rigidbody
 from tdw.audio_constants import SAMPLE_RATE, CHANNELS, SAMPLE_WIDTH
 from tdw.add_ons.collision_manager import CollisionManager
+from tdw.frame_index import FrameIndex
 from tdw.librarian import MaterialLibrarian
 
 
@@ -286,14 +288,13 @@ class PyImpact(CollisionManager):
         # Don't automatically generate audio.
         if not self.auto:
             return
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            # Mark this audio source as done.
-            if r_id == "ausd":
-                audio_source_id = AudioSourceDone(resp[i]).get_id()
-                # The audio source might not be in this dictionary (for example if this was a scrape event).
-                if audio_source_id in self._impact_events:
-                    del self._impact_events[audio_source_id]
+        # Mark audio sources as done.
+        audio_source_done: AudioSourceDone
+        for audio_source_done in FrameIndex.get(resp).get_output_data("ausd"):
+            audio_source_id = audio_source_done.get_id()
+            # The audio source might not be in this dictionary (for example if this was a scrape event).
+            if audio_source_id in self._impact_events:
+                del self._impact_events[audio_source_id]
         # Get collision events.
         self._get_collision_types(resp=resp)
         for object_id in self.collision_events:
@@ -383,22 +384,21 @@ class PyImpact(CollisionManager):
         # Clear the collision events.
         self.collision_events.clear()
         rigidbody_data: Dict[int, Rigidbody] = dict()
-        for i in range(len(resp) - 1):
-            r_id = OutputData.get_data_type_id(resp[i])
-            # Get rigidbody data.
-            if r_id == "rigi":
-                rigidbodies = Rigidbodies(resp[i])
-                for j in range(rigidbodies.get_num()):
-                    rigidbody_data[rigidbodies.get_id(j)] = Rigidbody(velocity=rigidbodies.get_velocity(j),
-                                                                      angular_velocity=rigidbodies.get_angular_velocity(j),
-                                                                      sleeping=rigidbodies.get_sleeping(j))
-            # Get robot joint velocity data.
-            elif r_id == "rojv":
-                robot_joint_velocities = RobotJointVelocities(resp[i])
-                for j in range(robot_joint_velocities.get_num_joints()):
-                    rigidbody_data[robot_joint_velocities.get_joint_id(j)] = Rigidbody(velocity=robot_joint_velocities.get_joint_velocity(j),
-                                                                                       angular_velocity=robot_joint_velocities.get_joint_angular_velocity(j),
-                                                                                       sleeping=robot_joint_velocities.get_joint_sleeping(j))
+        frame_index = FrameIndex.get(resp)
+        # Get rigidbody data.
+        rigidbodies: Rigidbodies
+        for rigidbodies in frame_index.get_output_data("rigi"):
+            for j in range(rigidbodies.get_num()):
+                rigidbody_data[rigidbodies.get_id(j)] = Rigidbody(velocity=rigidbodies.get_velocity(j),
+                                                                  angular_velocity=rigidbodies.get_angular_velocity(j),
+                                                                  sleeping=rigidbodies.get_sleeping(j))
+        # Get robot joint velocity data.
+        robot_joint_velocities: RobotJointVelocities
+        for robot_joint_velocities in frame_index.get_output_data("rojv"):
+            for j in range(robot_joint_velocities.get_num_joints()):
+                rigidbody_data[robot_joint_velocities.get_joint_id(j)] = Rigidbody(velocity=robot_joint_velocities.get_joint_velocity(j),
+                                                                                   angular_velocity=robot_joint_velocities.get_joint_angular_velocity(j),
+                                                                                   sleeping=robot_joint_velocities.get_joint_sleeping(j))
         # Get collision data.
         for object_ids in self.obj_collisions:
             collider_id = object_ids.int1
@@ -1056,7 +1056,7 @@ class PyImpact(CollisionManager):
                             name=self._scrape_objects[object_id].visual_material)
                         self.commands.append({"$type": "add_material",
                                               "name": material_record.name,
-                                              "url": material_record.get_url()})
+                                              "url": Controller.get_asset_bundle_url(material_record.get_url())})
                         # Set the visual material.
                         for sub_object in self._scrape_objects[object_id].sub_objects:
                             self.commands.append({"$type": "set_visual_material",
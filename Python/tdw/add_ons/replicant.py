@@ -114,7 +114,7 @@ class Replicant(AddOn):
                      "name": self._record.name,
                      "position": self.initial_position,
                      "rotation": self.initial_rotation,
-                     "url": self._record.get_url(),
+                     "url": Controller.get_asset_bundle_url(self._record.get_url()),
                      "id": self.replicant_id},
                     {"$type": "add_replicant_rigidbody",
                      "id": self.replicant_id},
@@ -0,0 +1,120 @@
+from pathlib import Path
+from typing import List, Union, Optional
+from weakref import finalize
+from tdw.add_ons.add_on import AddOn
+from tdw.episode_file.episode_file_writer import EpisodeFileWriter
+from tdw.episode_file.episode_file_reader import EpisodeFileReader
+
+
+class ResponseRecorder(AddOn):
+    """
+    Record every response from the build to a single binary episode file. The recording can be replayed without a build by a [`ReplayBuild`](../replay_build.md).
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.tdw_utils import TDWUtils
+    from tdw.add_ons.object_manager import ObjectManager
+    from tdw.add_ons.response_recorder import ResponseRecorder
+
+    c = Controller()
+    c.add_ons.extend([ObjectManager(), ResponseRecorder(path="recording.tdwe")])
+    c.communicate([TDWUtils.create_empty_room(12, 12),
+                   c.get_add_object(model_name="rh10", object_id=0)])
+    for i in range(100):
+        c.communicate([])
+    c.communicate({"$type": "terminate"})
+    ```
+
+    The recording is written by an [`EpisodeFileWriter`](../episode_file/episode_file_writer.md), so it has the same file format as an [`OutputDataWriter`](output_data_writer.md) with `binary=True` and can also be read by an [`EpisodeFileReader`](../episode_file/episode_file_reader.md).
+
+    The recording file is opened once and frames are buffered in memory. The buffer is written to the file when it is larger than `buffer_size`, when the `terminate` command is sent, when `flush()` or `close()` is called, and when the recorder is garbage-collected or the Python process exits.
+    """
+
+    def __init__(self, path: Union[str, Path], overwrite: bool = True, buffer_size: int = 1048576):
+        """
+        :param path: The path to the recording file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+        :param overwrite: If True and a recording file already exists at `path`, overwrite the file. If False, append frames to the existing file.
+        :param buffer_size: Write the buffered frames to the recording file when the buffer is larger than this many bytes.
+        """
+
+        super().__init__()
+        self.initialized = True
+        if isinstance(path, str):
+            """:field
+            The path to the recording file.
+            """
+            self.path: Path = Path(path)
+        else:
+            self.path: Path = path
+        if not self.path.parent.exists():
+            self.path.parent.mkdir(parents=True)
+        # Remove an existing recording.
+        if overwrite and self.path.exists():
+            self.path.unlink()
+        """:field
+        The number of frames recorded so far.
+        """
+        self.num_frames: int = 0
+        # The size of the write buffer in bytes.
+        self._buffer_size: int = buffer_size
+        # The writer of the recording file. This is created when the first frame is recorded.
+        self._writer: Optional[EpisodeFileWriter] = None
+        # This closes the recording file when the recorder is garbage-collected or when Python exits.
+        self._finalizer: Optional[finalize] = None
+        # If True, the `terminate` command was sent this frame.
+        self._terminate: bool = False
+
+    def get_initialization_commands(self) -> List[dict]:
+        return []
+
+    def before_send(self, commands: List[dict]) -> None:
+        for command in commands:
+            if command["$type"] == "terminate":
+                self._terminate = True
+                break
+
+    def on_send(self, resp: List[bytes]) -> None:
+        if self._writer is None:
+            self._writer = EpisodeFileWriter(path=self.path, overwrite=False, buffer_size=self._buffer_size)
+            self._finalizer = finalize(self, self._writer.close)
+        self._writer.write(resp)
+        self.num_frames += 1
+        # Write the buffer before the build quits.
+        if self._terminate:
+            self._terminate = False
+            self.close()
+
+    def flush(self) -> None:
+        """
+        Write the buffered frames to the recording file.
+        """
+
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self) -> None:
+        """
+        Write the buffered frames and the index to the recording file and close the recording file. If more frames are recorded, they will be appended to the recording file.
+        """
+
+        if self._writer is None:
+            return
+        self._finalizer.detach()
+        self._finalizer = None
+        self._writer.close()
+        self._writer = None
+
+    @staticmethod
+    def read(path: Union[str, Path]) -> List[List[bytes]]:
+        """
+        Read a recording file.
+
+        :param path: The path to the recording file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+
+        :return: A list of responses. Each response is a list of bytes, equivalent to the return value of a `c.communicate(commands)` call.
+        """
+
+        reader = EpisodeFileReader(path=path)
+        frames: List[List[bytes]] = [[bytes(r) for r in resp] for resp in reader]
+        reader.close()
+        return frames
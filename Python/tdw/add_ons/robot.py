@@ -76,14 +76,14 @@ class Robot(RobotBase):
             if "robots.json" not in Controller.ROBOT_LIBRARIANS:
                 Controller.ROBOT_LIBRARIANS["robots.json"] = RobotLibrarian()
             self._record = Controller.ROBOT_LIBRARIANS["robots.json"].get_record(name)
-            self.url = self._record.get_url()
+            self.url = Controller.get_asset_bundle_url(self._record.get_url())
             self._initial_targets = self._record.targets
         elif isinstance(source, RobotLibrarian):
             self._record = source.get_record(name)
-            self.url = self._record.get_url()
+            self.url = Controller.get_asset_bundle_url(self._record.get_url())
             self._initial_targets = self._record.targets
         elif isinstance(source, RobotRecord):
-            self.url = source.get_url()
+            self.url = Controller.get_asset_bundle_url(source.get_url())
             self._initial_targets = source.targets
         elif isinstance(source, str):
             self.url = source
@@ -97,7 +97,7 @@ class Vehicle(AddOn):
         commands = [{"$type": "add_vehicle", 
                      "id": self.vehicle_id,
                      "name": self._name,
-                     "url": self._record.get_url(), 
+                     "url": Controller.get_asset_bundle_url(self._record.get_url()), 
                      "position": self.initial_position,
                      "rotation": self.initial_rotation,
                      "forward_speed": self._forward_speed,
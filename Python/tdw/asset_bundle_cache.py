@@ -0,0 +1,338 @@
+from os import getpid, utime
+from time import time
+from pathlib import Path
+from hashlib import sha1, sha256
+from threading import Lock, get_ident
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import List, Dict, Set, Optional, Union
+from tdw.backend.paths import ASSET_BUNDLE_CACHE_DIRECTORY
+from tdw.asset_bundle_downloader import AssetBundleDownloader
+
+
+class AssetBundleCache:
+    """
+    A content-addressed cache of asset bundles on the local disk.
+
+    Asset bundles are stored by the SHA-256 hash of their contents, so identical asset bundles are stored only once. Each URL maps to the hash of the asset bundle that was downloaded from it. The cache can be shared by every controller and build on the same machine; files are always written to a temporary file first and then moved into place.
+
+    When the total size of the cached asset bundles is greater than `max_size`, the least recently used asset bundles are deleted. Asset bundles that were used less than `min_age` seconds ago are never deleted, because a command that hasn't been sent yet might have their `file:///` URLs. This means that the cache can be temporarily larger than `max_size`.
+
+    To use the cache in `Controller.get_add_object()`, `Controller.get_add_scene()`, etc., set `Controller.ASSET_BUNDLE_CACHE`. Commands will use the `file:///` URL of the cached asset bundle if there is one. If there isn't, the command will use the remote URL and, by default, the asset bundle will be downloaded into the cache in the background so that it's cached the next time it's needed:
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.tdw_utils import TDWUtils
+    from tdw.asset_bundle_cache import AssetBundleCache
+
+    Controller.ASSET_BUNDLE_CACHE = AssetBundleCache()
+    c = Controller()
+    c.communicate([TDWUtils.create_empty_room(12, 12),
+                   c.get_add_object(model_name="iron_box", object_id=c.get_unique_id())])
+    ```
+
+    To download asset bundles before they're needed, call `prefetch(commands)` and then `wait()`. To rewrite the URLs of commands that weren't created by the controller, call `rewrite(commands)`.
+    """
+
+    def __init__(self, directory: Union[str, Path] = ASSET_BUNDLE_CACHE_DIRECTORY, max_size: int = 53687091200,
+                 max_workers: int = 4, prefetch_on_miss: bool = True, min_age: float = 600):
+        """
+        :param directory: The root directory of the cache.
+        :param max_size: The maximum total size of the cached asset bundles in bytes.
+        :param max_workers: The maximum number of asset bundles that are downloaded at the same time.
+        :param prefetch_on_miss: If True, `get_url(url)` downloads the asset bundle into the cache in the background if it isn't cached.
+        :param min_age: Asset bundles that were used less than this many seconds ago won't be evicted.
+        """
+
+        if isinstance(directory, str):
+            directory = Path(directory)
+        """:field
+        The root directory of the cache.
+        """
+        self.directory: Path = directory
+        """:field
+        The maximum total size of the cached asset bundles in bytes.
+        """
+        self.max_size: int = max_size
+        """:field
+        If True, `get_url(url)` downloads the asset bundle into the cache in the background if it isn't cached.
+        """
+        self.prefetch_on_miss: bool = prefetch_on_miss
+        """:field
+        Asset bundles that were used less than this many seconds ago won't be evicted.
+        """
+        self.min_age: float = min_age
+        # The asset bundles, named by the hash of their contents.
+        self._objects_directory: Path = directory.joinpath("objects")
+        # Each file is named by the hash of a URL and contains the hash of the asset bundle.
+        self._urls_directory: Path = directory.joinpath("urls")
+        # Downloads and index files are written here first.
+        self._temp_directory: Path = directory.joinpath("tmp")
+        for d in [self._objects_directory, self._urls_directory, self._temp_directory]:
+            d.mkdir(parents=True, exist_ok=True)
+        # Key = A URL. Value = The hash of the asset bundle.
+        self._hashes: Dict[str, str] = dict()
+        # Key = A URL. Value = The future of a download that hasn't finished yet.
+        self._pending: Dict[str, Future] = dict()
+        # URLs that couldn't be downloaded. These won't be prefetched again.
+        self._failed: Set[str] = set()
+        # This lock is used when reading or modifying `self._pending` and `self._failed`.
+        self._pending_lock: Lock = Lock()
+        # This lock is used to evict asset bundles in only one thread at a time.
+        self._evict_lock: Lock = Lock()
+        # The asset bundle downloader.
+        self._downloader: AssetBundleDownloader = AssetBundleDownloader(max_workers=max_workers)
+        # Download asset bundles in the background.
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def get_path(self, url: str) -> Optional[Path]:
+        """
+        :param url: The URL of an asset bundle.
+
+        :return: The path to the cached asset bundle, or None if it isn't cached.
+        """
+
+        if url in self._hashes:
+            content_hash = self._hashes[url]
+        else:
+            try:
+                content_hash = self._get_index_path(url).read_text(encoding="utf-8")
+            except OSError:
+                return None
+            self._hashes[url] = content_hash
+        object_path = self._objects_directory.joinpath(content_hash)
+        # Mark the asset bundle as recently used.
+        try:
+            utime(object_path)
+        # The asset bundle was evicted.
+        except OSError:
+            self._hashes.pop(url, None)
+            return None
+        return object_path
+
+    def get_url(self, url: str) -> str:
+        """
+        :param url: The URL of an asset bundle.
+
+        :return: The `file:///` URL of the cached asset bundle. If it isn't cached, this returns `url`. If `self.prefetch_on_miss == True`, the asset bundle will be downloaded into the cache in the background.
+        """
+
+        if not AssetBundleCache._is_remote(url):
+            return url
+        path = self.get_path(url)
+        if path is None:
+            if self.prefetch_on_miss:
+                self.prefetch_url(url)
+            return url
+        return "file:///" + str(path.resolve()).replace("\\", "/")
+
+    def rewrite(self, commands: List[dict]) -> List[dict]:
+        """
+        Replace the `"url"` parameter of each command with the `file:///` URL of the cached asset bundle, if there is one. The commands are modified in place.
+
+        :param commands: A list of commands.
+
+        :return: The commands.
+        """
+
+        for command in commands:
+            if "url" in command and isinstance(command["url"], str):
+                command["url"] = self.get_url(command["url"])
+        return commands
+
+    def add(self, url: str) -> Path:
+        """
+        Download an asset bundle into the cache. This blocks until the download is done.
+
+        :param url: The URL of the asset bundle.
+
+        :return: The path to the cached asset bundle.
+        """
+
+        path = self.get_path(url)
+        if path is not None:
+            return path
+        url_hash = sha1(url.encode("utf-8")).hexdigest()
+        temp_path = self._temp_directory.joinpath(f"{url_hash}.{getpid()}.{get_ident()}")
+        try:
+            self._downloader.download(url=url, path=temp_path)
+        # The partial download can't be resumed because the next download will have a different temporary path.
+        except BaseException:
+            part_path = AssetBundleDownloader.get_part_path(temp_path)
+            if part_path.exists():
+                part_path.unlink()
+            raise
+        # Get the hash of the contents.
+        hasher = sha256()
+        with temp_path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1048576), b""):
+                hasher.update(chunk)
+        content_hash = hasher.hexdigest()
+        object_path = self._objects_directory.joinpath(content_hash)
+        # An identical asset bundle is already cached. Mark it as recently used so that it isn't evicted.
+        if object_path.exists():
+            temp_path.unlink()
+            utime(object_path)
+        else:
+            temp_path.replace(object_path)
+        # Write the index file.
+        temp_index_path = self._temp_directory.joinpath(f"{url_hash}.{getpid()}.{get_ident()}.url")
+        temp_index_path.write_text(content_hash, encoding="utf-8")
+        temp_index_path.replace(self._get_index_path(url))
+        self._hashes[url] = content_hash
+        self.evict()
+        return object_path
+
+    def prefetch_url(self, url: str) -> Optional[Future]:
+        """
+        Download an asset bundle into the cache in the background.
+
+        :param url: The URL of the asset bundle.
+
+        :return: The future of the download. If the asset bundle is already cached or the URL isn't remote, this returns None.
+        """
+
+        if not AssetBundleCache._is_remote(url):
+            return None
+        with self._pending_lock:
+            if url in self._pending:
+                return self._pending[url]
+            if url in self._failed:
+                return None
+            if self.get_path(url) is not None:
+                return None
+            future = self._executor.submit(self.add, url)
+            self._pending[url] = future
+        future.add_done_callback(lambda f: self._on_download_done(url, f))
+        return future
+
+    def prefetch(self, commands: List[dict]) -> List[Future]:
+        """
+        Download every asset bundle referenced by a list of commands into the cache in the background.
+
+        :param commands: A list of commands. Asset bundles are referenced by the `"url"` parameter.
+
+        :return: The future of each download.
+        """
+
+        futures: List[Future] = list()
+        for command in commands:
+            if "url" in command and isinstance(command["url"], str):
+                future = self.prefetch_url(command["url"])
+                if future is not None:
+                    futures.append(future)
+        return futures
+
+    def wait(self) -> None:
+        """
+        Wait for every background download to finish.
+        """
+
+        with self._pending_lock:
+            futures = list(self._pending.values())
+        wait(futures)
+
+    def get_size(self) -> int:
+        """
+        :return: The total size of the cached asset bundles in bytes.
+        """
+
+        size: int = 0
+        for path in self._objects_directory.iterdir():
+            try:
+                size += path.stat().st_size
+            except OSError:
+                continue
+        return size
+
+    def evict(self) -> int:
+        """
+        Delete the least recently used asset bundles until the total size of the cache is less than or equal to `self.max_size`. Asset bundles that were used less than `self.min_age` seconds ago aren't deleted. The index files of the URLs of deleted asset bundles are deleted too, as are temporary files that haven't been modified for `self.min_age` seconds (for example, partial downloads of a process that crashed).
+
+        :return: The number of bytes that were deleted.
+        """
+
+        with self._evict_lock:
+            min_mtime = time() - self.min_age
+            # Delete abandoned temporary files.
+            for path in self._temp_directory.iterdir():
+                try:
+                    if path.stat().st_mtime < min_mtime:
+                        path.unlink()
+                except OSError:
+                    continue
+            objects = list()
+            size: int = 0
+            for path in self._objects_directory.iterdir():
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                objects.append((stat.st_mtime, stat.st_size, path))
+                size += stat.st_size
+            deleted: int = 0
+            if size <= self.max_size:
+                return deleted
+            # Sort by the time of the most recent use.
+            objects.sort(key=lambda o: o[0])
+            deleted_hashes: Set[str] = set()
+            for mtime, object_size, path in objects:
+                # Every remaining asset bundle was used recently, possibly by a command that hasn't been sent yet.
+                if size - deleted <= self.max_size or mtime > min_mtime:
+                    break
+                try:
+                    path.unlink()
+                # Another process already deleted this asset bundle.
+                except OSError:
+                    continue
+                deleted += object_size
+                deleted_hashes.add(path.name)
+            # Delete the index files of the URLs of the deleted asset bundles.
+            if len(deleted_hashes) > 0:
+                for path in self._urls_directory.iterdir():
+                    try:
+                        if path.read_text(encoding="utf-8") in deleted_hashes:
+                            path.unlink()
+                    except OSError:
+                        continue
+                for url in [u for u in self._hashes if self._hashes[u] in deleted_hashes]:
+                    self._hashes.pop(url, None)
+            return deleted
+
+    def close(self) -> None:
+        """
+        Wait for every background download to finish and then stop the background threads.
+        """
+
+        self._executor.shutdown(wait=True)
+        self._downloader.close()
+
+    def _get_index_path(self, url: str) -> Path:
+        """
+        :param url: The URL of an asset bundle.
+
+        :return: The path to the index file of the URL.
+        """
+
+        return self._urls_directory.joinpath(sha1(url.encode("utf-8")).hexdigest())
+
+    def _on_download_done(self, url: str, future: Future) -> None:
+        """
+        :param url: The URL of a finished download.
+        :param future: The future of the download.
+        """
+
+        with self._pending_lock:
+            if url in self._pending:
+                del self._pending[url]
+            if future.exception() is not None:
+                self._failed.add(url)
+
+    @staticmethod
+    def _is_remote(url: str) -> bool:
+        """
+        :param url: A URL.
+
+        :return: True if the URL is an http or https URL.
+        """
+
+        return url.startswith("https://") or url.startswith("http://")
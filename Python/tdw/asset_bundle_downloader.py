@@ -0,0 +1,271 @@
+from pathlib import Path
+from threading import Lock
+from time import sleep
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Tuple, Union, Optional, Iterable
+
+
+class AssetBundleDownloader:
+    """
+    Download asset bundles in parallel.
+
+    - Each asset bundle is downloaded in a thread pool. Every thread shares the same HTTP session, so connections to the server are reused.
+    - Each asset bundle is streamed in chunks to a temporary `.part` file, which replaces the asset bundle file when the download is complete. If a download is interrupted, the next download of the same asset bundle resumes from the end of the `.part` file.
+    - If the expected size of the asset bundle is known (`record.asset_bundle_sizes`), the downloaded file is verified against it.
+    - If a download fails, it is retried with exponential backoff.
+
+    Asset bundles in tdw-private are downloaded with boto3, which requires valid S3 credentials; see `TDWUtils.validate_amazon_s3()`. All other asset bundles are downloaded via HTTP.
+
+    ```python
+    from platform import system
+    from tdw.librarian import ModelLibrarian
+    from tdw.asset_bundle_downloader import AssetBundleDownloader
+
+    librarian = ModelLibrarian()
+    downloads = [(record.urls[system()], f"asset_bundles/{record.name}", record.asset_bundle_sizes[system()])
+                 for record in librarian.records[:100]]
+    downloader = AssetBundleDownloader(max_workers=8)
+    failures = downloader.download_all(downloads=downloads)
+    downloader.close()
+    ```
+    """
+
+    """:class_var
+    The URL prefix of asset bundles in tdw-private.
+    """
+    PRIVATE_BUCKET_PREFIX: str = "https://tdw-private.s3.amazonaws.com/"
+
+    def __init__(self, max_workers: int = 8, max_retries: int = 5, retry_delay: float = 1, timeout: float = 30,
+                 chunk_size: int = 65536, verify_size: bool = True):
+        """
+        :param max_workers: The maximum number of asset bundles that are downloaded at the same time.
+        :param max_retries: The maximum number of times that a failed download is retried.
+        :param retry_delay: The delay in seconds before the first retry. The delay doubles after each retry.
+        :param timeout: The connection and read timeout in seconds of each HTTP request.
+        :param chunk_size: Download and write the asset bundles in chunks of this many bytes.
+        :param verify_size: If True, verify that the size of each downloaded file is the expected size. Ignored for asset bundles whose size isn't known.
+        """
+
+        """:field
+        The maximum number of asset bundles that are downloaded at the same time.
+        """
+        self.max_workers: int = max_workers
+        """:field
+        The maximum number of times that a failed download is retried.
+        """
+        self.max_retries: int = max_retries
+        """:field
+        The delay in seconds before the first retry. The delay doubles after each retry.
+        """
+        self.retry_delay: float = retry_delay
+        """:field
+        The connection and read timeout in seconds of each HTTP request.
+        """
+        self.timeout: float = timeout
+        """:field
+        Download and write the asset bundles in chunks of this many bytes.
+        """
+        self.chunk_size: int = chunk_size
+        """:field
+        If True, verify that the size of each downloaded file is the expected size.
+        """
+        self.verify_size: bool = verify_size
+        # The shared HTTP session. This is created the first time that it's needed.
+        self._session = None
+        # The shared S3 client. This is created the first time that it's needed.
+        self._s3_client = None
+        # This lock is used to create the session and the S3 client only once.
+        self._lock: Lock = Lock()
+
+    def download(self, url: str, path: Union[str, Path], size: int = -1) -> None:
+        """
+        Download an asset bundle. If the download fails, it is retried up to `self.max_retries` times. If it still fails, an exception is raised.
+
+        :param url: The URL of the asset bundle.
+        :param path: The path to the downloaded asset bundle file.
+        :param size: The expected size of the asset bundle in bytes. If less than 0, the size isn't known.
+        """
+
+        if isinstance(path, str):
+            path = Path(path)
+        attempt: int = 0
+        while True:
+            try:
+                self._download_once(url=url, path=path, size=size)
+                return
+            except Exception as e:
+                # Client errors such as 404 Not Found can't be fixed by retrying.
+                status_code: Optional[int] = getattr(getattr(e, "response", None), "status_code", None)
+                if status_code is not None and 400 <= status_code < 500 and status_code not in [408, 429]:
+                    raise
+                if attempt >= self.max_retries:
+                    raise
+                sleep(self.retry_delay * 2 ** attempt)
+                attempt += 1
+
+    def download_all(self, downloads: List[Tuple[str, Union[str, Path], int]], progress_bar: bool = True) -> Dict[Path, Exception]:
+        """
+        Download asset bundles in parallel.
+
+        :param downloads: A list of downloads. Each element is a tuple: The URL, the path to the downloaded file, and the expected size in bytes (or -1 if the size isn't known).
+        :param progress_bar: If True, show a progress bar.
+
+        :return: A dictionary of downloads that failed. Key = The path to the file. Value = The exception.
+        """
+
+        failures: Dict[Path, Exception] = dict()
+        if len(downloads) == 0:
+            return failures
+        pbar = None
+        if progress_bar:
+            # tqdm is slow to import, so it's imported only when it's needed.
+            from tqdm import tqdm
+            pbar = tqdm(total=len(downloads))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = dict()
+            for url, path, size in downloads:
+                if isinstance(path, str):
+                    path = Path(path)
+                futures[executor.submit(self.download, url, path, size)] = path
+            for future in as_completed(futures):
+                exception = future.exception()
+                if exception is not None:
+                    failures[futures[future]] = exception
+                if pbar is not None:
+                    pbar.update(1)
+        if pbar is not None:
+            pbar.close()
+        return failures
+
+    def close(self) -> None:
+        """
+        Close the shared HTTP session.
+        """
+
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            self._s3_client = None
+
+    @staticmethod
+    def get_part_path(path: Path) -> Path:
+        """
+        :param path: The path to an asset bundle file.
+
+        :return: The path to the temporary file of a partial download of the asset bundle.
+        """
+
+        return path.parent.joinpath(path.name + ".part")
+
+    def _download_once(self, url: str, path: Path, size: int) -> None:
+        """
+        Try to download an asset bundle once. If there is a partial download, resume it.
+
+        :param url: The URL of the asset bundle.
+        :param path: The path to the downloaded asset bundle file.
+        :param size: The expected size of the asset bundle in bytes. If less than 0, the size isn't known.
+        """
+
+        if not path.parent.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = AssetBundleDownloader.get_part_path(path)
+        offset: int = part_path.stat().st_size if part_path.exists() else 0
+        # The partial download is invalid.
+        if 0 <= size < offset:
+            part_path.unlink()
+            offset = 0
+        # Download the rest of the asset bundle. If the partial download is already complete, there's nothing to download.
+        if offset == 0 or offset != size:
+            if url.startswith(AssetBundleDownloader.PRIVATE_BUCKET_PREFIX):
+                resumed, chunks = self._get_s3_chunks(url=url, part_path=part_path, offset=offset)
+            else:
+                resumed, chunks = self._get_http_chunks(url=url, part_path=part_path, offset=offset)
+            with part_path.open("ab" if resumed else "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        # Verify the size of the file.
+        if self.verify_size and size >= 0:
+            downloaded_size = part_path.stat().st_size
+            if downloaded_size != size:
+                part_path.unlink()
+                raise Exception(f"Expected {url} to be {size} bytes but it is {downloaded_size} bytes.")
+        part_path.replace(path)
+
+    def _get_http_chunks(self, url: str, part_path: Path, offset: int) -> Tuple[bool, Iterable[bytes]]:
+        """
+        :param url: The URL of the asset bundle.
+        :param part_path: The path to the partial download.
+        :param offset: Start downloading from this byte.
+
+        :return: Tuple: True if the download resumes from `offset`, the downloaded chunks.
+        """
+
+        session = self._get_session()
+        headers = {"Range": f"bytes={offset}-"} if offset > 0 else None
+        resp = session.get(url, headers=headers, stream=True, timeout=self.timeout)
+        # The partial download can't be resumed. Delete it and try again.
+        if resp.status_code == 416:
+            resp.close()
+            part_path.unlink()
+            raise Exception(f"Can't resume the download of {url}")
+        resp.raise_for_status()
+        return resp.status_code == 206, resp.iter_content(chunk_size=self.chunk_size)
+
+    def _get_s3_chunks(self, url: str, part_path: Path, offset: int) -> Tuple[bool, Iterable[bytes]]:
+        """
+        :param url: The URL of the asset bundle.
+        :param part_path: The path to the partial download.
+        :param offset: Start downloading from this byte.
+
+        :return: Tuple: True if the download resumes from `offset`, the downloaded chunks.
+        """
+
+        # botocore is slow to import, so it's imported only when it's needed.
+        from botocore.exceptions import ClientError
+
+        kwargs = {"Bucket": "tdw-private", "Key": url.split(AssetBundleDownloader.PRIVATE_BUCKET_PREFIX)[1]}
+        if offset > 0:
+            kwargs["Range"] = f"bytes={offset}-"
+        try:
+            resp = self._get_s3_client().get_object(**kwargs)
+        except ClientError as e:
+            # The partial download can't be resumed. Delete it and try again.
+            if e.response["Error"]["Code"] == "InvalidRange":
+                part_path.unlink()
+            raise
+        status_code = resp["ResponseMetadata"]["HTTPStatusCode"]
+        if status_code not in [200, 206]:
+            raise Exception(f"Failed to download {url}: {status_code}")
+        return status_code == 206, resp["Body"].iter_chunks(self.chunk_size)
+
+    def _get_session(self):
+        """
+        :return: The shared HTTP session.
+        """
+
+        with self._lock:
+            if self._session is None:
+                # requests is slow to import, so it's imported only when it's needed.
+                from requests import Session
+                from requests.adapters import HTTPAdapter
+
+                self._session = Session()
+                # Keep one connection per thread.
+                adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+                self._session.mount("http://", adapter)
+                self._session.mount("https://", adapter)
+            return self._session
+
+    def _get_s3_client(self):
+        """
+        :return: The shared S3 client.
+        """
+
+        with self._lock:
+            if self._s3_client is None:
+                # boto3 is slow to import, so it's imported only when it's needed.
+                import boto3
+
+                self._s3_client = boto3.Session(profile_name="tdw").client("s3")
+            return self._s3_client
@@ -0,0 +1,177 @@
+import asyncio
+from time import perf_counter
+from typing import List, Union, Tuple, Optional
+import zmq
+import zmq.asyncio
+from tdw.controller import Controller
+
+
+class AsyncController(Controller):
+    """
+    A controller that uses an asyncio socket. `communicate(commands)` is a coroutine, meaning that an event loop can do other work (for example, model inference, or driving other builds) while waiting for the build to respond.
+
+    Add-ons work exactly the same way as they do in a [`Controller`](controller.md).
+
+    Usage:
+
+    ```python
+    import asyncio
+    from tdw.async_controller import AsyncController
+
+
+    async def main():
+        c = AsyncController()
+        await c.start()
+        await c.communicate({"$type": "do_nothing"})
+        await c.communicate({"$type": "terminate"})
+
+    asyncio.run(main())
+    ```
+
+    To drive more than one build from the same event loop, create one `AsyncController` per port and `await asyncio.gather(...)` their `communicate(commands)` calls.
+    """
+
+    def __init__(self, port: int = 1071, check_version: bool = True, launch_build: bool = True, zero_copy: bool = False):
+        """
+        Create the network socket and bind the socket to the port. This won't wait for the build to connect; to do that, call `await start()`.
+
+        :param port: The port number.
+        :param check_version: If true, the controller will check the version of the build and print the result. The installed tdw module is compared to the latest version on PyPi in a background thread, at most once per `VersionCheckCache.CACHE_TTL` seconds.
+        :param launch_build: If True, automatically launch the build. If one doesn't exist, download and extract the correct version. Set this to False to use your own build, or (if you are a backend developer) to use Unity Editor.
+        :param zero_copy: If True, `communicate()` returns a list of read-only `memoryview` objects that point directly to the received message frames rather than copies of them. This is faster, especially for image data, but numpy arrays returned by output data objects will be read-only.
+        """
+
+        # This doesn't call `Controller.__init__()` because that would block until the build connects.
+        self._set_fields(zero_copy=zero_copy)
+        self._check_version: bool = check_version
+        self._launch_build: bool = launch_build
+        # If True, the build connected and the startup commands were sent.
+        self._started: bool = False
+        # The task that waits for the build to connect and sends the startup commands. This is shared by every concurrent call to `start()`.
+        self._start_task: Optional[asyncio.Task] = None
+        # Launch the build.
+        if launch_build:
+            Controller.launch_build(port=port)
+        context = zmq.asyncio.Context()
+        # noinspection PyUnresolvedReferences
+        self.socket = context.socket(zmq.REP)
+        self.socket.bind('tcp://*:' + str(port))
+
+    async def start(self) -> None:
+        """
+        Wait for the build to connect and then send the startup commands. If this hasn't been called yet, it will be called automatically on the first `communicate(commands)` call.
+
+        If this is called more than once at the same time, every call waits for the same startup. If this is cancelled, for example by `asyncio.wait_for()`, the startup continues in the background and the next call waits for it. If the startup fails, the next call tries again.
+        """
+
+        if self._started:
+            return
+        if self._start_task is None:
+            self._start_task = asyncio.ensure_future(self._start())
+        task = self._start_task
+        try:
+            # Don't cancel the startup if this call is cancelled; otherwise, the socket would be left in the middle of the handshake.
+            await asyncio.shield(task)
+        finally:
+            # The startup failed. Try again on the next call.
+            if task.done() and (task.cancelled() or task.exception() is not None) and self._start_task is task:
+                self._start_task = None
+
+    async def communicate(self, commands: Union[dict, List[dict]]) -> list:
+        """
+        Send commands and receive output data in response.
+
+        :param commands: A list of JSON commands.
+
+        :return The output data from the build.
+        """
+
+        if not self._started:
+            await self.start()
+        return await self._communicate(commands=commands)
+
+    async def _start(self) -> None:
+        """
+        Wait for the build to connect and then send the startup commands.
+        """
+
+        # Compare the installed version of the tdw Python module to the latest on PyPi in a background thread.
+        if self._check_version:
+            Controller._start_pypi_version_check()
+        await self.socket.recv()
+        resp = await self._communicate(Controller._get_startup_commands())
+        self._set_build_info(resp=resp)
+        # The controller is started only if the startup commands were sent and the build info was received.
+        self._started = True
+        # Compare the version of the tdw module to the build version.
+        if self._check_version and self._launch_build:
+            self._check_build_version()
+
+    async def _communicate(self, commands: Union[dict, List[dict]]) -> list:
+        """
+        Send commands and receive output data in response. This doesn't start the controller.
+
+        :param commands: A list of JSON commands.
+
+        :return The output data from the build.
+        """
+
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start_frame()
+        # Get the commands from each add-on and serialize the message.
+        msg = self._get_message(commands=commands)
+        t0 = perf_counter() if profiler is not None else 0
+        # Send the commands.
+        await self.socket.send_multipart(msg)
+        # Receive output data.
+        resp = await self._receive()
+        if profiler is not None:
+            profiler.add(phase="round_trip", t0=t0)
+            t0 = perf_counter()
+        # Re-send the commands if the build received an ftre object. See: `Controller.communicate(commands)`.
+        ftre: bool = True
+        num_ftre: int = 0
+        while ftre and num_ftre < Controller._MAX_NUM_FTRE:
+            ftre = Controller._is_ftre(resp=resp)
+            if ftre:
+                await self.socket.send_multipart(msg)
+                resp = await self._receive()
+                num_ftre += 1
+        # Tried too many times.
+        if ftre:
+            self._on_too_many_ftre()
+        if profiler is not None:
+            profiler.add(phase="ftre", t0=t0)
+        # Check for a quit signal and update the add-ons.
+        self._on_receive(resp=resp)
+        if profiler is not None:
+            profiler.end_frame()
+        # Return the output data from the build.
+        return resp
+
+    async def _receive(self) -> list:
+        """
+        :return: The response from the build. If `self.zero_copy == True`, this is a list of memoryviews of the message frames. Otherwise, this is a list of bytes.
+        """
+
+        if self.zero_copy:
+            return [frame.buffer for frame in await self.socket.recv_multipart(copy=False)]
+        else:
+            return await self.socket.recv_multipart()
+
+    async def get_version(self) -> Tuple[str, str]:
+        """
+        Send a send_version command to the build. Unlike `Controller.get_version()`, this is a coroutine and must be awaited: `tdw_version, unity_version = await c.get_version()`.
+
+        :return The TDW version and the Unity Engine version.
+        """
+
+        resp = await self.communicate({"$type": "send_version"})
+        for r in resp[:-1]:
+            if r[4:8] == b'vers':
+                self._set_build_info(resp=resp)
+                return self._tdw_version, self._unity_version
+        if len(resp) == 1:
+            raise Exception("Tried receiving version output data but didn't receive anything!")
+        raise Exception(f"Expected output data with ID version but got: " + bytes(resp[0][4:8]).decode('utf-8'))
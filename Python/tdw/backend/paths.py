@@ -4,6 +4,9 @@ from platform import system
 
 ASSET_BUNDLE_VERIFIER_OUTPUT_DIR = Path.home().joinpath("tdw_asset_bundle_verifier")
 EXAMPLE_CONTROLLER_OUTPUT_PATH = Path.home().joinpath("tdw_example_controller_output")
+VERSION_CHECK_CACHE_PATH = Path.home().joinpath(".tdw/version_check.json")
+LIBRARIAN_CACHE_DIRECTORY = Path.home().joinpath(".tdw/librarian_cache")
+ASSET_BUNDLE_CACHE_DIRECTORY = Path.home().joinpath(".tdw/asset_bundle_cache")
 
 if system() == "Windows":
     PLAYER_LOG_PATH = Path.home().joinpath("AppData/LocalLow/MIT/TDW/Player.log")
@@ -0,0 +1,139 @@
+import json
+from typing import List, Dict, TYPE_CHECKING
+from tdw.command_serialization.static_command import StaticCommand
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class CommandSerializer:
+    """
+    Serialize a list of commands into a JSON byte array that can be sent to the build.
+
+    Every controller has a serializer: `c.serializer`. The default serializer uses Python's `json` module. To use a different serializer, set `c.serializer` or subclass `CommandSerializer` and override `encode(obj)`.
+
+    Compared to `json.dumps(commands).encode("utf-8")`, the serializer:
+
+    - Writes compact JSON (no whitespace), which reduces the size of the message.
+    - Converts numpy arrays and numpy scalars, for example `"ids": np.array([0, 1, 2])` or `"mass": np.float32(1.5)`.
+    - Inserts the pre-encoded byte array of each [`StaticCommand`](static_command.md) rather than re-encoding it.
+
+    Numpy arrays are always serialized as JSON lists. Parameters of type Vector3 or Vector4 must be converted to dictionaries. `CommandSerializer.array_to_vector3(arr)` and `CommandSerializer.array_to_vector4(arr)` do this faster than `TDWUtils`, and `CommandSerializer.arrays_to_vector3s(arr)` and `CommandSerializer.arrays_to_vector4s(arr)` convert many vectors at once:
+
+    ```python
+    import numpy as np
+    from tdw.command_serialization.command_serializer import CommandSerializer
+
+    positions = np.random.uniform(-1, 1, size=(100, 3))
+    commands = [{"$type": "teleport_object", "position": position, "id": i}
+                for i, position in enumerate(CommandSerializer.arrays_to_vector3s(positions))]
+    ```
+    """
+
+    def __init__(self):
+        # Create the encoder once rather than per call to `json.dumps()`.
+        self._encoder: json.JSONEncoder = json.JSONEncoder(separators=(",", ":"), default=CommandSerializer._default)
+
+    def serialize(self, commands: List[dict]) -> bytes:
+        """
+        :param commands: A list of commands.
+
+        :return: The commands serialized as a JSON array.
+        """
+
+        # Encode the whole list at once unless it includes pre-encoded commands.
+        has_static: bool = False
+        for command in commands:
+            if isinstance(command, StaticCommand):
+                has_static = True
+                break
+        if not has_static:
+            return self.encode(commands)
+        # Encode each run of non-static commands as a list and remove the brackets.
+        fragments: List[bytes] = list()
+        run: List[dict] = list()
+        for command in commands:
+            if isinstance(command, StaticCommand):
+                if len(run) > 0:
+                    fragments.append(self.encode(run)[1:-1])
+                    run.clear()
+                fragments.append(command.encoded)
+            else:
+                run.append(command)
+        if len(run) > 0:
+            fragments.append(self.encode(run)[1:-1])
+        return b"[" + b",".join(fragments) + b"]"
+
+    def encode(self, obj) -> bytes:
+        """
+        :param obj: A command or a list of commands.
+
+        :return: The object serialized as JSON.
+        """
+
+        return self._encoder.encode(obj).encode("utf-8")
+
+    @staticmethod
+    def array_to_vector3(arr: "np.ndarray") -> Dict[str, float]:
+        """
+        :param arr: A numpy array of shape (3,).
+
+        :return: A Vector3, for example `{"x": 0, "y": 0, "z": 0}`.
+        """
+
+        # `tolist()` converts every element to a Python float at once.
+        x, y, z = arr.tolist()
+        return {"x": x, "y": y, "z": z}
+
+    @staticmethod
+    def array_to_vector4(arr: "np.ndarray") -> Dict[str, float]:
+        """
+        :param arr: A numpy array of shape (4,).
+
+        :return: A Vector4, for example `{"x": 0, "y": 0, "z": 0, "w": 1}`.
+        """
+
+        x, y, z, w = arr.tolist()
+        return {"x": x, "y": y, "z": z, "w": w}
+
+    @staticmethod
+    def arrays_to_vector3s(arr: "np.ndarray") -> List[Dict[str, float]]:
+        """
+        :param arr: A numpy array of shape (n, 3).
+
+        :return: A list of Vector3s.
+        """
+
+        return [{"x": x, "y": y, "z": z} for x, y, z in arr.tolist()]
+
+    @staticmethod
+    def arrays_to_vector4s(arr: "np.ndarray") -> List[Dict[str, float]]:
+        """
+        :param arr: A numpy array of shape (n, 4).
+
+        :return: A list of Vector4s.
+        """
+
+        return [{"x": x, "y": y, "z": z, "w": w} for x, y, z, w in arr.tolist()]
+
+    @staticmethod
+    def _default(obj):
+        """
+        Convert numpy objects that the `json` module can't serialize.
+
+        :param obj: The object.
+
+        :return: A JSON-serializable object.
+        """
+
+        # If `obj` is a numpy object, numpy has already been imported, so this is fast.
+        import numpy as np
+
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        elif isinstance(obj, np.integer):
+            return int(obj)
+        elif isinstance(obj, np.floating):
+            return float(obj)
+        elif isinstance(obj, np.bool_):
+            return bool(obj)
+        raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
@@ -0,0 +1,37 @@
+from tdw.command_serialization.command_serializer import CommandSerializer
+
+
+class OrjsonCommandSerializer(CommandSerializer):
+    """
+    A [`CommandSerializer`](command_serializer.md) that uses [orjson](https://github.com/ijl/orjson), which is much faster than Python's `json` module and can natively serialize numpy arrays.
+
+    orjson isn't a dependency of `tdw`. To use this serializer, first `pip3 install orjson`.
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.command_serialization.orjson_command_serializer import OrjsonCommandSerializer
+
+    c = Controller()
+    c.serializer = OrjsonCommandSerializer()
+    ```
+    """
+
+    def __init__(self):
+        super().__init__()
+        try:
+            import orjson
+        except ImportError:
+            raise Exception("orjson isn't installed. To install it: pip3 install orjson")
+        # The orjson module. This is imported here rather than at the top of the file because it is optional.
+        self._orjson = orjson
+        # Serialize numpy arrays natively.
+        self._option: int = orjson.OPT_SERIALIZE_NUMPY
+
+    def encode(self, obj) -> bytes:
+        """
+        :param obj: A command or a list of commands.
+
+        :return: The object serialized as JSON.
+        """
+
+        return self._orjson.dumps(obj, default=CommandSerializer._default, option=self._option)
@@ -0,0 +1,31 @@
+import json
+
+
+class StaticCommand(dict):
+    """
+    A command that doesn't change from frame to frame, for example `{"$type": "step_physics", "frames": 1}`. It is serialized once, when it is created; the [`CommandSerializer`](command_serializer.md) then inserts the pre-encoded byte array into the message every time the command is sent.
+
+    A `StaticCommand` is a `dict`, so add-ons can read it like any other command. Don't modify it; the changes won't be serialized.
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.command_serialization.static_command import StaticCommand
+
+    c = Controller()
+    step_physics = StaticCommand({"$type": "step_physics", "frames": 1})
+    for i in range(100):
+        c.communicate([step_physics])
+    c.communicate({"$type": "terminate"})
+    ```
+    """
+
+    def __init__(self, command: dict):
+        """
+        :param command: The command.
+        """
+
+        super().__init__(command)
+        """:field
+        The command serialized as JSON.
+        """
+        self.encoded: bytes = json.dumps(command, separators=(",", ":")).encode("utf-8")
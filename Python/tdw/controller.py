@@ -1,24 +1,28 @@
 import zmq
-import json
 import os
 from subprocess import Popen
-from typing import List, Union, Tuple, Dict
-from tdw.librarian import ModelLibrarian, SceneLibrarian, MaterialLibrarian, HDRISkyboxLibrarian, \
-    HumanoidAnimationLibrarian, HumanoidLibrarian, HumanoidAnimationRecord, RobotLibrarian, VisualEffectLibrarian, \
-    DroneLibrarian, VehicleLibrarian
+from threading import Thread
+from time import perf_counter
+from typing import List, Union, Tuple, Dict, Optional, TYPE_CHECKING
 from tdw.backend.paths import EDITOR_LOG_PATH, PLAYER_LOG_PATH
-from tdw.output_data import Version, QuitSignal
-from tdw.release.build import Build
-from tdw.release.pypi import PyPi
+from tdw.frame_index import FrameIndex
 from tdw.version import __version__
 from tdw.add_ons.add_on import AddOn
-from tdw.physics_audio.object_audio_static import DEFAULT_OBJECT_AUDIO_STATIC_DATA
+from tdw.command_serialization.command_serializer import CommandSerializer
 from tdw.physics_audio.audio_material import AudioMaterial
 from tdw.physics_audio.audio_material_constants import STATIC_FRICTION, DYNAMIC_FRICTION, DENSITIES
 from tdw.container_data.container_tag import ContainerTag
 from tdw.container_data.box_container import BoxContainer
 from tdw.container_data.sphere_container import SphereContainer
 from tdw.container_data.cylinder_container import CylinderContainer
+# These modules are slow to import, so they are imported the first time that they're used.
+if TYPE_CHECKING:
+    from tdw.librarian import ModelLibrarian, SceneLibrarian, MaterialLibrarian, HDRISkyboxLibrarian, \
+        HumanoidAnimationLibrarian, HumanoidLibrarian, HumanoidAnimationRecord, RobotLibrarian, \
+        VisualEffectLibrarian, DroneLibrarian, VehicleLibrarian, ModelRecord
+    from tdw.profiler import Profiler
+    from tdw.asset_bundle_cache import AssetBundleCache
+    import numpy as np
 
 
 class Controller:
@@ -33,33 +37,39 @@ class Controller:
     ```
     """
 
-    MODEL_LIBRARIANS: Dict[str, ModelLibrarian] = dict()
-    SCENE_LIBRARIANS: Dict[str, SceneLibrarian] = dict()
-    MATERIAL_LIBRARIANS: Dict[str, MaterialLibrarian] = dict()
-    HDRI_SKYBOX_LIBRARIANS: Dict[str, HDRISkyboxLibrarian] = dict()
-    HUMANOID_LIBRARIANS: Dict[str, HumanoidLibrarian] = dict()
-    HUMANOID_ANIMATION_LIBRARIANS: Dict[str, HumanoidAnimationLibrarian] = dict()
-    ROBOT_LIBRARIANS: Dict[str, RobotLibrarian] = dict()
-    VISUAL_EFFECT_LIBRARIANS: Dict[str, VisualEffectLibrarian] = dict()
-    DRONE_LIBRARIANS: Dict[str, DroneLibrarian] = dict()
-    VEHICLE_LIBRARIANS: Dict[str, VehicleLibrarian] = dict()
+    MODEL_LIBRARIANS: Dict[str, "ModelLibrarian"] = dict()
+    SCENE_LIBRARIANS: Dict[str, "SceneLibrarian"] = dict()
+    MATERIAL_LIBRARIANS: Dict[str, "MaterialLibrarian"] = dict()
+    HDRI_SKYBOX_LIBRARIANS: Dict[str, "HDRISkyboxLibrarian"] = dict()
+    HUMANOID_LIBRARIANS: Dict[str, "HumanoidLibrarian"] = dict()
+    HUMANOID_ANIMATION_LIBRARIANS: Dict[str, "HumanoidAnimationLibrarian"] = dict()
+    ROBOT_LIBRARIANS: Dict[str, "RobotLibrarian"] = dict()
+    VISUAL_EFFECT_LIBRARIANS: Dict[str, "VisualEffectLibrarian"] = dict()
+    DRONE_LIBRARIANS: Dict[str, "DroneLibrarian"] = dict()
+    VEHICLE_LIBRARIANS: Dict[str, "VehicleLibrarian"] = dict()
+    """:class_var
+    If not None, `get_add_object()`, `get_add_scene()`, etc. use the `file:///` URLs of asset bundles cached by this [`AssetBundleCache`](asset_bundle_cache.md).
+    """
+    ASSET_BUNDLE_CACHE: Optional["AssetBundleCache"] = None
+    # The maximum number of times that the controller will try to re-send commands after receiving an ftre object.
+    _MAX_NUM_FTRE: int = 1000
 
-    def __init__(self, port: int = 1071, check_version: bool = True, launch_build: bool = True):
+    def __init__(self, port: int = 1071, check_version: bool = True, launch_build: bool = True, zero_copy: bool = False):
         """
         Create the network socket and bind the socket to the port.
 
         :param port: The port number.
-        :param check_version: If true, the controller will check the version of the build and print the result.
+        :param check_version: If true, the controller will check the version of the build and print the result. The installed tdw module is compared to the latest version on PyPi in a background thread, at most once per `VersionCheckCache.CACHE_TTL` seconds.
         :param launch_build: If True, automatically launch the build. If one doesn't exist, download and extract the correct version. Set this to False to use your own build, or (if you are a backend developer) to use Unity Editor.
+        :param zero_copy: If True, `communicate()` returns a list of read-only `memoryview` objects that point directly to the received message frames rather than copies of them. This is faster, especially for image data, but numpy arrays returned by output data objects will be read-only.
         """
 
-        # A list of modules that will add commands on `communicate()`.
-        self.add_ons: List[AddOn] = list()
+        self._set_fields(zero_copy=zero_copy)
 
-        # Compare the installed version of the tdw Python module to the latest on PyPi.
+        # Compare the installed version of the tdw Python module to the latest on PyPi in a background thread.
         # If there is a difference, recommend an upgrade.
         if check_version:
-            self._check_pypi_version()
+            Controller._start_pypi_version_check()
 
         # Launch the build.
         if launch_build:
@@ -73,20 +83,8 @@ class Controller:
 
         # Set error handling to default values (the build will try to quit on errors and exceptions).
         # Request the version to log it and remember here if the Editor is being used.
-        resp = self.communicate([{"$type": "set_error_handling"},
-                                 {"$type": "send_version"},
-                                 {"$type": "load_scene",
-                                  "scene_name": "ProcGenScene"}])
-        self._is_standalone: bool = False
-        self._tdw_version: str = ""
-        self._unity_version: str = ""
-        for r in resp[:-1]:
-            if Version.get_data_type_id(r) == "vers":
-                v = Version(r)
-                self._tdw_version = v.get_tdw_version()
-                self._unity_version = v.get_unity_version()
-                self._is_standalone = v.get_standalone()
-                break
+        resp = self.communicate(Controller._get_startup_commands())
+        self._set_build_info(resp=resp)
         # Compare the version of the tdw module to the build version.
         if check_version and launch_build:
             self._check_build_version()
@@ -100,64 +98,42 @@ class Controller:
         :return The output data from the build.
         """
 
-        if isinstance(commands, dict):
-            commands = [commands]
-
-        # Append commands from each add-on.
-        for m in self.add_ons:
-            # Initialize an add-on.
-            if not m.initialized:
-                commands.extend(m.get_initialization_commands())
-                m.initialized = True
-            # Append the add-on's commands.
-            else:
-                commands.extend(m.commands)
-                m.commands.clear()
-        # Possibly do something with the commands about to be sent.
-        for m in self.add_ons:
-            m.before_send(commands)
-
-        # Serialize the message.
-        msg = [json.dumps(commands).encode('utf-8')]
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start_frame()
+        # Get the commands from each add-on and serialize the message.
+        msg = self._get_message(commands=commands)
+        t0 = perf_counter() if profiler is not None else 0
         # Send the commands.
         self.socket.send_multipart(msg)
         # Receive output data.
-        resp = self.socket.recv_multipart()
+        resp = self._receive()
+        if profiler is not None:
+            profiler.add(phase="round_trip", t0=t0)
+            t0 = perf_counter()
 
         # Occasionally, the build's socket will stop receiving messages.
         # If that happens, it will close the socket, create a new socket, and send a dummy output data object.
         # The ID of the dummy object is "ftre" (FailedToReceive).
         # If the controller receives the dummy object, it should re-send its commands.
-        # The dummy object is always in an array: [ftre, 0]
-        # This way, the controller can easily differentiate it from a response that just has the frame count.
         ftre: bool = True
         num_ftre: int = 0
-        while ftre and num_ftre < 1000:
-            ftre = False
-            for i in range(len(resp) - 1):
-                if resp[i][4:8] == b'ftre':
-                    ftre = True
-                    self.socket.send_multipart(msg)
-                    resp = self.socket.recv_multipart()
-                    num_ftre += 1
-                    break
+        while ftre and num_ftre < Controller._MAX_NUM_FTRE:
+            ftre = Controller._is_ftre(resp=resp)
+            if ftre:
+                self.socket.send_multipart(msg)
+                resp = self._receive()
+                num_ftre += 1
         # Tried too many times.
         if ftre:
-            print("Quitting now because the controller tried too many times to resend commands to the build. "
-                  "Check the build log for more info.")
-            self._print_build_log()
-
-        # Check if we've received a quit signal. If we have, check if there was an error.
-        for i in range(len(resp) - 1):
-            if resp[i][4:8] == b'quit':
-                if not QuitSignal(resp[i]).get_ok():
-                    print("The build quit due to an error. Check the build log for more info.")
-                    self._print_build_log()
-                break
+            self._on_too_many_ftre()
+        if profiler is not None:
+            profiler.add(phase="ftre", t0=t0)
 
-        # Get commands per module for the next frame.
-        for m in self.add_ons:
-            m.on_send(resp=resp)
+        # Check for a quit signal and update the add-ons.
+        self._on_receive(resp=resp)
+        if profiler is not None:
+            profiler.end_frame()
 
         # Return the output data from the build.
         return resp
@@ -179,12 +155,13 @@ class Controller:
         if library == "":
             library = "models_core.json"
         if library not in Controller.MODEL_LIBRARIANS:
+            from tdw.librarian import ModelLibrarian
             Controller.MODEL_LIBRARIANS[library] = ModelLibrarian(library)
         record = Controller.MODEL_LIBRARIANS[library].get_record(model_name)
 
         return {"$type": "add_object",
                 "name": model_name,
-                "url": record.get_url(),
+                "url": Controller.get_asset_bundle_url(record.get_url()),
                 "scale_factor": record.scale_factor,
                 "position": position if position is not None else {"x": 0, "y": 0, "z": 0},
                 "rotation": rotation if rotation is not None else {"x": 0, "y": 0, "z": 0},
@@ -218,6 +195,7 @@ class Controller:
         if library == "":
             library = "models_core.json"
         if library not in Controller.MODEL_LIBRARIANS:
+            from tdw.librarian import ModelLibrarian
             Controller.MODEL_LIBRARIANS[library] = ModelLibrarian(library)
         if position is None:
             position = {"x": 0, "y": 0, "z": 0}
@@ -226,7 +204,7 @@ class Controller:
             position = {"x": 0, "y": 0, "z": 0}
         commands = [{"$type": "add_object",
                      "name": record.name,
-                     "url": record.get_url(),
+                     "url": Controller.get_asset_bundle_url(record.get_url()),
                      "scale_factor": record.scale_factor,
                      "position": position,
                      "category": record.wcategory,
@@ -253,54 +231,15 @@ class Controller:
                              "id": object_id,
                              "mode": "continuous_speculative"})
         if default_physics_values:
-            # Use default physics values.
-            if model_name in DEFAULT_OBJECT_AUDIO_STATIC_DATA:
-                mass = DEFAULT_OBJECT_AUDIO_STATIC_DATA[model_name].mass
-                bounciness = DEFAULT_OBJECT_AUDIO_STATIC_DATA[model_name].bounciness
-                material = DEFAULT_OBJECT_AUDIO_STATIC_DATA[model_name].material
-            # Fallback: Try to derive physics values from existing data.
-            else:
-                if "models_full.json" not in Controller.MODEL_LIBRARIANS:
-                    Controller.MODEL_LIBRARIANS["models_full.json"] = ModelLibrarian("models_full.json")
-                # Get all models in the same category that have default physics values.
-                records = Controller.MODEL_LIBRARIANS["models_full.json"].get_all_models_in_wnid(record.wnid)
-                records = [r for r in records if not r.do_not_use and r.name != record.name and r.name in
-                           DEFAULT_OBJECT_AUDIO_STATIC_DATA]
-                # Fallback: Find objects with similar volume.
-                if len(records) == 0:
-                    records = [r for r in Controller.MODEL_LIBRARIANS["models_full.json"].records if r.name in
-                               DEFAULT_OBJECT_AUDIO_STATIC_DATA and not r.do_not_use and r.name != record.name and
-                               0.8 <= abs(r.volume / record.volume) <= 1.2]
-                # Fallback: Select a default material and bounciness.
-                if len(records) == 0:
-                    material: AudioMaterial = AudioMaterial.plastic_hard
-                    # Select a default bounciness.
-                    bounciness: float = 0
-                # Select the most common material and bounciness.
-                else:
-                    materials: List[AudioMaterial] = [DEFAULT_OBJECT_AUDIO_STATIC_DATA[r.name].material for r in records]
-                    material: AudioMaterial = max(set(materials), key=materials.count)
-                    bouncinesses = [DEFAULT_OBJECT_AUDIO_STATIC_DATA[r.name].bounciness for r in records]
-                    bounciness = round(sum(bouncinesses) / len(bouncinesses), 3)
-                # Derive the mass.
-                mass = DENSITIES[material] * record.volume
-            commands.extend([{"$type": "set_mass",
-                              "mass": mass,
-                              "id": object_id},
-                             {"$type": "set_physic_material",
-                              "dynamic_friction": DYNAMIC_FRICTION[material],
-                              "static_friction": STATIC_FRICTION[material],
-                              "bounciness": bounciness,
-                              "id": object_id}])
-        else:
-            commands.extend([{"$type": "set_mass",
-                              "mass": mass,
-                              "id": object_id},
-                             {"$type": "set_physic_material",
-                              "dynamic_friction": dynamic_friction,
-                              "static_friction": static_friction,
-                              "bounciness": bounciness,
-                              "id": object_id}])
+            mass, dynamic_friction, static_friction, bounciness = Controller._get_default_physics_values(record=record)
+        commands.extend([{"$type": "set_mass",
+                          "mass": mass,
+                          "id": object_id},
+                         {"$type": "set_physic_material",
+                          "dynamic_friction": dynamic_friction,
+                          "static_friction": static_friction,
+                          "bounciness": bounciness,
+                          "id": object_id}])
         if scale_factor is not None:
             if scale_mass:
                 commands.append({"$type": "scale_object_and_mass",
@@ -311,25 +250,117 @@ class Controller:
                                  "scale_factor": scale_factor,
                                  "id": object_id})
         # Add container shapes.
-        for container_shape in record.container_shapes:
-            if isinstance(container_shape, BoxContainer):
-                commands.append(Controller._add_box_container(object_id=object_id,
-                                                              position=container_shape.position,
-                                                              tag=container_shape.tag,
-                                                              half_extents=container_shape.half_extents,
-                                                              rotation=container_shape.rotation))
-            elif isinstance(container_shape, CylinderContainer):
-                commands.append(Controller._add_cylinder_container(object_id=object_id,
-                                                                   position=container_shape.position,
-                                                                   tag=container_shape.tag,
-                                                                   radius=container_shape.radius,
-                                                                   height=container_shape.height,
-                                                                   rotation=container_shape.rotation))
-            elif isinstance(container_shape, SphereContainer):
-                commands.append(Controller._add_sphere_container(object_id=object_id,
-                                                                 position=container_shape.position,
-                                                                 tag=container_shape.tag,
-                                                                 radius=container_shape.radius))
+        commands.extend(Controller._get_container_shape_commands(record=record, object_id=object_id))
+        return commands
+
+    @staticmethod
+    def get_add_objects(model_names: List[str], object_ids: List[int], positions: "np.ndarray" = None,
+                        rotations: "np.ndarray" = None, library: str = "") -> List[dict]:
+        """
+        Returns a list of valid add_object commands, one per object. This is faster than calling `get_add_object()` for each object because each model's record is looked up only once.
+
+        :param model_names: The name of the model of each object.
+        :param object_ids: The ID of each object.
+        :param positions: The position of each object as a numpy array (or list) of shape `(n, 3)`. If None, each position is `{"x": 0, "y": 0, "z": 0}`.
+        :param rotations: The rotation of each object in Euler angles as a numpy array (or list) of shape `(n, 3)`. If None, each rotation is `{"x": 0, "y": 0, "z": 0}`.
+        :param library: The path to the records file. If left empty, the default library will be selected. See `ModelLibrarian.get_library_filenames()` and `ModelLibrarian.get_default_library()`.
+
+        :return A list of add_object commands that the controller can then send via [`self.communicate(commands)`](#communicate).
+        """
+
+        templates = Controller._get_add_object_templates(model_names=model_names, object_ids=object_ids, library=library)
+        positions = Controller._get_vector3s(positions, len(model_names))
+        rotations = Controller._get_vector3s(rotations, len(model_names))
+        return [{**templates[model_name][0],
+                 "position": position if position is not None else {"x": 0, "y": 0, "z": 0},
+                 "rotation": rotation if rotation is not None else {"x": 0, "y": 0, "z": 0},
+                 "id": object_id}
+                for model_name, object_id, position, rotation in zip(model_names, object_ids, positions, rotations)]
+
+    @staticmethod
+    def get_add_physics_objects(model_names: List[str], object_ids: List[int], positions: "np.ndarray" = None,
+                                rotations: "np.ndarray" = None, library: str = "", scale_factors: "np.ndarray" = None,
+                                kinematic: bool = False, gravity: bool = True, default_physics_values: bool = True,
+                                mass: float = 1, dynamic_friction: float = 0.3, static_friction: float = 0.3,
+                                bounciness: float = 0.7, scale_mass: bool = True) -> List[dict]:
+        """
+        Add many objects to the scene with physics values (mass, friction coefficients, etc.). This is faster than calling `get_add_physics_object()` for each object because each model's record and default physics values are looked up only once, and it creates fewer commands because Euler angle rotations are set in the `add_object` commands.
+
+        :param model_names: The name of the model of each object.
+        :param object_ids: The ID of each object.
+        :param positions: The position of each object as a numpy array (or list) of shape `(n, 3)`. If None, each position is `{"x": 0, "y": 0, "z": 0}`.
+        :param rotations: The rotation of each object as a numpy array (or list) of either shape `(n, 3)` (Euler angles) or `(n, 4)` (quaternions, in the order x, y, z, w). If None, the objects aren't rotated.
+        :param library: The path to the records file. If left empty, the default library will be selected. See `ModelLibrarian.get_library_filenames()` and `ModelLibrarian.get_default_library()`.
+        :param scale_factors: The [scale factor](../api/command_api.md#scale_object) of each object as a numpy array (or list) of shape `(n, 3)`. If None, the objects aren't scaled.
+        :param kinematic: If True, the objects will be [kinematic](../api/command_api.md#set_kinematic_state).
+        :param gravity: If True, the objects won't respond to [gravity](../api/command_api.md#set_kinematic_state).
+        :param default_physics_values: If True, use default physics values. Not all objects have default physics values. To determine if object does: `has_default_physics_values = model_name in DEFAULT_OBJECT_AUDIO_STATIC_DATA`.
+        :param mass: The mass of each object. Ignored if `default_physics_values == True`.
+        :param dynamic_friction: The [dynamic friction](../api/command_api.md#set_physic_material) of each object. Ignored if `default_physics_values == True`.
+        :param static_friction: The [static friction](../api/command_api.md#set_physic_material) of each object. Ignored if `default_physics_values == True`.
+        :param bounciness: The [bounciness](../api/command_api.md#set_physic_material) of each object. Ignored if `default_physics_values == True`.
+        :param scale_mass: If True, the mass of each object will be scaled proportionally to the spatial scale.
+
+        :return: A **list** of commands to add the objects and apply physics values that the controller can then send via [`self.communicate(commands)`](#communicate).
+        """
+
+        templates = Controller._get_add_object_templates(model_names=model_names, object_ids=object_ids, library=library)
+        positions = Controller._get_vector3s(positions, len(model_names))
+        # Euler angles are set in the add_object command. Quaternions are set with a separate command.
+        quaternions: bool = rotations is not None and len(rotations) > 0 and len(rotations[0]) == 4
+        if quaternions:
+            rotations = Controller._get_vector3s(rotations, len(model_names), keys=("x", "y", "z", "w"))
+        else:
+            rotations = Controller._get_vector3s(rotations, len(model_names))
+        scale_factors = Controller._get_vector3s(scale_factors, len(model_names))
+        scale_command_name = "scale_object_and_mass" if scale_mass else "scale_object"
+        # Key = A model name. Value = The mass, dynamic friction, static friction, and bounciness.
+        physics_values: Dict[str, Tuple[float, float, float, float]] = dict()
+        commands = []
+        for model_name, object_id, position, rotation, scale_factor in zip(model_names, object_ids, positions,
+                                                                            rotations, scale_factors):
+            template, record = templates[model_name]
+            add_object_command = {**template,
+                                  "position": position if position is not None else {"x": 0, "y": 0, "z": 0},
+                                  "id": object_id}
+            commands.append(add_object_command)
+            if rotation is not None:
+                if quaternions:
+                    commands.append({"$type": "rotate_object_to",
+                                     "rotation": rotation,
+                                     "id": object_id})
+                else:
+                    add_object_command["rotation"] = rotation
+            commands.append({"$type": "set_kinematic_state",
+                             "id": object_id,
+                             "is_kinematic": kinematic,
+                             "use_gravity": gravity})
+            # Kinematic objects must be continuous_speculative.
+            if kinematic:
+                commands.append({"$type": "set_object_collision_detection_mode",
+                                 "id": object_id,
+                                 "mode": "continuous_speculative"})
+            if default_physics_values:
+                if model_name not in physics_values:
+                    physics_values[model_name] = Controller._get_default_physics_values(record=record)
+                object_mass, object_dynamic_friction, object_static_friction, object_bounciness = physics_values[model_name]
+            else:
+                object_mass, object_dynamic_friction, object_static_friction, object_bounciness = mass, dynamic_friction, static_friction, bounciness
+            commands.extend([{"$type": "set_mass",
+                              "mass": object_mass,
+                              "id": object_id},
+                             {"$type": "set_physic_material",
+                              "dynamic_friction": object_dynamic_friction,
+                              "static_friction": object_static_friction,
+                              "bounciness": object_bounciness,
+                              "id": object_id}])
+            if scale_factor is not None:
+                commands.append({"$type": scale_command_name,
+                                 "scale_factor": scale_factor,
+                                 "id": object_id})
+            # Add container shapes.
+            if len(record.container_shapes) > 0:
+                commands.extend(Controller._get_container_shape_commands(record=record, object_id=object_id))
         return commands
 
     @staticmethod
@@ -346,11 +377,12 @@ class Controller:
         if library == "":
             library = "materials_med.json"
         if library not in Controller.MATERIAL_LIBRARIANS:
+            from tdw.librarian import MaterialLibrarian
             Controller.MATERIAL_LIBRARIANS[library] = MaterialLibrarian(library)
         record = Controller.MATERIAL_LIBRARIANS[library].get_record(material_name)
         return {"$type": "add_material",
                 "name": material_name,
-                "url": record.get_url()}
+                "url": Controller.get_asset_bundle_url(record.get_url())}
 
     @staticmethod
     def get_add_scene(scene_name: str, library: str = "") -> dict:
@@ -366,11 +398,12 @@ class Controller:
         if library == "":
             library = "scenes.json"
         if library not in Controller.SCENE_LIBRARIANS:
+            from tdw.librarian import SceneLibrarian
             Controller.SCENE_LIBRARIANS[library] = SceneLibrarian(library)
         record = Controller.SCENE_LIBRARIANS[library].get_record(scene_name)
         return {"$type": "add_scene",
                 "name": scene_name,
-                "url": record.get_url()}
+                "url": Controller.get_asset_bundle_url(record.get_url())}
 
     @staticmethod
     def get_add_hdri_skybox(skybox_name: str, library: str = "") -> dict:
@@ -386,11 +419,12 @@ class Controller:
         if library == "":
             library = "hdri_skyboxes.json"
         if library not in Controller.HDRI_SKYBOX_LIBRARIANS:
+            from tdw.librarian import HDRISkyboxLibrarian
             Controller.HDRI_SKYBOX_LIBRARIANS[library] = HDRISkyboxLibrarian(library)
         record = Controller.HDRI_SKYBOX_LIBRARIANS[library].get_record(skybox_name)
         return {"$type": "add_hdri_skybox",
                 "name": skybox_name,
-                "url": record.get_url(),
+                "url": Controller.get_asset_bundle_url(record.get_url()),
                 "exposure": record.exposure,
                 "initial_skybox_rotation": record.initial_skybox_rotation,
                 "sun_elevation": record.sun_elevation,
@@ -419,17 +453,18 @@ class Controller:
         if library == "":
             library = "humanoids.json"
         if library not in Controller.HUMANOID_LIBRARIANS:
+            from tdw.librarian import HumanoidLibrarian
             Controller.HUMANOID_LIBRARIANS[library] = HumanoidLibrarian(library)
         record = Controller.HUMANOID_LIBRARIANS[library].get_record(humanoid_name)
         return {"$type": "add_humanoid",
                 "name": humanoid_name,
-                "url": record.get_url(),
+                "url": Controller.get_asset_bundle_url(record.get_url()),
                 "position": position,
                 "rotation": rotation,
                 "id": object_id}
 
     @staticmethod
-    def get_add_humanoid_animation(humanoid_animation_name: str, library: str = "") -> (dict, HumanoidAnimationRecord):
+    def get_add_humanoid_animation(humanoid_animation_name: str, library: str = "") -> (dict, "HumanoidAnimationRecord"):
         """
         Returns a valid add_humanoid_animation command and the record (which you will need to play an animation).
 
@@ -442,11 +477,12 @@ class Controller:
         if library == "":
             library = "humanoid_animations.json"
         if library not in Controller.HUMANOID_ANIMATION_LIBRARIANS:
+            from tdw.librarian import HumanoidAnimationLibrarian
             Controller.HUMANOID_ANIMATION_LIBRARIANS[library] = HumanoidAnimationLibrarian(library)
         record = Controller.HUMANOID_ANIMATION_LIBRARIANS[library].get_record(humanoid_animation_name)
         return {"$type": "add_humanoid_animation",
                 "name": humanoid_animation_name,
-                "url": record.get_url()}, record
+                "url": Controller.get_asset_bundle_url(record.get_url())}, record
 
     @staticmethod
     def get_add_robot(name: str, robot_id: int, position: Dict[str, float] = None, rotation: Dict[str, float] = None, library: str = "") -> dict:
@@ -465,6 +501,7 @@ class Controller:
         if library == "":
             library = "robots.json"
         if library not in Controller.ROBOT_LIBRARIANS:
+            from tdw.librarian import RobotLibrarian
             Controller.ROBOT_LIBRARIANS[library] = RobotLibrarian(library)
         record = Controller.ROBOT_LIBRARIANS[library].get_record(name)
 
@@ -479,7 +516,7 @@ class Controller:
                 "position": position,
                 "rotation": rotation,
                 "name": name,
-                "url": record.get_url()}
+                "url": Controller.get_asset_bundle_url(record.get_url())}
 
     @staticmethod
     def get_add_visual_effect(name: str, effect_id: int, position: Dict[str, float] = None, rotation: Dict[str, float] = None, library: str = "") -> dict:
@@ -498,6 +535,7 @@ class Controller:
         if library == "":
             library = "visual_effects.json"
         if library not in Controller.VISUAL_EFFECT_LIBRARIANS:
+            from tdw.librarian import VisualEffectLibrarian
             Controller.VISUAL_EFFECT_LIBRARIANS[library] = VisualEffectLibrarian(library)
         if position is None:
             position = {"x": 0, "y": 0, "z": 0}
@@ -509,7 +547,19 @@ class Controller:
                 "id": effect_id,
                 "position": position,
                 "rotation": rotation,
-                "url": record.get_url()}
+                "url": Controller.get_asset_bundle_url(record.get_url())}
+
+    @staticmethod
+    def get_asset_bundle_url(url: str) -> str:
+        """
+        :param url: The URL of an asset bundle.
+
+        :return: If `Controller.ASSET_BUNDLE_CACHE` is None, this returns `url`. Otherwise, this returns the `file:///` URL of the cached asset bundle, or `url` if the asset bundle isn't cached.
+        """
+
+        if Controller.ASSET_BUNDLE_CACHE is None:
+            return url
+        return Controller.ASSET_BUNDLE_CACHE.get_url(url)
 
     def get_version(self) -> Tuple[str, str]:
         """
@@ -518,6 +568,8 @@ class Controller:
         :return The TDW version and the Unity Engine version.
         """
 
+        from tdw.output_data import Version
+
         resp = self.communicate({"$type": "send_version"})
         for r in resp[:-1]:
             if Version.get_data_type_id(r) == "vers":
@@ -550,14 +602,32 @@ class Controller:
         return int.from_bytes(frame, byteorder='big')
 
     @staticmethod
-    def launch_build(port: int = 1071) -> None:
+    def launch_build(port: int = 1071) -> Optional[Popen]:
         """
         Launch the build. If a build doesn't exist at the expected location, download one to that location.
 
         :param port: The socket port.
+
+        :return: The build process, or None if the build couldn't be launched.
+        """
+
+        from tdw.release.build import Build
+
+        # Launch the build.
+        if Controller._download_build():
+            return Popen([str(Build.BUILD_PATH.resolve()), "-port "+str(port)])
+        return None
+
+    @staticmethod
+    def _download_build() -> bool:
+        """
+        If a build doesn't exist at the expected location, or if it is the wrong version, download one to that location.
+
+        :return: True if there is a build of the correct version at the expected location.
         """
 
-        # Download the build.
+        from tdw.release.build import Build
+
         need_to_download = False
         if not Build.BUILD_PATH.exists():
             print(f"Couldn't find build at {Build.BUILD_PATH}\nDownloading now...")
@@ -579,11 +649,175 @@ class Controller:
             success = Build.download()
             if not success:
                 print("You need to launch your own build.")
+            return success
+        return True
+
+    def _set_fields(self, zero_copy: bool) -> None:
+        """
+        Set the fields that don't depend on the socket. `AsyncController` calls this too, so that the two constructors set the same fields.
+
+        :param zero_copy: If True, `communicate()` returns a list of read-only `memoryview` objects that point directly to the received message frames rather than copies of them.
+        """
+
+        # A list of modules that will add commands on `communicate()`.
+        self.add_ons: List[AddOn] = list()
+        """:field
+        If True, `communicate()` returns a list of read-only `memoryview` objects that point directly to the received message frames rather than copies of them.
+        """
+        self.zero_copy: bool = zero_copy
+        """:field
+        The [`CommandSerializer`](command_serialization/command_serializer.md) that serializes the commands sent by `communicate()`.
+        """
+        self.serializer: CommandSerializer = CommandSerializer()
+        """:field
+        If not None, this [`Profiler`](profiler.md) measures how long each phase of `communicate()` takes.
+        """
+        self.profiler: Optional["Profiler"] = None
+        # The frame index of the most recent response. The add-ons share it via `FrameIndex.get(resp)` until the next response is received.
+        self._frame_index: Optional[FrameIndex] = None
+        self._is_standalone: bool = False
+        self._tdw_version: str = ""
+        self._unity_version: str = ""
+
+    def _get_message(self, commands: Union[dict, List[dict]]) -> List[bytes]:
+        """
+        Append commands from each add-on, invoke each add-on's `before_send(commands)`, and serialize the message.
+
+        :param commands: A list of JSON commands.
+
+        :return: The serialized multipart message.
+        """
+
+        if isinstance(commands, dict):
+            commands = [commands]
+
+        profiler = self.profiler
+        t0: float = 0
+        # Append commands from each add-on.
+        for m in self.add_ons:
+            if profiler is not None:
+                t0 = perf_counter()
+            # Initialize an add-on.
+            if not m.initialized:
+                commands.extend(m.get_initialization_commands())
+                m.initialized = True
+            # Append the add-on's commands.
+            else:
+                commands.extend(m.commands)
+                m.commands.clear()
+            if profiler is not None:
+                profiler.add(phase="commands:" + m.__class__.__name__, t0=t0)
+        # Possibly do something with the commands about to be sent.
+        for m in self.add_ons:
+            if profiler is not None:
+                t0 = perf_counter()
+            m.before_send(commands)
+            if profiler is not None:
+                profiler.add(phase="before_send:" + m.__class__.__name__, t0=t0)
+
+        # Serialize the message.
+        if profiler is not None:
+            t0 = perf_counter()
+        msg = [self.serializer.serialize(commands)]
+        if profiler is not None:
+            profiler.add(phase="serialize", t0=t0)
+        return msg
+
+    def _receive(self) -> list:
+        """
+        :return: The response from the build. If `self.zero_copy == True`, this is a list of memoryviews of the message frames. Otherwise, this is a list of bytes.
+        """
+
+        if self.zero_copy:
+            return [frame.buffer for frame in self.socket.recv_multipart(copy=False)]
         else:
-            success = True
-        # Launch the build.
-        if success:
-            Popen([str(Build.BUILD_PATH.resolve()), "-port "+str(port)])
+            return self.socket.recv_multipart()
+
+    def _on_receive(self, resp: list) -> None:
+        """
+        Check if the build quit and then invoke each add-on's `on_send(resp)`.
+
+        :param resp: The response from the build.
+        """
+
+        profiler = self.profiler
+        t0 = perf_counter() if profiler is not None else 0
+        # Sort the output data once. The add-ons will share this frame index.
+        frame_index = FrameIndex.get(resp)
+        self._frame_index = frame_index
+        # Check if we've received a quit signal. If we have, check if there was an error.
+        quit_signal = frame_index.get_first("quit")
+        if quit_signal is not None and not quit_signal.get_ok():
+            print("The build quit due to an error. Check the build log for more info.")
+            self._print_build_log()
+        if profiler is not None:
+            profiler.add(phase="quit_signal", t0=t0)
+
+        # Get commands per module for the next frame.
+        for m in self.add_ons:
+            if profiler is not None:
+                t0 = perf_counter()
+            # Send the add-on all of the output data.
+            if m.output_data_ids is None:
+                m.on_send(resp=resp)
+            # Send the add-on only the output data that it reads.
+            else:
+                m.on_send(resp=frame_index.get_response(output_data_ids=m.output_data_ids))
+            if profiler is not None:
+                profiler.add(phase="on_send:" + m.__class__.__name__, t0=t0)
+
+    def _on_too_many_ftre(self) -> None:
+        """
+        Print a message indicating that the controller gave up trying to re-send commands.
+        """
+
+        print("Quitting now because the controller tried too many times to resend commands to the build. "
+              "Check the build log for more info.")
+        self._print_build_log()
+
+    def _set_build_info(self, resp: list) -> None:
+        """
+        Set the build version info from the response to the startup commands.
+
+        :param resp: The response from the build.
+        """
+
+        from tdw.output_data import Version
+
+        for r in resp[:-1]:
+            if Version.get_data_type_id(r) == "vers":
+                v = Version(r)
+                self._tdw_version = v.get_tdw_version()
+                self._unity_version = v.get_unity_version()
+                self._is_standalone = v.get_standalone()
+                break
+
+    @staticmethod
+    def _get_startup_commands() -> List[dict]:
+        """
+        :return: The commands that are sent when the controller first connects to the build.
+        """
+
+        return [{"$type": "set_error_handling"},
+                {"$type": "send_version"},
+                {"$type": "load_scene",
+                 "scene_name": "ProcGenScene"}]
+
+    @staticmethod
+    def _is_ftre(resp: list) -> bool:
+        """
+        The dummy "ftre" (FailedToReceive) object is always in an array: [ftre, 0]
+        This way, the controller can easily differentiate it from a response that just has the frame count.
+
+        :param resp: The response from the build.
+
+        :return: True if the response contains an ftre object, meaning that the commands must be re-sent.
+        """
+
+        for i in range(len(resp) - 1):
+            if resp[i][4:8] == b'ftre':
+                return True
+        return False
 
     def _check_build_version(self, version: str = __version__, build_version: str = None) -> None:
         """
@@ -614,6 +848,39 @@ class Controller:
         print(f"If the build is on a remote Linux server, the log path is probably"
               f" ~/.config/unity3d/MIT/TDW/Player.log (where ~ is your home directory)")
 
+    @staticmethod
+    def _start_pypi_version_check() -> Optional[Thread]:
+        """
+        Compare the version of the tdw Python module to the latest on PyPi in a background thread so that the controller doesn't wait for PyPi to respond.
+        The check is skipped if it was done recently. See: `VersionCheckCache.is_cached()`.
+
+        :return: The background thread, or None if the check was skipped.
+        """
+
+        # `PyPi` is slow to import, so it is imported in the background thread.
+        from tdw.release.version_check_cache import VersionCheckCache
+
+        if VersionCheckCache.is_cached():
+            return None
+        thread = Thread(target=Controller._check_pypi_version_in_background, daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _check_pypi_version_in_background() -> None:
+        """
+        Compare the version of the tdw Python module to the latest on PyPi and cache the time of the check.
+        If PyPi can't be reached (for example, if this machine is offline), the check is still cached so that it won't be tried again until the cache expires.
+        """
+
+        from tdw.release.version_check_cache import VersionCheckCache
+
+        try:
+            Controller._check_pypi_version()
+        except Exception as e:
+            print(f"Couldn't compare the installed tdw Python module to PyPi: {e}")
+        VersionCheckCache.cache()
+
     @staticmethod
     def _check_pypi_version(v_installed_override: str = None, v_pypi_override: str = None) -> None:
         """
@@ -624,6 +891,8 @@ class Controller:
         :param v_pypi_override: Override for the PyPi version. Change this to debug.
         """
 
+        from tdw.release.pypi import PyPi
+
         # Get the version of the installed tdw module.
         installed_tdw_version = PyPi.get_installed_tdw_version()
         # Get the latest version of the tdw module on PyPi.
@@ -673,6 +942,132 @@ class Controller:
         else:
             print("Your installed tdw Python module is up to date with PyPi.")
 
+    @staticmethod
+    def _get_add_object_templates(model_names: List[str], object_ids: List[int],
+                                  library: str) -> Dict[str, Tuple[dict, "ModelRecord"]]:
+        """
+        :param model_names: The name of the model of each object.
+        :param object_ids: The ID of each object.
+        :param library: The path to the records file. If empty, the default library will be selected.
+
+        :return: A dictionary. Key = A model name. Value = Tuple: The parameters of an add_object command that are the same for every object with this model, and the model record.
+        """
+
+        if len(object_ids) != len(model_names):
+            raise Exception(f"Got {len(model_names)} model names but {len(object_ids)} object IDs.")
+        if library == "":
+            library = "models_core.json"
+        if library not in Controller.MODEL_LIBRARIANS:
+            from tdw.librarian import ModelLibrarian
+            Controller.MODEL_LIBRARIANS[library] = ModelLibrarian(library)
+        librarian = Controller.MODEL_LIBRARIANS[library]
+        templates: Dict[str, Tuple[dict, "ModelRecord"]] = dict()
+        for model_name in model_names:
+            if model_name in templates:
+                continue
+            record = librarian.get_record(model_name)
+            if record is None:
+                raise Exception(f"Model not found in {library}: {model_name}")
+            templates[model_name] = ({"$type": "add_object",
+                                      "name": record.name,
+                                      "url": Controller.get_asset_bundle_url(record.get_url()),
+                                      "scale_factor": record.scale_factor,
+                                      "category": record.wcategory,
+                                      "affordance_points": record.affordance_points}, record)
+        return templates
+
+    @staticmethod
+    def _get_vector3s(array: Optional["np.ndarray"], length: int,
+                      keys: Tuple[str, ...] = ("x", "y", "z")) -> List[Optional[Dict[str, float]]]:
+        """
+        :param array: A numpy array (or list) of vectors. Can be None.
+        :param length: The expected number of vectors.
+        :param keys: The key of each element of a vector.
+
+        :return: A list of vectors as dictionaries. If `array` is None, this is a list of None.
+        """
+
+        if array is None:
+            return [None] * length
+        if len(array) != length:
+            raise Exception(f"Expected {length} vectors but got {len(array)}.")
+        rows = array.tolist() if hasattr(array, "tolist") else array
+        return [dict(zip(keys, row)) for row in rows]
+
+    @staticmethod
+    def _get_default_physics_values(record: "ModelRecord") -> Tuple[float, float, float, float]:
+        """
+        :param record: The model record.
+
+        :return: Tuple: The default mass, dynamic friction, static friction, and bounciness of the model. If the model doesn't have default physics values, they are derived from similar models.
+        """
+
+        from tdw.physics_audio.object_audio_static import DEFAULT_OBJECT_AUDIO_STATIC_DATA
+        # Use default physics values.
+        if record.name in DEFAULT_OBJECT_AUDIO_STATIC_DATA:
+            mass = DEFAULT_OBJECT_AUDIO_STATIC_DATA[record.name].mass
+            bounciness = DEFAULT_OBJECT_AUDIO_STATIC_DATA[record.name].bounciness
+            material = DEFAULT_OBJECT_AUDIO_STATIC_DATA[record.name].material
+        # Fallback: Try to derive physics values from existing data.
+        else:
+            if "models_full.json" not in Controller.MODEL_LIBRARIANS:
+                from tdw.librarian import ModelLibrarian
+                Controller.MODEL_LIBRARIANS["models_full.json"] = ModelLibrarian("models_full.json")
+            # Get all models in the same category that have default physics values.
+            records = Controller.MODEL_LIBRARIANS["models_full.json"].get_all_models_in_wnid(record.wnid)
+            records = [r for r in records if not r.do_not_use and r.name != record.name and r.name in
+                       DEFAULT_OBJECT_AUDIO_STATIC_DATA]
+            # Fallback: Find objects with similar volume.
+            if len(records) == 0:
+                records = [r for r in Controller.MODEL_LIBRARIANS["models_full.json"].records if r.name in
+                           DEFAULT_OBJECT_AUDIO_STATIC_DATA and not r.do_not_use and r.name != record.name and
+                           0.8 <= abs(r.volume / record.volume) <= 1.2]
+            # Fallback: Select a default material and bounciness.
+            if len(records) == 0:
+                material: AudioMaterial = AudioMaterial.plastic_hard
+                # Select a default bounciness.
+                bounciness: float = 0
+            # Select the most common material and bounciness.
+            else:
+                materials: List[AudioMaterial] = [DEFAULT_OBJECT_AUDIO_STATIC_DATA[r.name].material for r in records]
+                material: AudioMaterial = max(set(materials), key=materials.count)
+                bouncinesses = [DEFAULT_OBJECT_AUDIO_STATIC_DATA[r.name].bounciness for r in records]
+                bounciness = round(sum(bouncinesses) / len(bouncinesses), 3)
+            # Derive the mass.
+            mass = DENSITIES[material] * record.volume
+        return mass, DYNAMIC_FRICTION[material], STATIC_FRICTION[material], bounciness
+
+    @staticmethod
+    def _get_container_shape_commands(record: "ModelRecord", object_id: int) -> List[dict]:
+        """
+        :param record: The model record.
+        :param object_id: The ID of the object.
+
+        :return: A list of commands to add the container shapes of the model to the object.
+        """
+
+        commands = []
+        for container_shape in record.container_shapes:
+            if isinstance(container_shape, BoxContainer):
+                commands.append(Controller._add_box_container(object_id=object_id,
+                                                              position=container_shape.position,
+                                                              tag=container_shape.tag,
+                                                              half_extents=container_shape.half_extents,
+                                                              rotation=container_shape.rotation))
+            elif isinstance(container_shape, CylinderContainer):
+                commands.append(Controller._add_cylinder_container(object_id=object_id,
+                                                                   position=container_shape.position,
+                                                                   tag=container_shape.tag,
+                                                                   radius=container_shape.radius,
+                                                                   height=container_shape.height,
+                                                                   rotation=container_shape.rotation))
+            elif isinstance(container_shape, SphereContainer):
+                commands.append(Controller._add_sphere_container(object_id=object_id,
+                                                                 position=container_shape.position,
+                                                                 tag=container_shape.tag,
+                                                                 radius=container_shape.radius))
+        return commands
+
     @staticmethod
     def _get_container_shape_command(command_name: str, object_id: int, position: Dict[str, float],
                                      tag: ContainerTag) -> dict:
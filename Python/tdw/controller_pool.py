@@ -0,0 +1,367 @@
+import multiprocessing as mp
+import queue
+import signal
+import sys
+from collections import deque
+from time import time, perf_counter
+from traceback import format_exc
+from typing import List, Dict, Callable, Any, Iterable, Iterator, Tuple, Optional, Deque, Set
+import zmq
+from tdw.controller import Controller
+from tdw.remote_build_launcher import RemoteBuildLauncher
+from tdw.add_ons.add_on import AddOn
+from tdw.controller_pool_data.worker_statistics import WorkerStatistics
+
+
+class ControllerPool:
+    """
+    Run episodes in parallel. Each worker process launches its own build on a free port and creates its own controller.
+
+    Episodes are handed out to the workers one at a time. When a worker finishes an episode, it receives the next episode. If a worker's build dies (or stops responding), the worker is restarted with a new build and the episode is re-run.
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.controller_pool import ControllerPool
+
+
+    def run_episode(c: Controller, episode: int) -> int:
+        resp = c.communicate({"$type": "do_nothing"})
+        return Controller.get_frame(resp[-1])
+
+
+    if __name__ == "__main__":
+        pool = ControllerPool(num_workers=4, episode_function=run_episode)
+        results = pool.run(episodes=range(100))
+        pool.close()
+        for statistics in pool.statistics:
+            print(statistics.worker_index, statistics.get_fps())
+    ```
+
+    The episode function is called in the worker process. Its first parameter is the worker's controller. Its second parameter is an episode. It can return any picklable value. The episode function and each episode must be picklable.
+    """
+
+    def __init__(self, num_workers: int, episode_function: Callable[[Controller, Any], Any],
+                 controller_class: type = Controller, controller_kwargs: dict = None, ports: List[int] = None,
+                 launch_build: bool = True, prefetch: int = 1, max_retries: int = 2, response_timeout: float = 60,
+                 startup_timeout: float = 300):
+        """
+        :param num_workers: The number of worker processes. Each worker process has its own build.
+        :param episode_function: A function that runs an episode in a worker process. Parameters: The worker's controller and the episode. Returns: The result, which must be picklable.
+        :param controller_class: The type of controller. Must be `Controller` or a subclass of `Controller`.
+        :param controller_kwargs: Additional keyword arguments for the controller constructor, other than `port` and `launch_build`. If None, defaults to `{"check_version": False}`.
+        :param ports: If not None, the workers will use these ports. The length of this list must equal `num_workers`. If None, each worker will use a free port.
+        :param launch_build: If True, each worker automatically launches a build. If False, you must launch your own builds on each of the `ports`.
+        :param prefetch: The number of episodes queued per worker in addition to the episode that the worker is currently running. This limits how many episodes are pulled from the `episodes` iterable at a time.
+        :param max_retries: If an episode fails (because the episode function raised an exception, or because the build died), re-run it at most this many times before raising an exception.
+        :param response_timeout: If the build doesn't respond after this many seconds, assume that it died and restart the worker. If None, wait forever.
+        :param startup_timeout: If a worker doesn't create its controller after this many seconds, assume that its build didn't launch and restart the worker.
+        """
+
+        if ports is not None:
+            assert len(ports) == num_workers, f"Expected {num_workers} ports but got {len(ports)}"
+        else:
+            assert launch_build, "If `launch_build` is False, you must set `ports`."
+        self._num_workers: int = num_workers
+        self._episode_function: Callable[[Controller, Any], Any] = episode_function
+        self._controller_class: type = controller_class
+        if controller_kwargs is None:
+            self._controller_kwargs: dict = {"check_version": False}
+        else:
+            self._controller_kwargs = controller_kwargs
+        self._ports: Optional[List[int]] = ports
+        self._launch_build: bool = launch_build
+        self._prefetch: int = prefetch
+        self._max_retries: int = max_retries
+        self._response_timeout: Optional[float] = response_timeout
+        self._startup_timeout: float = startup_timeout
+        """:field
+        Throughput statistics per worker.
+        """
+        self.statistics: List[WorkerStatistics] = [WorkerStatistics(worker_index=i) for i in range(num_workers)]
+        # The worker processes.
+        self._processes: List[Optional[mp.Process]] = [None for _ in range(num_workers)]
+        # One task queue per worker.
+        self._task_queues: List[Optional[mp.Queue]] = [None for _ in range(num_workers)]
+        # All workers put messages in this queue.
+        self._results: mp.Queue = mp.Queue()
+        # Key = Worker index. Value = Indices of episodes that were assigned to the worker but haven't been completed.
+        self._assigned: Dict[int, List[int]] = {i: list() for i in range(num_workers)}
+        # Key = Worker index. Value = True if the worker created its controller.
+        self._ready: Dict[int, bool] = {i: False for i in range(num_workers)}
+        # Key = Worker index. Value = The time at which the worker was started.
+        self._start_times: Dict[int, float] = dict()
+        # Key = Worker index. Value = The incarnation ID of the worker's current process. This is incremented whenever the worker is restarted.
+        self._incarnations: Dict[int, int] = {i: 0 for i in range(num_workers)}
+        # Key = Worker index. Value = The number of times in a row that the worker failed to start.
+        self._num_startup_failures: Dict[int, int] = {i: 0 for i in range(num_workers)}
+        # If True, the workers have been started.
+        self._started: bool = False
+
+    def run(self, episodes: Iterable[Any]) -> List[Any]:
+        """
+        Run episodes in parallel and wait for them to finish.
+
+        :param episodes: The episodes. Each episode will be the second parameter of `episode_function`. This can be a generator; episodes are pulled from it only when a worker is ready to receive them.
+
+        :return: A list of results, one per episode, in the same order as `episodes`.
+        """
+
+        results: Dict[int, Any] = dict(self.imap(episodes=episodes))
+        return [results[i] for i in range(len(results))]
+
+    def imap(self, episodes: Iterable[Any]) -> Iterator[Tuple[int, Any]]:
+        """
+        Run episodes in parallel and yield each result as soon as it is received.
+
+        :param episodes: The episodes. Each episode will be the second parameter of `episode_function`. This can be a generator; episodes are pulled from it only when a worker is ready to receive them.
+
+        :return: A generator of tuples: The index of the episode in `episodes`, and the result.
+        """
+
+        if not self._started:
+            self._start()
+        episode_iterator = iter(episodes)
+        exhausted: bool = False
+        # Key = Episode index. Value = The episode.
+        pending: Dict[int, Any] = dict()
+        # Episodes that need to be re-run.
+        retry: Deque[int] = deque()
+        # Key = Episode index. Value = The number of failures.
+        failures: Dict[int, int] = dict()
+        # The indices of workers that are exiting because their episode function raised an exception.
+        errored: Set[int] = set()
+        episode_index: int = 0
+        while not exhausted or len(pending) > 0:
+            # Give episodes to workers that have room in their queues.
+            for worker_index in range(self._num_workers):
+                while len(self._assigned[worker_index]) < self._prefetch + 1:
+                    if len(retry) > 0:
+                        i = retry.popleft()
+                    elif not exhausted:
+                        try:
+                            pending[episode_index] = next(episode_iterator)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                        i = episode_index
+                        episode_index += 1
+                    else:
+                        break
+                    self._assigned[worker_index].append(i)
+                    self._task_queues[worker_index].put((i, pending[i]))
+            if exhausted and len(pending) == 0:
+                break
+            # Receive messages from the workers.
+            messages: list = list()
+            try:
+                messages.append(self._results.get(timeout=0.1))
+                while True:
+                    messages.append(self._results.get_nowait())
+            except queue.Empty:
+                pass
+            for message in messages:
+                message_type: str = message[0]
+                worker_index: int = message[1]
+                # Ignore messages from a process that has since been restarted.
+                if message[2] != self._incarnations[worker_index]:
+                    continue
+                if message_type == "ready":
+                    self._ready[worker_index] = True
+                    self._num_startup_failures[worker_index] = 0
+                elif message_type == "done":
+                    i, result, time_elapsed, num_frames = message[3:]
+                    if i in self._assigned[worker_index]:
+                        self._assigned[worker_index].remove(i)
+                    if i in pending:
+                        del pending[i]
+                        statistics = self.statistics[worker_index]
+                        statistics.num_episodes += 1
+                        statistics.num_frames += num_frames
+                        statistics.time_elapsed += time_elapsed
+                        yield i, result
+                elif message_type == "error":
+                    i, error = message[3:]
+                    self._on_episode_failed(episode_index=i, failures=failures, error=error)
+                    # Don't count this failure again when the worker process exits.
+                    errored.add(worker_index)
+            # Restart workers that died or that didn't start in time.
+            for worker_index in range(self._num_workers):
+                process = self._processes[worker_index]
+                if process.is_alive():
+                    if not self._ready[worker_index] and \
+                            time() - self._start_times[worker_index] > self._startup_timeout:
+                        process.terminate()
+                        process.join()
+                    else:
+                        continue
+                if not self._ready[worker_index]:
+                    self._num_startup_failures[worker_index] += 1
+                    if self._num_startup_failures[worker_index] > self._max_retries:
+                        self.close()
+                        raise Exception(f"Worker {worker_index} failed to start "
+                                        f"{self._num_startup_failures[worker_index]} times.")
+                # The build died during the worker's current episode.
+                elif worker_index not in errored and len(self._assigned[worker_index]) > 0:
+                    self._on_episode_failed(episode_index=self._assigned[worker_index][0], failures=failures,
+                                            error=f"The build of worker {worker_index} stopped responding.")
+                # Re-run the worker's episodes.
+                for i in self._assigned[worker_index]:
+                    if i in pending and i not in retry:
+                        retry.append(i)
+                self._assigned[worker_index].clear()
+                errored.discard(worker_index)
+                self.statistics[worker_index].num_restarts += 1
+                self._start_worker(worker_index=worker_index)
+
+    def _on_episode_failed(self, episode_index: int, failures: Dict[int, int], error: str) -> None:
+        """
+        Count an episode failure. Raise an exception if the episode failed too many times.
+
+        :param episode_index: The index of the episode.
+        :param failures: The number of failures per episode.
+        :param error: The error message.
+        """
+
+        if episode_index not in failures:
+            failures[episode_index] = 0
+        failures[episode_index] += 1
+        if failures[episode_index] > self._max_retries:
+            self.close()
+            raise Exception(f"Episode {episode_index} failed {failures[episode_index]} times. Last error:\n{error}")
+
+    def close(self) -> None:
+        """
+        Terminate each build and stop each worker process.
+        """
+
+        if not self._started:
+            return
+        for worker_index in range(self._num_workers):
+            if self._processes[worker_index].is_alive():
+                self._task_queues[worker_index].put(None)
+        for worker_index in range(self._num_workers):
+            self._processes[worker_index].join(timeout=10)
+            if self._processes[worker_index].is_alive():
+                self._processes[worker_index].terminate()
+                self._processes[worker_index].join()
+        self._started = False
+
+    def _start(self) -> None:
+        """
+        Start each worker process.
+        """
+
+        # Download the build once so that the workers don't all try to download it at the same time.
+        if self._launch_build:
+            if not Controller._download_build():
+                raise Exception("Failed to download the build.")
+        for worker_index in range(self._num_workers):
+            self._start_worker(worker_index=worker_index)
+        self._started = True
+
+    def _start_worker(self, worker_index: int) -> None:
+        """
+        Start a worker process.
+
+        :param worker_index: The index of the worker.
+        """
+
+        if self._ports is None:
+            port = RemoteBuildLauncher.find_free_port()
+        else:
+            port = self._ports[worker_index]
+        self.statistics[worker_index].port = port
+        self._ready[worker_index] = False
+        self._start_times[worker_index] = time()
+        self._task_queues[worker_index] = mp.Queue()
+        self._incarnations[worker_index] += 1
+        process = mp.Process(target=_run_worker,
+                             args=(worker_index, self._incarnations[worker_index], port, self._launch_build, self._controller_class,
+                                   self._controller_kwargs, self._episode_function, self._response_timeout,
+                                   self._task_queues[worker_index], self._results),
+                             daemon=True)
+        process.start()
+        self._processes[worker_index] = process
+
+
+class _FrameCounter(AddOn):
+    """
+    Count the number of `communicate()` calls.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.initialized = True
+        self.num_frames: int = 0
+
+    def get_initialization_commands(self) -> List[dict]:
+        return []
+
+    def on_send(self, resp: List[bytes]) -> None:
+        self.num_frames += 1
+
+
+def _exit(signum, frame) -> None:
+    """
+    Exit the worker process via `sys.exit()` so that `finally` blocks are executed.
+    """
+
+    sys.exit(1)
+
+
+def _run_worker(worker_index: int, incarnation: int, port: int, launch_build: bool, controller_class: type, controller_kwargs: dict,
+                episode_function: Callable[[Controller, Any], Any], response_timeout: Optional[float],
+                tasks: mp.Queue, results: mp.Queue) -> None:
+    """
+    The main loop of a worker process.
+
+    :param worker_index: The index of the worker.
+    :param incarnation: The incarnation ID of this worker process. This is included in every message so that the pool can ignore messages from processes that have been restarted.
+    :param port: The socket port.
+    :param launch_build: If True, launch a build.
+    :param controller_class: The type of controller.
+    :param controller_kwargs: Additional keyword arguments for the controller constructor.
+    :param episode_function: The function that runs an episode.
+    :param response_timeout: If not None, the socket's receive timeout in seconds.
+    :param tasks: The worker's task queue.
+    :param results: The shared results queue.
+    """
+
+    # Kill the build if the pool terminates this process.
+    signal.signal(signal.SIGTERM, _exit)
+    build = None
+    try:
+        if launch_build:
+            build = Controller.launch_build(port=port)
+        c: Controller = controller_class(port=port, launch_build=False, **controller_kwargs)
+        # If the build dies, `communicate()` will raise an exception instead of waiting forever.
+        if response_timeout is not None:
+            c.socket.setsockopt(zmq.RCVTIMEO, int(response_timeout * 1000))
+        frame_counter = _FrameCounter()
+        results.put(("ready", worker_index, incarnation))
+        while True:
+            task = tasks.get()
+            # Stop the worker.
+            if task is None:
+                c.communicate({"$type": "terminate"})
+                return
+            episode_index, episode = task
+            # The episode function might have replaced the add-ons.
+            if frame_counter not in c.add_ons:
+                c.add_ons.append(frame_counter)
+            frame_counter.num_frames = 0
+            t0 = perf_counter()
+            try:
+                result = episode_function(c, episode)
+            except Exception:
+                # The state of the build is unknown, so restart the worker.
+                results.put(("error", worker_index, incarnation, episode_index, format_exc()))
+                return
+            results.put(("done", worker_index, incarnation, episode_index, result, perf_counter() - t0,
+                         frame_counter.num_frames))
+    finally:
+        if build is not None:
+            try:
+                build.wait(timeout=5)
+            except Exception:
+                build.kill()
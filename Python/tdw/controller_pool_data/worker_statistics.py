@@ -0,0 +1,48 @@
+class WorkerStatistics:
+    """
+    Throughput statistics for a worker process in a [`ControllerPool`](../controller_pool.md).
+    """
+
+    def __init__(self, worker_index: int):
+        """
+        :param worker_index: The index of the worker.
+        """
+
+        """:field
+        The index of the worker.
+        """
+        self.worker_index: int = worker_index
+        """:field
+        The port of the worker's current build.
+        """
+        self.port: int = -1
+        """:field
+        The number of episodes that the worker completed.
+        """
+        self.num_episodes: int = 0
+        """:field
+        The total number of `communicate()` calls during the worker's completed episodes.
+        """
+        self.num_frames: int = 0
+        """:field
+        The total time in seconds that the worker spent running completed episodes.
+        """
+        self.time_elapsed: float = 0
+        """:field
+        The number of times that the worker process was restarted, for example because its build died.
+        """
+        self.num_restarts: int = 0
+
+    def get_episodes_per_second(self) -> float:
+        """
+        :return: The number of completed episodes per second.
+        """
+
+        return self.num_episodes / self.time_elapsed if self.time_elapsed > 0 else 0
+
+    def get_fps(self) -> float:
+        """
+        :return: The frames per second (`communicate()` calls per second) during completed episodes.
+        """
+
+        return self.num_frames / self.time_elapsed if self.time_elapsed > 0 else 0
@@ -0,0 +1,155 @@
+import mmap
+from struct import Struct
+from pathlib import Path
+from typing import List, Tuple, Union, Iterator, Optional
+from tdw.episode_file.episode_file_writer import EpisodeFileWriter
+
+
+class EpisodeFileReader:
+    """
+    Read an episode file written by an [`EpisodeFileWriter`](episode_file_writer.md) or by an [`OutputDataWriter`](../add_ons/output_data_writer.md) with `binary=True`.
+
+    The file is memory-mapped. Each frame is a list of read-only `memoryview`s of the file, equivalent to the return value of a `c.communicate(commands)` call. The `memoryview`s aren't copied and can be used to create output data objects:
+
+    ```python
+    from tdw.episode_file.episode_file_reader import EpisodeFileReader
+    from tdw.output_data import OutputData, Transforms
+
+    reader = EpisodeFileReader(path="episode.tdwe")
+    for resp in reader:
+        for i in range(len(resp) - 1):
+            r_id = OutputData.get_data_type_id(resp[i])
+            if r_id == "tran":
+                transforms = Transforms(resp[i])
+                print(transforms.get_position(0))
+    reader.close()
+    ```
+
+    If the episode file doesn't have an index footer, for example because the writer wasn't closed, the reader finds the frames by reading each frame's header. An incomplete last frame is ignored.
+    """
+
+    # A little-endian uint32.
+    _UINT32: Struct = Struct("<I")
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        :param path: The path to the episode file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+        """
+
+        if isinstance(path, str):
+            """:field
+            The path to the episode file.
+            """
+            self.path: Path = Path(path)
+        else:
+            self.path: Path = path
+        offsets, end = EpisodeFileReader.read_offsets(self.path)
+        # The byte offset of each frame.
+        self._offsets: List[int] = offsets
+        # The offset of the end of the last frame.
+        self._end: int = end
+        with self.path.open("rb") as f:
+            # The memory-mapped file.
+            self._mmap: Optional[mmap.mmap] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # A read-only view of the memory-mapped file.
+        self._view: memoryview = memoryview(self._mmap)
+
+    def get_num_frames(self) -> int:
+        """
+        :return: The number of frames in the episode file.
+        """
+
+        return len(self._offsets)
+
+    def get_frame(self, frame: int) -> List[memoryview]:
+        """
+        :param frame: The index of the frame. This can be negative, for example -1 for the last frame.
+
+        :return: The response of the frame as a list of read-only `memoryview`s of the file.
+        """
+
+        offset = self._offsets[frame]
+        num_elements = EpisodeFileReader._UINT32.unpack_from(self._view, offset)[0]
+        lengths = Struct(f"<{num_elements}I").unpack_from(self._view, offset + 4)
+        offset += 4 + 4 * num_elements
+        offset += -offset % EpisodeFileWriter.ALIGNMENT
+        resp: List[memoryview] = list()
+        for length in lengths:
+            resp.append(self._view[offset: offset + length])
+            offset += length
+            offset += -offset % EpisodeFileWriter.ALIGNMENT
+        return resp
+
+    def close(self) -> None:
+        """
+        Close the memory-mapped file. Don't use any of the `memoryview`s returned by `get_frame(frame)` after calling this function.
+        """
+
+        if self._mmap is None:
+            return
+        self._view.release()
+        # The memory-mapped file can't be closed while there are views of it. It will be closed when they're deleted.
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+        self._mmap = None
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, frame: int) -> List[memoryview]:
+        return self.get_frame(frame)
+
+    def __iter__(self) -> Iterator[List[memoryview]]:
+        for i in range(len(self._offsets)):
+            yield self.get_frame(i)
+
+    @staticmethod
+    def read_offsets(path: Path) -> Tuple[List[int], int]:
+        """
+        Read the byte offset of each frame in an episode file. If the file has an index footer, the offsets are read from the footer. Otherwise, the offsets are found by reading each frame's header.
+
+        :param path: The path to the episode file.
+
+        :return: Tuple: The byte offset of each frame, the byte offset of the end of the last complete frame.
+        """
+
+        # An empty file can't be memory-mapped.
+        if path.stat().st_size < EpisodeFileWriter.HEADER_SIZE:
+            raise Exception(f"Not an episode file: {path}")
+        with path.open("rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            size = len(data)
+            if size < EpisodeFileWriter.HEADER_SIZE or data[:4] != EpisodeFileWriter.MAGIC:
+                raise Exception(f"Not an episode file: {path}")
+            version = EpisodeFileReader._UINT32.unpack_from(data, 4)[0]
+            if version != EpisodeFileWriter.VERSION:
+                raise Exception(f"Unsupported episode file version: {version}")
+            # Read the index footer.
+            footer_size = EpisodeFileWriter._FOOTER.size
+            if size >= EpisodeFileWriter.HEADER_SIZE + footer_size:
+                num_frames, index_offset, magic = EpisodeFileWriter._FOOTER.unpack_from(data, size - footer_size)
+                if magic == EpisodeFileWriter.INDEX_MAGIC and index_offset + num_frames * 8 + footer_size == size:
+                    return list(Struct(f"<{num_frames}Q").unpack_from(data, index_offset)), index_offset
+            # Find the frames by reading each frame's header.
+            offsets: List[int] = list()
+            offset = EpisodeFileWriter.HEADER_SIZE
+            while offset + 4 <= size:
+                num_elements = EpisodeFileReader._UINT32.unpack_from(data, offset)[0]
+                end = offset + 4 + 4 * num_elements
+                if end > size:
+                    break
+                end += -end % EpisodeFileWriter.ALIGNMENT
+                for length in Struct(f"<{num_elements}I").unpack_from(data, offset + 4):
+                    end += length
+                    end += -end % EpisodeFileWriter.ALIGNMENT
+                # This frame is incomplete.
+                if end > size:
+                    break
+                offsets.append(offset)
+                offset = end
+            return offsets, offset
+        finally:
+            data.close()
@@ -0,0 +1,146 @@
+from struct import Struct
+from pathlib import Path
+from typing import List, Union, Optional, BinaryIO
+
+
+class EpisodeFileWriter:
+    """
+    Append responses from the build to a single binary episode file. The file can be read with an [`EpisodeFileReader`](episode_file_reader.md).
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.tdw_utils import TDWUtils
+    from tdw.episode_file.episode_file_writer import EpisodeFileWriter
+
+    c = Controller()
+    writer = EpisodeFileWriter(path="episode.tdwe")
+    resp = c.communicate([TDWUtils.create_empty_room(12, 12),
+                          {"$type": "send_transforms",
+                           "frequency": "always"}])
+    writer.write(resp)
+    for i in range(100):
+        resp = c.communicate([])
+        writer.write(resp)
+    writer.close()
+    c.communicate({"$type": "terminate"})
+    ```
+
+    The file begins with a header: `TDWE` followed by the file format version as a little-endian uint32.
+
+    Each frame is the number of elements in the response as a little-endian uint32, followed by the length of each element as a little-endian uint32, followed by each element's bytes. The start of each element is aligned to 8 bytes.
+
+    `close()` appends an index footer: The byte offset of each frame as a little-endian uint64, followed by the number of frames and the byte offset of the index as little-endian uint64s, followed by `TDWI`. If the file is opened again without overwriting it, the footer is removed, new frames are appended, and the footer is written again when the writer is closed. If the file doesn't have a footer, for example because the writer wasn't closed, the reader finds the frames by reading each frame's header.
+    """
+
+    """:class_var
+    The first four bytes of an episode file.
+    """
+    MAGIC: bytes = b"TDWE"
+    """:class_var
+    The last four bytes of an episode file that has an index footer.
+    """
+    INDEX_MAGIC: bytes = b"TDWI"
+    """:class_var
+    The version of the file format.
+    """
+    VERSION: int = 1
+    """:class_var
+    The size of the header in bytes.
+    """
+    HEADER_SIZE: int = 8
+    """:class_var
+    The start of each element is aligned to this many bytes.
+    """
+    ALIGNMENT: int = 8
+    # A little-endian uint32.
+    _UINT32: Struct = Struct("<I")
+    # The last bytes of the index footer: The number of frames, the offset of the index, and the index magic.
+    _FOOTER: Struct = Struct("<QQ4s")
+
+    def __init__(self, path: Union[str, Path], overwrite: bool = True, buffer_size: int = -1):
+        """
+        :param path: The path to the episode file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+        :param overwrite: If True and an episode file already exists at `path`, overwrite the file. If False, append frames to the existing file.
+        :param buffer_size: Write buffered frames to the episode file when the buffer is larger than this many bytes. If -1, use Python's default buffer size.
+        """
+
+        if isinstance(path, str):
+            """:field
+            The path to the episode file.
+            """
+            self.path: Path = Path(path)
+        else:
+            self.path: Path = path
+        if not self.path.parent.exists():
+            self.path.parent.mkdir(parents=True)
+        # The byte offset of each frame.
+        self._offsets: List[int] = list()
+        if not overwrite and self.path.exists() and self.path.stat().st_size > 0:
+            # The reader imports this module, so it's imported here.
+            from tdw.episode_file.episode_file_reader import EpisodeFileReader
+
+            offsets, end = EpisodeFileReader.read_offsets(self.path)
+            self._offsets.extend(offsets)
+            self._file: Optional[BinaryIO] = self.path.open("r+b", buffering=buffer_size)
+            # Remove the index footer and anything after the last complete frame.
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._file = self.path.open("wb", buffering=buffer_size)
+            self._file.write(EpisodeFileWriter.MAGIC + EpisodeFileWriter._UINT32.pack(EpisodeFileWriter.VERSION))
+        # The offset of the end of the last frame.
+        self._end: int = self._file.tell()
+
+    def get_num_frames(self) -> int:
+        """
+        :return: The number of frames in the episode file.
+        """
+
+        return len(self._offsets)
+
+    def write(self, resp: List[bytes]) -> None:
+        """
+        Append a frame to the episode file.
+
+        :param resp: The response from the build. Elements can be `bytes`, `memoryview`s, or any other object that supports the buffer protocol.
+        """
+
+        if self._file is None:
+            raise Exception(f"Can't write to {self.path} because the writer is closed.")
+        lengths: List[int] = [memoryview(r).nbytes for r in resp]
+        header = Struct(f"<{len(lengths) + 1}I").pack(len(lengths), *lengths)
+        self._file.write(header)
+        size = len(header)
+        padding = -size % EpisodeFileWriter.ALIGNMENT
+        if padding > 0:
+            self._file.write(bytes(padding))
+            size += padding
+        for r, length in zip(resp, lengths):
+            self._file.write(r)
+            size += length
+            padding = -length % EpisodeFileWriter.ALIGNMENT
+            if padding > 0:
+                self._file.write(bytes(padding))
+                size += padding
+        self._offsets.append(self._end)
+        self._end += size
+
+    def flush(self) -> None:
+        """
+        Flush buffered frames to the episode file so that they can be read.
+        """
+
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        """
+        Write the index footer and close the episode file.
+        """
+
+        if self._file is None:
+            return
+        self._file.write(Struct(f"<{len(self._offsets)}Q").pack(*self._offsets))
+        self._file.write(EpisodeFileWriter._FOOTER.pack(len(self._offsets), self._end, EpisodeFileWriter.INDEX_MAGIC))
+        self._file.close()
+        self._file = None
@@ -14,14 +14,15 @@
 
 from . import number_types as N
 from . import packer
-from .compat import memoryview_type
 from .compat import import_numpy, NumpyRequiredForThisFeature
 
 import numpy as np
 
 def Get(packer_type, buf, head):
     """ Get decodes a value at buf[head] using `packer_type`. """
-    return packer_type.unpack_from(memoryview_type(buf), head)[0]
+    # `unpack_from` accepts any object that supports the buffer protocol (bytes, bytearray, memoryview, zmq.Frame),
+    # so there's no need to wrap `buf` in a new memoryview per call.
+    return packer_type.unpack_from(buf, head)[0]
 
 
 def GetVectorAsNumpy(numpy_type, buf, count, offset):
@@ -0,0 +1,93 @@
+from struct import Struct
+from typing import Dict, List, Tuple, Union
+import numpy as np
+
+
+class TableLayout:
+    """
+    A precompiled layout of a FlatBuffers table with scalar fields, inline struct fields, and vectors of structs.
+
+    The generated accessors in `tdw.FBOutput` read one field at a time: each call looks up the vtable, creates a `Table` or struct object, and unpacks a single value. A `TableLayout` reads the whole vtable with one `unpack_from()` call and then decodes each field with a precompiled `Struct` (or, for vectors of structs, a single numpy view).
+
+    Each field is a tuple: `(slot, kind, default)` where `slot` is the index of the field in the schema and `kind` is one of the keys of `TableLayout.KINDS`. For vectors of structs, `kind` is `"vector"` and `default` is the number of float32 values per struct; the decoded value is a read-only numpy array of shape `(n, default)`.
+
+    The generated accessors remain available via `OutputData.data` as a fallback.
+    """
+
+    """:class_var
+    Key = A field kind. Value = A precompiled struct.
+    """
+    KINDS: Dict[str, Struct] = {"int32": Struct("<i"),
+                                "uint8": Struct("<B"),
+                                "bool": Struct("<?"),
+                                "float32": Struct("<f"),
+                                "vector3": Struct("<3f"),
+                                "quaternion": Struct("<4f"),
+                                "color": Struct("<3f")}
+    # The root table offset, the soffset to the vtable, and the vtable header.
+    _UOFFSET: Struct = Struct("<I")
+    _SOFFSET: Struct = Struct("<i")
+    _VOFFSET: Struct = Struct("<H")
+    # Key = The number of fields in a vtable. Value = A precompiled struct that reads every field offset.
+    _VTABLES: Dict[int, Struct] = dict()
+
+    def __init__(self, fields: List[Tuple[int, str, Union[int, float, bool, tuple]]]):
+        """
+        :param fields: A list of fields, in the order that they will be returned by `decode(buf)`. Each field is `(slot, kind, default)`.
+        """
+
+        # A list of (slot, struct, default, is_scalar, is_vector).
+        self._fields: List[tuple] = list()
+        for slot, kind, default in fields:
+            if kind == "vector":
+                self._fields.append((slot, None, default, False, True))
+            else:
+                s = TableLayout.KINDS[kind]
+                self._fields.append((slot, s, default, kind in ["int32", "uint8", "bool", "float32"], False))
+
+    def decode(self, buf) -> tuple:
+        """
+        Decode every field of the root table of a FlatBuffers byte array.
+
+        :param buf: The byte array. This can be `bytes`, a `bytearray`, or a `memoryview`.
+
+        :return: A tuple of the decoded values in the same order as the fields.
+        """
+
+        pos = TableLayout._UOFFSET.unpack_from(buf, 0)[0]
+        vtable = pos - TableLayout._SOFFSET.unpack_from(buf, pos)[0]
+        num_fields = (TableLayout._VOFFSET.unpack_from(buf, vtable)[0] - 4) // 2
+        if num_fields not in TableLayout._VTABLES:
+            TableLayout._VTABLES[num_fields] = Struct("<" + str(num_fields) + "H")
+        offsets = TableLayout._VTABLES[num_fields].unpack_from(buf, vtable + 4)
+        values = list()
+        for slot, s, default, is_scalar, is_vector in self._fields:
+            o = offsets[slot] if slot < num_fields else 0
+            if o == 0:
+                if is_vector:
+                    values.append(TableLayout._get_read_only(np.zeros(shape=(0, default), dtype=np.float32)))
+                else:
+                    values.append(default)
+            elif is_vector:
+                # Follow the uoffset to the vector, then read the vector length.
+                v = pos + o
+                v += TableLayout._UOFFSET.unpack_from(buf, v)[0]
+                length = TableLayout._UOFFSET.unpack_from(buf, v)[0]
+                values.append(TableLayout._get_read_only(np.frombuffer(buf, dtype=np.float32, count=length * default,
+                                                                       offset=v + 4).reshape(-1, default)))
+            elif is_scalar:
+                values.append(s.unpack_from(buf, pos + o)[0])
+            else:
+                values.append(s.unpack_from(buf, pos + o))
+        return tuple(values)
+
+    @staticmethod
+    def _get_read_only(a: np.ndarray) -> np.ndarray:
+        """
+        :param a: A numpy array.
+
+        :return: The array, flagged as read-only.
+        """
+
+        a.flags.writeable = False
+        return a
@@ -0,0 +1,222 @@
+from importlib import import_module
+from typing import List, Dict, Optional, Set, FrozenSet, TYPE_CHECKING
+from weakref import WeakValueDictionary
+# `tdw.output_data` is slow to import, so it is imported the first time that output data is deserialized.
+if TYPE_CHECKING:
+    from tdw.output_data import OutputData
+
+
+class FrameIndex:
+    """
+    The output data of a response from the build, sorted by [output data ID](../api/output_data.md).
+
+    Output data objects are created the first time they're requested and are then cached, so that each byte array is deserialized at most once per frame no matter how many add-ons read it.
+
+    Add-ons can get the frame index of a response in `on_send(resp)` by calling `FrameIndex.get(resp)`. `Controller.communicate(commands)` creates the frame index before invoking the add-ons' `on_send(resp)` functions, so every add-on shares the same frame index:
+
+    ```python
+    from typing import List
+    from tdw.add_ons.add_on import AddOn
+    from tdw.frame_index import FrameIndex
+
+
+    class MyAddOn(AddOn):
+        def get_initialization_commands(self) -> List[dict]:
+            return [{"$type": "send_transforms",
+                     "frequency": "always"}]
+
+        def on_send(self, resp: List[bytes]) -> None:
+            frame_index = FrameIndex.get(resp)
+            for transforms in frame_index.get_output_data("tran"):
+                for i in range(transforms.get_num()):
+                    print(transforms.get_id(i), transforms.get_position(i))
+    ```
+    """
+
+    # Key = An output data ID. Value = The name of an output data class in `tdw.output_data`.
+    _OUTPUT_DATA_TYPE_NAMES: Dict[str, str] = {"ausd": "AudioSourceDone",
+                                               "audi": "AudioSources",
+                                               "avki": "AvatarKinematic",
+                                               "avnk": "AvatarNonKinematic",
+                                               "avsc": "AvatarSegmentationColor",
+                                               "avsb": "AvatarSimpleBody",
+                                               "boun": "Bounds",
+                                               "cama": "CameraMatrices",
+                                               "cate": "Categories",
+                                               "coll": "Collision",
+                                               "cont": "Containment",
+                                               "dron": "Drones",
+                                               "dcom": "DynamicCompositeObjects",
+                                               "dyem": "DynamicEmptyObjects",
+                                               "drob": "DynamicRobots",
+                                               "enci": "EnvironmentColliderIntersection",
+                                               "enco": "EnvironmentCollision",
+                                               "eule": "EulerAngles",
+                                               "fofv": "FieldOfView",
+                                               "flex": "FlexParticles",
+                                               "fram": "Framerate",
+                                               "idgs": "IdPassGrayscale",
+                                               "ipsc": "IdPassSegmentationColors",
+                                               "imag": "Images",
+                                               "imse": "ImageSensors",
+                                               "isnm": "IsOnNavMesh",
+                                               "keyb": "Keyboard",
+                                               "ligh": "Lights",
+                                               "ltra": "LocalTransforms",
+                                               "logm": "LogMessage",
+                                               "magn": "Magnebot",
+                                               "mwhe": "MagnebotWheels",
+                                               "mesh": "Meshes",
+                                               "mous": "Mouse",
+                                               "path": "NavMeshPath",
+                                               "obip": "ObiParticles",
+                                               "obci": "ObjectColliderIntersection",
+                                               "occl": "Occlusion",
+                                               "occu": "OccupancyMap",
+                                               "octb": "OculusTouchButtons",
+                                               "over": "Overlap",
+                                               "quit": "QuitSignal",
+                                               "rayc": "Raycast",
+                                               "repl": "Replicants",
+                                               "rseg": "ReplicantSegmentationColors",
+                                               "rigi": "Rigidbodies",
+                                               "rojv": "RobotJointVelocities",
+                                               "sreg": "SceneRegions",
+                                               "scre": "ScreenPosition",
+                                               "segm": "SegmentationColors",
+                                               "scom": "StaticCompositeObjects",
+                                               "stem": "StaticEmptyObjects",
+                                               "soct": "StaticOculusTouch",
+                                               "srig": "StaticRigidbodies",
+                                               "srob": "StaticRobot",
+                                               "subs": "Substructure",
+                                               "tran": "Transforms",
+                                               "trco": "TriggerCollision",
+                                               "vers": "Version",
+                                               "volu": "Volumes",
+                                               "vrri": "VRRig"}
+    # Key = An output data ID. Value = An output data class. This is filled as output data types are requested.
+    _OUTPUT_DATA_TYPES: Dict[str, type] = dict()
+    # Key = The `id()` of a response or partial response. Value = Its frame index. Frame indices are removed when they're garbage-collected, so this doesn't keep any responses in memory. Each controller keeps its most recent frame index until it receives the next response.
+    _INDICES: WeakValueDictionary = WeakValueDictionary()
+
+    def __init__(self, resp: list):
+        """
+        :param resp: The response from the build.
+        """
+
+        """:field
+        The response from the build.
+        """
+        self.resp: list = resp
+        """:field
+        The frame number.
+        """
+        self.frame: int = int.from_bytes(resp[-1], byteorder="big")
+        # The output data ID of each element of the response, excluding the frame number.
+        self._ids: List[str] = list()
+        # Key = Output data ID. Value = A list of byte arrays.
+        self._bytes: Dict[str, list] = dict()
+        for i in range(len(resp) - 1):
+            r_id = bytes(resp[i][4:8]).decode("utf-8")
+            self._ids.append(r_id)
+            if r_id not in self._bytes:
+                self._bytes[r_id] = [resp[i]]
+            else:
+                self._bytes[r_id].append(resp[i])
+        # Key = Output data ID. Value = A list of output data objects.
+        self._output_data: Dict[str, List["OutputData"]] = dict()
+        # Key = A set of output data IDs. Value = A partial response.
+        self._partial_responses: Dict[FrozenSet[str], list] = dict()
+        FrameIndex._INDICES[id(resp)] = self
+
+    @staticmethod
+    def get(resp: list) -> "FrameIndex":
+        """
+        Get the frame index of a response. If a frame index of this response (or of a response that this partial response was created from) still exists, it will be re-used. Otherwise, a new frame index will be created.
+
+        :param resp: The response from the build.
+
+        :return: The frame index of the response.
+        """
+
+        frame_index = FrameIndex._INDICES.get(id(resp))
+        # A frame index keeps its responses in memory, so if it exists, `id(resp)` can't have been re-used by another response.
+        if frame_index is None:
+            frame_index = FrameIndex(resp=resp)
+        return frame_index
+
+    def get_response(self, output_data_ids: Set[str]) -> list:
+        """
+        Get a partial response that includes only output data of the specified types. This has the same format as the full response: The last element is the frame number, and the other elements are in the same order as they were in the full response.
+
+        Partial responses are cached. `FrameIndex.get(resp)` will return this frame index when given a partial response.
+
+        :param output_data_ids: A set of output data IDs, for example `{"tran", "coll"}`.
+
+        :return: A partial response.
+        """
+
+        key = frozenset(output_data_ids)
+        if key not in self._partial_responses:
+            partial_response = [self.resp[i] for i in range(len(self._ids)) if self._ids[i] in key]
+            partial_response.append(self.resp[-1])
+            self._partial_responses[key] = partial_response
+            FrameIndex._INDICES[id(partial_response)] = self
+        return self._partial_responses[key]
+
+    def get_ids(self) -> List[str]:
+        """
+        :return: A list of the output data IDs in the response.
+        """
+
+        return list(self._bytes.keys())
+
+    def has(self, r_id: str) -> bool:
+        """
+        :param r_id: The output data ID, for example `"tran"`.
+
+        :return: True if the response has at least one output data object of this type.
+        """
+
+        return r_id in self._bytes
+
+    def get_bytes(self, r_id: str) -> list:
+        """
+        :param r_id: The output data ID, for example `"tran"`.
+
+        :return: A list of the byte arrays of this type. This list is empty if there are no byte arrays of this type.
+        """
+
+        if r_id in self._bytes:
+            return self._bytes[r_id]
+        return []
+
+    def get_output_data(self, r_id: str) -> list:
+        """
+        :param r_id: The output data ID, for example `"tran"`.
+
+        :return: A list of the output data objects of this type. This list is empty if there are no output data objects of this type. The objects are cached, so don't modify them.
+        """
+
+        if r_id not in self._output_data:
+            if r_id not in self._bytes:
+                return []
+            if r_id not in FrameIndex._OUTPUT_DATA_TYPES:
+                FrameIndex._OUTPUT_DATA_TYPES[r_id] = getattr(import_module("tdw.output_data"),
+                                                              FrameIndex._OUTPUT_DATA_TYPE_NAMES[r_id])
+            output_data_type = FrameIndex._OUTPUT_DATA_TYPES[r_id]
+            self._output_data[r_id] = [output_data_type(b) for b in self._bytes[r_id]]
+        return self._output_data[r_id]
+
+    def get_first(self, r_id: str) -> Optional["OutputData"]:
+        """
+        :param r_id: The output data ID, for example `"tran"`.
+
+        :return: The first output data object of this type, or None if there aren't any.
+        """
+
+        output_data = self.get_output_data(r_id=r_id)
+        if len(output_data) > 0:
+            return output_data[0]
+        return None
@@ -0,0 +1,358 @@
+import atexit
+from collections import deque
+from weakref import ref, finalize, WeakSet
+from pathlib import Path
+from shutil import rmtree
+from tempfile import mkdtemp
+from threading import Thread, Condition
+from time import perf_counter
+from typing import List, Tuple, Deque, Union, Optional, Callable
+from tdw.output_data import Images
+from tdw.image_sinks.image_sink import ImageSink
+
+
+# Sinks that haven't been closed. They're closed when Python exits.
+_OPEN_SINKS: WeakSet = WeakSet()
+# Sinks that have images to save. This keeps them from being garbage-collected until the images are saved.
+_BUSY_SINKS: set = set()
+
+
+def _close_open_sinks() -> None:
+    """
+    Close every sink that hasn't been closed.
+    """
+
+    for sink in list(_OPEN_SINKS):
+        sink.close()
+
+
+atexit.register(_close_open_sinks)
+
+
+class AsyncImageSink(ImageSink):
+    """
+    Save image data to disk in background threads so that saving images doesn't block `Controller.communicate(commands)`.
+
+    `write(images, path, avatar_id, frame, metadata)` adds the image data to a queue and returns immediately. One or more writer threads save the queued images with another [`ImageSink`](image_sink.md).
+
+    If images are captured faster than they can be saved, the queue will fill up. When the queue is full, what happens next depends on `back_pressure`:
+
+    - `"block"`: `write()` waits until there is space in the queue. This slows down the simulation but doesn't use more memory.
+    - `"drop_oldest"`: The oldest images in the queue are discarded. See: `num_dropped`.
+    - `"spill"`: The raw image data is written to a file in `spill_directory`, which should be on a fast local disk. The spilled images are saved after the queue is empty. Until every spilled image has been saved, later images are spilled too, so that images are always saved in the order that they were written. See: `num_spilled`.
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.tdw_utils import TDWUtils
+    from tdw.add_ons.third_person_camera import ThirdPersonCamera
+    from tdw.add_ons.image_capture import ImageCapture
+    from tdw.image_sinks.async_image_sink import AsyncImageSink
+
+    c = Controller()
+    camera = ThirdPersonCamera(position={"x": 0.5, "y": 1.5, "z": -2},
+                               look_at={"x": 0, "y": 0, "z": 0})
+    sink = AsyncImageSink(max_queue_size=64, back_pressure="block")
+    capture = ImageCapture(avatar_ids=[camera.avatar_id], path="D:/image_capture_test", sink=sink)
+    c.add_ons.extend([camera, capture])
+    c.communicate(TDWUtils.create_empty_room(12, 12))
+    for i in range(100):
+        c.communicate([])
+    # Wait for every image to be saved.
+    sink.close()
+    c.communicate({"$type": "terminate"})
+    ```
+
+    An image counts as saved when the writer thread's sink has saved it. By default, the writer threads use an [`ImageSink`](image_sink.md) with `fsync=True`, so after `flush()` or `close()` returns, every image has been flushed to disk with `os.fsync()`.
+
+    If a writer thread fails to save an image, the exception is raised by the next call to `write()`, `flush()`, or `close()`. When the Python process exits, `close()` is called automatically. A sink that is no longer referenced is garbage-collected after its queued images are saved, and then its writer threads stop.
+    """
+
+    """:class_var
+    The valid values of `back_pressure`.
+    """
+    BACK_PRESSURE_MODES: List[str] = ["block", "drop_oldest", "spill"]
+
+    def __init__(self, sink: ImageSink = None, max_queue_size: int = 64, num_threads: int = 1,
+                 back_pressure: str = "block", spill_directory: Union[str, Path] = None):
+        """
+        :param sink: The image sink that saves the images in the writer threads. If None, this is an [`ImageSink`](image_sink.md) with `fsync=True`, which saves each image pass as a separate file and flushes it to disk.
+        :param max_queue_size: The maximum number of `Images` in the queue.
+        :param num_threads: The number of writer threads. If `sink` isn't thread-safe, this must be 1.
+        :param back_pressure: What happens when the queue is full. Options: `"block"`, `"drop_oldest"`, `"spill"`.
+        :param spill_directory: If `back_pressure == "spill"`, images are spilled to this directory. If None, a temporary directory is created the first time that images are spilled, and deleted when the sink is closed.
+        """
+
+        if back_pressure not in AsyncImageSink.BACK_PRESSURE_MODES:
+            raise Exception(f"Invalid back pressure: {back_pressure}")
+        if max_queue_size < 1:
+            raise Exception(f"Invalid max queue size: {max_queue_size}")
+        """:field
+        The image sink that saves the images in the writer threads.
+        """
+        self.sink: ImageSink = ImageSink(fsync=True) if sink is None else sink
+        super().__init__(fsync=self.sink.fsync)
+        """:field
+        The maximum number of `Images` in the queue.
+        """
+        self.max_queue_size: int = max_queue_size
+        """:field
+        What happens when the queue is full. Options: `"block"`, `"drop_oldest"`, `"spill"`.
+        """
+        self.back_pressure: str = back_pressure
+        """:field
+        The total number of `Images` that have been saved.
+        """
+        self.num_written: int = 0
+        """:field
+        The total number of `Images` that were discarded because the queue was full and `back_pressure == "drop_oldest"`.
+        """
+        self.num_dropped: int = 0
+        """:field
+        The total number of `Images` that were spilled to disk because the queue was full and `back_pressure == "spill"`.
+        """
+        self.num_spilled: int = 0
+        """:field
+        The greatest number of `Images` that have been in the queue at the same time.
+        """
+        self.max_queue_depth: int = 0
+        """:field
+        The total time in seconds that the writer threads have spent saving images.
+        """
+        self.total_write_time: float = 0
+        """:field
+        The longest time in seconds that a writer thread has spent saving one `Images`.
+        """
+        self.max_write_time: float = 0
+        # The directory of spilled images.
+        self._spill_directory: Optional[Path] = None if spill_directory is None else Path(spill_directory)
+        # Temporary spill directories that will be deleted when the sink is closed.
+        self._temporary_spill_directories: List[Path] = list()
+        # The queue. Each element is a tuple: The `Images`, the root output directory, the avatar ID, the frame, and the metadata.
+        self._queue: Deque[Tuple[Images, Path, str, int, Optional[dict]]] = deque()
+        # The spilled images. Each element is a tuple: The path to the spill file, the root output directory, the avatar ID, the frame, and the metadata.
+        self._spilled: Deque[Tuple[Path, Path, str, int, Optional[dict]]] = deque()
+        # The number of spill files that have been created. This is used to generate filenames.
+        self._num_spill_files: int = 0
+        # The number of spill files that are being written and haven't been added to `self._spilled` yet.
+        self._num_pending_spills: int = 0
+        # The number of `Images` that the writer threads are saving right now.
+        self._num_in_progress: int = 0
+        # The first exception raised by a writer thread.
+        self._exception: Optional[Exception] = None
+        # If True, the writer threads will stop when the queue is empty.
+        self._closed: bool = False
+        # This is used to wait for and notify changes to the queue.
+        self._condition: Condition = Condition()
+        # The writer threads. They only have a weak reference to this sink.
+        self._threads: List[Thread] = [Thread(target=AsyncImageSink._write_loop, args=(ref(self), ), daemon=True)
+                                       for _ in range(num_threads)]
+        for thread in self._threads:
+            thread.start()
+        # If this sink is garbage-collected, stop the writer threads and close `self.sink`.
+        self._finalizer: finalize = finalize(self, AsyncImageSink._on_garbage_collected, self._condition, self.sink,
+                                             self._temporary_spill_directories)
+        self._finalizer.atexit = False
+        # Save every image when Python exits.
+        _OPEN_SINKS.add(self)
+
+    def write(self, images: Images, path: Path, avatar_id: str, frame: int, metadata: Optional[dict] = None) -> None:
+        """
+        Add image data to the queue. The images will be saved in a writer thread.
+
+        :param images: The `Images` output data.
+        :param path: The root output directory.
+        :param avatar_id: The ID of the avatar that captured the images.
+        :param frame: The frame number. This is used to generate filenames.
+        :param metadata: Optional per-frame metadata, for example camera matrices. This must be JSON-serializable. If None, there is no metadata.
+        """
+
+        self._raise_exception()
+        spill = False
+        with self._condition:
+            if self._closed:
+                raise Exception("Can't write images because the sink is closed.")
+            # Images were spilled and haven't been saved yet. Spill these images too so that they're saved after the spilled images.
+            if self.back_pressure == "spill" and (len(self._spilled) > 0 or self._num_pending_spills > 0):
+                spill = True
+            elif len(self._queue) >= self.max_queue_size:
+                if self.back_pressure == "block":
+                    while len(self._queue) >= self.max_queue_size and self._exception is None:
+                        self._condition.wait()
+                    # A writer thread failed while this thread was waiting. Don't enqueue the images.
+                    self._raise_exception()
+                elif self.back_pressure == "drop_oldest":
+                    self._queue.popleft()
+                    self.num_dropped += 1
+                else:
+                    spill = True
+            if spill:
+                spill_index = self._num_spill_files
+                self._num_spill_files += 1
+                self._num_pending_spills += 1
+            else:
+                self._queue.append((images, path, avatar_id, frame, metadata))
+                _BUSY_SINKS.add(self)
+                self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+                self._condition.notify_all()
+        if spill:
+            # Write the raw data to the spill directory. This is done outside of the lock so that the writer threads don't wait.
+            try:
+                spill_path = self._get_spill_directory().joinpath(f"{spill_index}.imag")
+                spill_path.write_bytes(images.bytes)
+            except BaseException:
+                with self._condition:
+                    self._num_pending_spills -= 1
+                raise
+            with self._condition:
+                self._num_pending_spills -= 1
+                self._spilled.append((spill_path, path, avatar_id, frame, metadata))
+                _BUSY_SINKS.add(self)
+                self.num_spilled += 1
+                self._condition.notify_all()
+        self._raise_exception()
+
+    def flush(self) -> None:
+        """
+        Wait until every image in the queue, including spilled images, has been saved.
+        """
+
+        with self._condition:
+            while (len(self._queue) > 0 or len(self._spilled) > 0 or self._num_in_progress > 0) and \
+                    self._exception is None:
+                self._condition.wait()
+        self._raise_exception()
+        self.sink.flush()
+
+    def close(self) -> None:
+        """
+        Wait until every image in the queue, including spilled images, has been saved. Then, stop the writer threads and close `self.sink`.
+        """
+
+        if self._closed:
+            return
+        _OPEN_SINKS.discard(self)
+        self._finalizer.detach()
+        try:
+            self.flush()
+        finally:
+            with self._condition:
+                self._closed = True
+                self._condition.notify_all()
+            for thread in self._threads:
+                thread.join()
+            self.sink.close()
+            for directory in self._temporary_spill_directories:
+                rmtree(str(directory), ignore_errors=True)
+
+    def get_queue_depth(self) -> int:
+        """
+        :return: The number of `Images` that are waiting to be saved, including spilled images.
+        """
+
+        with self._condition:
+            return len(self._queue) + len(self._spilled)
+
+    def get_mean_write_time(self) -> float:
+        """
+        :return: The average time in seconds that a writer thread has spent saving one `Images`.
+        """
+
+        with self._condition:
+            return self.total_write_time / self.num_written if self.num_written > 0 else 0
+
+    @staticmethod
+    def _write_loop(reference: Callable[[], Optional["AsyncImageSink"]]) -> None:
+        """
+        Save queued images until the sink is closed or garbage-collected.
+
+        :param reference: A weak reference to the sink. The writer thread only references the sink while it is saving images.
+        """
+
+        sink = reference()
+        while sink is not None:
+            with sink._condition:
+                while len(sink._queue) == 0 and len(sink._spilled) == 0 and not sink._closed:
+                    # Don't keep the sink alive while waiting.
+                    condition = sink._condition
+                    sink = None
+                    # This thread had the last reference to the sink.
+                    if reference() is None:
+                        return
+                    condition.wait()
+                    sink = reference()
+                    if sink is None:
+                        return
+                # Save queued images before spilled images. Every queued image is older than every spilled image; see `write()`.
+                if len(sink._queue) > 0:
+                    images, path, avatar_id, frame, metadata = sink._queue.popleft()
+                    spill_path = None
+                elif len(sink._spilled) > 0:
+                    spill_path, path, avatar_id, frame, metadata = sink._spilled.popleft()
+                    images = None
+                else:
+                    return
+                sink._num_in_progress += 1
+                # There is space in the queue.
+                sink._condition.notify_all()
+            t0 = perf_counter()
+            exception: Optional[Exception] = None
+            try:
+                if spill_path is not None:
+                    images = Images(spill_path.read_bytes())
+                sink.sink.write(images=images, path=path, avatar_id=avatar_id, frame=frame, metadata=metadata)
+                if spill_path is not None:
+                    spill_path.unlink()
+            except Exception as e:
+                exception = e
+            dt = perf_counter() - t0
+            with sink._condition:
+                sink._num_in_progress -= 1
+                if exception is None:
+                    sink.num_written += 1
+                    sink.total_write_time += dt
+                    sink.max_write_time = max(sink.max_write_time, dt)
+                elif sink._exception is None:
+                    sink._exception = exception
+                # Every image has been saved, so the sink can be garbage-collected.
+                if len(sink._queue) == 0 and len(sink._spilled) == 0 and sink._num_in_progress == 0:
+                    _BUSY_SINKS.discard(sink)
+                sink._condition.notify_all()
+
+    @staticmethod
+    def _on_garbage_collected(condition: Condition, sink: ImageSink, temporary_spill_directories: List[Path]) -> None:
+        """
+        Stop the writer threads and close the sink. This is called when an `AsyncImageSink` that wasn't closed is garbage-collected. There are no queued images because an `AsyncImageSink` isn't garbage-collected until its queue is empty.
+
+        :param condition: The `AsyncImageSink`'s condition. This wakes up the writer threads so that they stop.
+        :param sink: The image sink that saved the images in the writer threads.
+        :param temporary_spill_directories: Temporary spill directories that will be deleted.
+        """
+
+        with condition:
+            condition.notify_all()
+        sink.close()
+        for directory in temporary_spill_directories:
+            rmtree(str(directory), ignore_errors=True)
+
+    def _get_spill_directory(self) -> Path:
+        """
+        :return: The spill directory. If it doesn't exist, it is created.
+        """
+
+        with self._condition:
+            if self._spill_directory is None:
+                self._spill_directory = Path(mkdtemp(prefix="tdw_image_spill_"))
+                self._temporary_spill_directories.append(self._spill_directory)
+            elif not self._spill_directory.exists():
+                self._spill_directory.mkdir(parents=True, exist_ok=True)
+            return self._spill_directory
+
+    def _raise_exception(self) -> None:
+        """
+        If a writer thread failed to save an image, raise its exception.
+        """
+
+        if self._exception is not None:
+            exception = self._exception
+            self._exception = None
+            raise exception
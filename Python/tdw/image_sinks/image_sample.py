@@ -0,0 +1,52 @@
+from io import BytesIO
+from typing import Dict, Optional
+from PIL import Image
+
+
+class ImageSample:
+    """
+    The image passes and metadata of one avatar on one frame, as read by a [`ShardedImageReader`](sharded_image_reader.md).
+    """
+
+    def __init__(self, key: str, passes: Dict[str, bytes], extensions: Dict[str, str], metadata: Optional[dict]):
+        """
+        :param key: The key of the sample in the shard, for example `a/00000000`.
+        :param passes: The image data. Key = The pass mask, for example `"_img"`. Value = The image file bytes.
+        :param extensions: The file extension of each pass. Key = The pass mask. Value = The extension, for example `"png"`.
+        :param metadata: The per-frame metadata. If None, there is no metadata.
+        """
+
+        """:field
+        The key of the sample in the shard, for example `a/00000000`.
+        """
+        self.key: str = key
+        avatar_id, frame = key.rsplit("/", 1)
+        """:field
+        The ID of the avatar that captured the images.
+        """
+        self.avatar_id: str = avatar_id
+        """:field
+        The frame number.
+        """
+        self.frame: int = int(frame)
+        """:field
+        The image data. Key = The pass mask, for example `"_img"`. Value = The image file bytes. Depth passes are saved as png files.
+        """
+        self.passes: Dict[str, bytes] = passes
+        """:field
+        The file extension of each pass. Key = The pass mask. Value = The extension, for example `"png"`.
+        """
+        self.extensions: Dict[str, str] = extensions
+        """:field
+        The per-frame metadata, for example camera matrices. If None, there is no metadata.
+        """
+        self.metadata: Optional[dict] = metadata
+
+    def get_pil_image(self, pass_mask: str = "_img") -> Image.Image:
+        """
+        :param pass_mask: The pass mask.
+
+        :return: The image as a PIL image.
+        """
+
+        return Image.open(BytesIO(self.passes[pass_mask]))
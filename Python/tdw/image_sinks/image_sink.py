@@ -0,0 +1,79 @@
+import os
+from json import dumps
+from pathlib import Path
+from typing import Optional
+from tdw.tdw_utils import TDWUtils
+from tdw.output_data import Images
+
+
+class ImageSink:
+    """
+    Save image data to disk. This is used by the [`ImageCapture`](../add_ons/image_capture.md) add-on.
+
+    This sink saves each image pass as a separate file: `<path>/<avatar_id>/<pass_mask>_<frame>.<extension>` (see: `TDWUtils.save_images()`). Metadata, if any, is saved as `<path>/<avatar_id>/metadata_<frame>.json`. Images are saved immediately, i.e. `write(images, path, avatar_id, frame, metadata)` returns after the images are saved.
+
+    If `fsync=True`, each file is flushed to disk with `os.fsync()` before `write()` returns, so that saved images survive a crash or a power failure. This is slower.
+
+    Subclasses can save images in different ways, for example in a background thread (see: [`AsyncImageSink`](async_image_sink.md)).
+    """
+
+    def __init__(self, fsync: bool = False):
+        """
+        :param fsync: If True, flush each file to disk with `os.fsync()` before `write()` returns.
+        """
+
+        """:field
+        If True, flush each file to disk with `os.fsync()` before `write()` returns.
+        """
+        self.fsync: bool = fsync
+
+    def write(self, images: Images, path: Path, avatar_id: str, frame: int, metadata: Optional[dict] = None) -> None:
+        """
+        Save image data.
+
+        :param images: The `Images` output data.
+        :param path: The root output directory.
+        :param avatar_id: The ID of the avatar that captured the images.
+        :param frame: The frame number. This is used to generate filenames.
+        :param metadata: Optional per-frame metadata, for example camera matrices. This must be JSON-serializable. If None, there is no metadata.
+        """
+
+        output_dir = path.joinpath(avatar_id)
+        if not output_dir.exists():
+            output_dir.mkdir(parents=True, exist_ok=True)
+        filename = TDWUtils.zero_padding(frame, 4)
+        TDWUtils.save_images(images=images,
+                             output_directory=str(output_dir.resolve()),
+                             filename=filename)
+        if metadata is not None:
+            output_dir.joinpath(f"metadata_{filename}.json").write_text(dumps(metadata))
+        if self.fsync:
+            for i in range(images.get_num_passes()):
+                ImageSink._fsync(output_dir.joinpath(f"{images.get_pass_mask(i)[1:]}_{filename}.{images.get_extension(i)}"))
+            if metadata is not None:
+                ImageSink._fsync(output_dir.joinpath(f"metadata_{filename}.json"))
+
+    def flush(self) -> None:
+        """
+        Wait until every image has been saved. By default, this doesn't do anything because images are saved immediately.
+        """
+
+        pass
+
+    def close(self) -> None:
+        """
+        Save every image and release any resources. By default, this doesn't do anything.
+        """
+
+        pass
+
+    @staticmethod
+    def _fsync(path: Path) -> None:
+        """
+        Flush a file to disk.
+
+        :param path: The path to the file.
+        """
+
+        with path.open("r+b") as f:
+            os.fsync(f.fileno())
@@ -0,0 +1,174 @@
+import tarfile
+from bisect import bisect_right
+from json import loads
+from pathlib import Path
+from typing import List, Dict, Iterator, Tuple, Optional, Union
+from tdw.image_sinks.image_sample import ImageSample
+from tdw.image_sinks.sharded_image_sink import ShardedImageSink
+
+
+class ShardedImageReader:
+    """
+    Read images that were saved by a [`ShardedImageSink`](sharded_image_sink.md).
+
+    Iterating through the reader reads each shard sequentially from start to end, which is much faster than opening millions of small files:
+
+    ```python
+    from tdw.image_sinks.sharded_image_reader import ShardedImageReader
+
+    reader = ShardedImageReader(path="D:/image_capture_test")
+    for sample in reader:
+        image = sample.get_pil_image("_img")
+        if sample.metadata is not None:
+            camera_matrix = sample.metadata["camera_matrix"]
+    ```
+
+    Samples can also be read in any order with `get_sample(index)`, which uses the shard index files to read only the sample's bytes:
+
+    ```python
+    from tdw.image_sinks.sharded_image_reader import ShardedImageReader
+
+    reader = ShardedImageReader(path="D:/image_capture_test")
+    sample = reader.get_sample(reader.get_num_samples() - 1)
+    ```
+    """
+
+    def __init__(self, path: Union[str, Path], prefix: str = "images"):
+        """
+        :param path: The directory of the shards as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+        :param prefix: The prefix of each shard's filename.
+        """
+
+        if isinstance(path, str):
+            """:field
+            The directory of the shards.
+            """
+            self.path: Path = Path(path)
+        else:
+            self.path: Path = path
+        """:field
+        The paths to each shard, in order. This doesn't include incomplete shards.
+        """
+        self.shards: List[Path] = sorted(self.path.glob(f"{prefix}-*.tar"))
+        # The samples in each shard, as read from the index files. This is loaded the first time it's needed.
+        self._indices: Optional[List[List[dict]]] = None
+        # The index of the first sample in each shard.
+        self._starts: List[int] = list()
+        # The total number of samples.
+        self._num_samples: int = 0
+
+    def get_num_samples(self) -> int:
+        """
+        :return: The total number of samples in every shard.
+        """
+
+        self._load_indices()
+        return self._num_samples
+
+    def get_sample(self, index: int) -> ImageSample:
+        """
+        :param index: The index of the sample.
+
+        :return: The sample.
+        """
+
+        self._load_indices()
+        if index < 0:
+            index += self._num_samples
+        if index < 0 or index >= self._num_samples:
+            raise IndexError(f"Sample index out of range: {index}")
+        shard_index = bisect_right(self._starts, index) - 1
+        sample = self._indices[shard_index][index - self._starts[shard_index]]
+        passes: Dict[str, bytes] = dict()
+        extensions: Dict[str, str] = dict()
+        metadata: Optional[dict] = None
+        with self.shards[shard_index].open("rb") as f:
+            for name in sample["members"]:
+                offset, size = sample["members"][name]
+                f.seek(offset)
+                metadata = ShardedImageReader._add_member(name=name, data=f.read(size), passes=passes,
+                                                          extensions=extensions, metadata=metadata)
+        return ImageSample(key=sample["key"], passes=passes, extensions=extensions, metadata=metadata)
+
+    def __len__(self) -> int:
+        return self.get_num_samples()
+
+    def __getitem__(self, index: int) -> ImageSample:
+        return self.get_sample(index)
+
+    def __iter__(self) -> Iterator[ImageSample]:
+        for shard in self.shards:
+            key: Optional[str] = None
+            passes: Dict[str, bytes] = dict()
+            extensions: Dict[str, str] = dict()
+            metadata: Optional[dict] = None
+            # Read the shard as a stream. This never seeks backwards.
+            with tarfile.open(str(shard), mode="r|") as tar:
+                for member in tar:
+                    if not member.isfile():
+                        continue
+                    member_key, name = ShardedImageReader._split_name(member.name)
+                    # The members of a sample are contiguous, so a new key means that the previous sample is done.
+                    if member_key != key:
+                        if key is not None:
+                            yield ImageSample(key=key, passes=passes, extensions=extensions, metadata=metadata)
+                        key = member_key
+                        passes = dict()
+                        extensions = dict()
+                        metadata = None
+                    metadata = ShardedImageReader._add_member(name=name, data=tar.extractfile(member).read(),
+                                                              passes=passes, extensions=extensions, metadata=metadata)
+            if key is not None:
+                yield ImageSample(key=key, passes=passes, extensions=extensions, metadata=metadata)
+
+    def _load_indices(self) -> None:
+        """
+        Load the index file of each shard, if they haven't been loaded yet.
+        """
+
+        if self._indices is not None:
+            return
+        self._indices = list()
+        self._starts.clear()
+        self._num_samples = 0
+        for shard in self.shards:
+            index_path = shard.parent.joinpath(shard.name[:-len(".tar")] + ShardedImageSink.INDEX_EXTENSION)
+            if not index_path.exists():
+                raise Exception(f"Index file not found: {index_path}")
+            samples: List[dict] = loads(index_path.read_text())["samples"]
+            self._indices.append(samples)
+            self._starts.append(self._num_samples)
+            self._num_samples += len(samples)
+
+    @staticmethod
+    def _split_name(name: str) -> Tuple[str, str]:
+        """
+        :param name: The name of a tar member, for example `a/00000000.img.jpg`.
+
+        :return: Tuple: The key, for example `a/00000000`, and the rest of the name, for example `img.jpg`.
+        """
+
+        dot = name.index(".", name.rfind("/") + 1)
+        return name[:dot], name[dot + 1:]
+
+    @staticmethod
+    def _add_member(name: str, data: bytes, passes: Dict[str, bytes], extensions: Dict[str, str],
+                    metadata: Optional[dict]) -> Optional[dict]:
+        """
+        Add the data of a tar member to a sample.
+
+        :param name: The name of the tar member without the key, for example `img.jpg` or `json`.
+        :param data: The member's bytes.
+        :param passes: The sample's image passes. This will be modified.
+        :param extensions: The sample's file extensions. This will be modified.
+        :param metadata: The sample's metadata.
+
+        :return: The sample's metadata.
+        """
+
+        if name == "json":
+            return loads(data)
+        pass_mask, extension = name.split(".", 1)
+        passes[f"_{pass_mask}"] = data
+        extensions[f"_{pass_mask}"] = extension
+        return metadata
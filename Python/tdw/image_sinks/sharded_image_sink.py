@@ -0,0 +1,191 @@
+import tarfile
+from io import BytesIO
+from json import dumps
+from os import getpid
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import List, Tuple, Optional, Union
+from PIL import Image
+from tdw.tdw_utils import TDWUtils
+from tdw.output_data import Images
+from tdw.image_sinks.image_sink import ImageSink
+
+
+class ShardedImageSink(ImageSink):
+    """
+    Save image data to a sequence of tar files ("shards") rather than as separate files. This can be much faster than creating millions of small files, especially on shared storage, and the shards can be read sequentially by a [`ShardedImageReader`](sharded_image_reader.md).
+
+    Each image pass and the per-frame metadata (if any) is a tar member named `<avatar_id>/<frame>.<pass_mask>.<extension>` or `<avatar_id>/<frame>.json`, for example `a/00000000.img.jpg`, `a/00000000.id.png` and `a/00000000.json`. This is the same naming convention as [WebDataset](https://github.com/webdataset/webdataset), so the shards can also be read by WebDataset.
+
+    A new shard is started when the current shard would be larger than `max_shard_size`. Shards are named `<prefix>-<index>.tar`, for example `images-000000.tar`. Each shard is written to a temporary file and then renamed, so incomplete shards are never read. When a shard is complete, an index file is written next to it, for example `images-000000.idx.json`. The index contains the byte offset and size of each tar member so that samples can be read without reading the whole shard.
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.tdw_utils import TDWUtils
+    from tdw.add_ons.third_person_camera import ThirdPersonCamera
+    from tdw.add_ons.image_capture import ImageCapture
+    from tdw.image_sinks.sharded_image_sink import ShardedImageSink
+
+    c = Controller()
+    camera = ThirdPersonCamera(position={"x": 0.5, "y": 1.5, "z": -2},
+                               look_at={"x": 0, "y": 0, "z": 0})
+    sink = ShardedImageSink(max_shard_size=1073741824)
+    capture = ImageCapture(avatar_ids=[camera.avatar_id], path="D:/image_capture_test", pass_masks=["_img", "_id"],
+                           sink=sink, camera_matrices=True)
+    c.add_ons.extend([camera, capture])
+    c.communicate(TDWUtils.create_empty_room(12, 12))
+    for i in range(100):
+        c.communicate([])
+    # Write the last shard.
+    sink.close()
+    c.communicate({"$type": "terminate"})
+    ```
+
+    To save images in a background thread, wrap this sink in an [`AsyncImageSink`](async_image_sink.md). Use `num_threads=1` so that frames are added to the shards in order.
+    """
+
+    """:class_var
+    The file extension of shard index files.
+    """
+    INDEX_EXTENSION: str = ".idx.json"
+
+    def __init__(self, max_shard_size: int = 1073741824, prefix: str = "images", fsync: bool = False):
+        """
+        :param max_shard_size: The maximum size of a shard in bytes. A shard can be larger than this only if it contains a single frame that is larger than this.
+        :param prefix: The prefix of each shard's filename.
+        :param fsync: If True, flush each shard and its index file to disk with `os.fsync()` before the shard is renamed.
+        """
+
+        super().__init__(fsync=fsync)
+        """:field
+        The maximum size of a shard in bytes.
+        """
+        self.max_shard_size: int = max_shard_size
+        """:field
+        The prefix of each shard's filename.
+        """
+        self.prefix: str = prefix
+        """:field
+        The number of shards that have been written.
+        """
+        self.num_shards: int = 0
+        # The directory of the current shard.
+        self._directory: Optional[Path] = None
+        # The current shard.
+        self._tar: Optional[tarfile.TarFile] = None
+        # The path to the temporary file of the current shard.
+        self._temp_path: Optional[Path] = None
+        # The index of the current shard. Each element is a sample: The key, the avatar ID, the frame, and the members. Key = The name of the member without the key. Value = The byte offset and size of the member.
+        self._index: List[dict] = list()
+        # This is used to write one frame at a time.
+        self._lock: Lock = Lock()
+
+    def write(self, images: Images, path: Path, avatar_id: str, frame: int, metadata: Optional[dict] = None) -> None:
+        """
+        Add image data to the current shard.
+
+        :param images: The `Images` output data.
+        :param path: The directory of the shards.
+        :param avatar_id: The ID of the avatar that captured the images.
+        :param frame: The frame number. This is used to generate the names of the tar members.
+        :param metadata: Optional per-frame metadata, for example camera matrices. This must be JSON-serializable. If None, there is no metadata.
+        """
+
+        key = f"{avatar_id}/{TDWUtils.zero_padding(frame, 8)}"
+        members: List[Tuple[str, Union[bytes, memoryview]]] = list()
+        for i in range(images.get_num_passes()):
+            pass_mask = images.get_pass_mask(i)
+            # The depth passes aren't png files, so we need to convert them.
+            if pass_mask == "_depth" or pass_mask == "_depth_simple":
+                buffer = BytesIO()
+                Image.fromarray(TDWUtils.get_shaped_depth_pass(images=images, index=i)).save(buffer, format="png")
+                members.append((f"{pass_mask[1:]}.png", buffer.getvalue()))
+            else:
+                members.append((f"{pass_mask[1:]}.{images.get_extension(i)}", memoryview(images.get_image(i))))
+        if metadata is not None:
+            members.append(("json", dumps(metadata).encode("utf-8")))
+        with self._lock:
+            # Start a new shard if the current shard would be too large. Each member has a 512-byte header and is padded to 512 bytes. The end of the tar file is 1024 bytes.
+            size = sum([512 + len(data) + (-len(data) % 512) for name, data in members]) + 1024
+            if self._tar is not None and (path != self._directory or
+                                          (len(self._index) > 0 and self._tar.offset + size > self.max_shard_size)):
+                self._close_shard()
+            if self._tar is None:
+                self._open_shard(path=path)
+            sample = {"key": key,
+                      "avatar_id": avatar_id,
+                      "frame": frame,
+                      "members": dict()}
+            mtime = time()
+            for name, data in members:
+                info = tarfile.TarInfo(name=f"{key}.{name}")
+                info.size = len(data)
+                info.mtime = mtime
+                self._tar.addfile(info, BytesIO(data))
+                # The data is followed by padding to a multiple of 512 bytes.
+                sample["members"][name] = [self._tar.offset - len(data) - (-len(data) % 512), len(data)]
+            self._index.append(sample)
+
+    def flush(self) -> None:
+        """
+        Finish the current shard so that it can be read. The next frame will be added to a new shard.
+        """
+
+        with self._lock:
+            if self._tar is not None:
+                self._close_shard()
+
+    def close(self) -> None:
+        """
+        Finish the current shard so that it can be read.
+        """
+
+        self.flush()
+
+    def get_shard_path(self, directory: Path, index: int) -> Path:
+        """
+        :param directory: The directory of the shards.
+        :param index: The index of the shard.
+
+        :return: The path to the shard.
+        """
+
+        return directory.joinpath(f"{self.prefix}-{str(index).zfill(6)}.tar")
+
+    def _open_shard(self, path: Path) -> None:
+        """
+        Start a new shard.
+
+        :param path: The directory of the shards.
+        """
+
+        if not path.exists():
+            path.mkdir(parents=True, exist_ok=True)
+        self._directory = path
+        # Don't overwrite shards that already exist.
+        while self.get_shard_path(directory=path, index=self.num_shards).exists():
+            self.num_shards += 1
+        shard_path = self.get_shard_path(directory=path, index=self.num_shards)
+        self._temp_path = shard_path.parent.joinpath(f"{shard_path.name}.{getpid()}.tmp")
+        self._tar = tarfile.open(str(self._temp_path), mode="w", format=tarfile.USTAR_FORMAT)
+        self._index.clear()
+
+    def _close_shard(self) -> None:
+        """
+        Finish the current shard: Close the tar file, write the index, and rename the shard.
+        """
+
+        self._tar.close()
+        shard_path = self.get_shard_path(directory=self._directory, index=self.num_shards)
+        index_path = shard_path.parent.joinpath(shard_path.name[:-len(".tar")] + ShardedImageSink.INDEX_EXTENSION)
+        index_path.write_text(dumps({"shard": shard_path.name,
+                                     "samples": self._index}))
+        if self.fsync:
+            ImageSink._fsync(self._temp_path)
+            ImageSink._fsync(index_path)
+        self._temp_path.replace(shard_path)
+        self.num_shards += 1
+        self._tar = None
+        self._temp_path = None
+        self._index.clear()
@@ -1,9 +1,13 @@
 import json
-from typing import List, Dict, TypeVar, Union, Generic, Optional, Tuple
-import pkg_resources
+import struct
+import mmap
+from typing import List, Dict, TypeVar, Union, Generic, Optional, Tuple, Set, TYPE_CHECKING
 from pathlib import Path
 import platform
+from os import getpid
+from hashlib import sha1
 from secrets import token_hex
+from contextlib import contextmanager
 from tdw.collision_data.trigger_collider_shape import TriggerColliderShape
 from tdw.scene_data.room import Room
 from tdw.scene_data.interior_region import InteriorRegion
@@ -12,6 +16,9 @@ from tdw.container_data.container_shape import ContainerShape
 from tdw.container_data.box_container import BoxContainer
 from tdw.container_data.sphere_container import SphereContainer
 from tdw.container_data.cylinder_container import CylinderContainer
+from tdw.backend.paths import LIBRARIAN_CACHE_DIRECTORY
+if TYPE_CHECKING:
+    from tdw.model_query_index import ModelQueryIndex
 
 
 class _Encoder(json.JSONEncoder):
@@ -302,6 +309,14 @@ class VisualEffectRecord(_Record):
 
 
 T = TypeVar("T", bound=_Record)
+# The first bytes of a cached library file.
+_CACHE_MAGIC: bytes = b"TDWL"
+# The version of the cached library file format. Increment this whenever the format changes.
+_CACHE_VERSION: int = 2
+# The version of the cached library file format and the length of the header.
+_CACHE_HEADER: struct.Struct = struct.Struct("<II")
+# The number of 64-bit integers per record in the cached record index: The start and end of the name, and the start and end of the serialized record.
+_CACHE_INDEX_STRIDE: int = 4
 
 
 class _Librarian(Generic[T]):
@@ -309,43 +324,105 @@ class _Librarian(Generic[T]):
     Base abstract class for a metadata librarian.
     """
 
-    def __init__(self, library: str = ""):
+    # The length of the substrings of record names in the search index.
+    _SEARCH_INDEX_LENGTH: int = 3
+
+    def __init__(self, library: str = "", read_only: bool = False):
         """
         :param library: The absolute path to the library .json file. If empty, a default path in the tdw module will be used.
+        :param read_only: If True, records are read from a memory-mapped cache file and aren't kept in memory. The cache file is shared by every process that reads it, so memory usage doesn't increase with the number of processes. Records can't be added, updated, or removed, and each call to `get_record(name)` or `records` creates new record objects.
         """
 
+        """:field
+        If True, records are read from a memory-mapped cache file and aren't kept in memory. Records can't be added, updated, or removed.
+        """
+        self.read_only: bool = read_only
         if library == "":
-            self.library = pkg_resources.resource_filename(__name__, "metadata_libraries/" + self.get_default_library())
+            self.library = str(Path(__file__).parent.joinpath("metadata_libraries/" + self.get_default_library()))
         else:
-            module_path = pkg_resources.resource_filename(__name__, "metadata_libraries/" + library)
-            if Path(module_path).exists():
-                self.library = module_path
+            module_path = Path(__file__).parent.joinpath("metadata_libraries/" + library)
+            if module_path.exists():
+                self.library = str(module_path)
             else:
                 self.library = library
 
-        with open(self.library, "rt") as f:
-            self.data = json.load(f)
+        # The raw JSON data. This is loaded the first time that `self.data` is used.
+        self._data: Optional[dict] = None
+        # A list of every record. This is created the first time that `self.records` is used.
+        self._records: Optional[List[T]] = None
+        # The serialized records, with de-localized URLs.
+        self._record_buffer: bytes = b""
+        # Key = A record name. Value = The start and end of the serialized record in `self._record_buffer`.
+        self._record_offsets: Dict[str, Tuple[int, int]] = dict()
+        # Key = A record name. Value = The record. Records are created the first time that they're requested.
+        self._records_by_name: Dict[str, T] = dict()
+        # Key = A substring of a record name. Value = The names of each record that contains the substring, in the same order as `self.records`.
+        # This is created the first time that `search_records(search)` is called.
+        self._search_index: Optional[Dict[str, Dict[str, None]]] = None
+        # The number of nested batches. See: `batch()`.
+        self._batch_depth: int = 0
+        # If True, the library will be written at the end of the batch.
+        self._write_pending: bool = False
+        # The number of times that records have been added, replaced, or removed.
+        self._num_modifications: int = 0
+        # The memory-mapped cache file.
+        self._cache: Optional[mmap.mmap] = None
+        # The record index of the cache file. For each record, in library order: The start and end of the name, and the start and end of the serialized record.
+        self._cache_index: Optional[memoryview] = None
+        # The indices of the records in the cache file, sorted by name.
+        self._cache_sorted_indices: Optional[memoryview] = None
+        # If True, records are read directly from the memory-mapped cache file.
+        self._shared: bool = False
+        # Try to read the cache. If there isn't a valid cache, read the library file and cache it.
+        if not self._read_cache():
+            self._read_library()
+            self._write_cache()
+            # Memory-map the new cache file.
+            if read_only:
+                self._read_cache()
+
+    @property
+    def data(self) -> dict:
+        """
+        :return: The raw JSON dictionary loaded from the records database file.
+        """
 
-        self.description = self.data["description"]
+        if self._data is None:
+            with open(self.library, "rt") as f:
+                self._data = json.load(f)
+        return self._data
 
-        self.records: List[T] = []
-        for key in self.data["records"]:
-            record = self._generate_record(self.data["records"][key])
-            temp_urls = dict()
-            # De-localize URLs
-            for p in record.urls:
-                # Set an absolute path.
-                absolute = False
-                for prefix in ["file:///", "http://", "https://"]:
-                    if record.urls[p].startswith(prefix):
-                        temp_urls[p] = record.urls[p]
-                        absolute = True
-                # De-localize a local path.
-                if not absolute:
-                    temp_urls[p] = f"file:///{str(Path(self.library).parent.joinpath(record.urls[p]).resolve())}"
-                temp_urls[p] = temp_urls[p].replace("\\", "/")
-            record.urls = temp_urls
-            self.records.append(record)
+    @data.setter
+    def data(self, value: dict) -> None:
+        self._data = value
+
+    @property
+    def records(self) -> List[T]:
+        """
+        :return: The list of records.
+        """
+
+        # Create new records every time so that they aren't kept in memory.
+        if self._shared:
+            return [self._get_shared_record(i) for i in range(len(self._cache_sorted_indices))]
+        if self._records is None:
+            self._records = [self._get_cached_record(name) for name in self._record_offsets]
+        return self._records
+
+    @records.setter
+    def records(self, value: List[T]) -> None:
+        self._records = value
+        # Index the new records. If there are duplicate names, `get_record(name)` returns the first record.
+        self._records_by_name = dict()
+        for record in value:
+            if record.name not in self._records_by_name:
+                self._records_by_name[record.name] = record
+        self._search_index = None
+        # The records are no longer read from the cache.
+        self._shared = False
+        self._record_buffer = b""
+        self._record_offsets = dict()
+        self._num_modifications += 1
 
     def get_default_library(self) -> str:
         """
@@ -384,12 +461,15 @@ class _Librarian(Generic[T]):
         :param name: The name of the record.
         """
 
-        records = [r for r in self.records if r.name == name]
-
-        if len(records) == 0:
-            return None
-        else:
-            return records[0]
+        if self._shared:
+            index = self._find_shared_record(name)
+            return None if index < 0 else self._get_shared_record(index)
+        if name in self._records_by_name:
+            return self._records_by_name[name]
+        # Create the record.
+        elif self._records is None and name in self._record_offsets:
+            return self._get_cached_record(name)
+        return None
 
     def search_records(self, search: str) -> List[T]:
         """
@@ -398,7 +478,30 @@ class _Librarian(Generic[T]):
         :param search: The string to search for in the model name.
         """
 
-        return [r for r in self.records if search in r.name]
+        # Search the names in the cache file. This doesn't create a search index, which would be kept in memory.
+        if self._shared:
+            encoded = search.encode("utf-8")
+            index = self._cache_index
+            return [self._get_shared_record(i) for i in range(len(self._cache_sorted_indices))
+                    if encoded in self._cache[index[i * _CACHE_INDEX_STRIDE]: index[i * _CACHE_INDEX_STRIDE + 1]]]
+        # The search string is too short to use the search index.
+        if len(search) < _Librarian._SEARCH_INDEX_LENGTH:
+            return [r for r in self.records if search in r.name]
+        if self._search_index is None:
+            self._search_index = dict()
+            # Index the names in the same order as `self.records`.
+            # `self._records_by_name` is in the order in which the records were created, which might be different.
+            for name in (self._record_offsets if self._records is None else [r.name for r in self._records]):
+                self._add_to_search_index(name=name)
+        # Every name that contains the search string contains each of its substrings.
+        # Check only the names that contain the rarest substring.
+        names: Optional[Dict[str, None]] = None
+        for substring in _Librarian._get_substrings(search):
+            if substring not in self._search_index:
+                return []
+            if names is None or len(self._search_index[substring]) < len(names):
+                names = self._search_index[substring]
+        return [self.get_record(name) for name in names if search in name]
 
     def add_or_update_record(self, record: T, overwrite: bool, write: bool = True, quiet: bool = True) -> bool:
         """
@@ -406,10 +509,13 @@ class _Librarian(Generic[T]):
 
         :param record: The record.
         :param overwrite: If true, overwrite the record if it already exists.
-        :param write: If true, write the library data to disk (overwriting the existing file).
+        :param write: If true, write the library data to disk (overwriting the existing file). If this is called within `with librarian.batch():`, the library will be written at the end of the batch.
         :param quiet: If true, silently correct the model name if need be.
         """
 
+        self._raise_if_read_only()
+        # Create every record so that the index is complete.
+        _ = self.records
         # Valid the name of the record.
         name_ok, name, problems = self.get_valid_record_name(record.name, overwrite)
         record.name = name
@@ -419,25 +525,29 @@ class _Librarian(Generic[T]):
                 print(f"\t{p}")
 
         added = False
-        if len([r for r in self.records if r.name == record.name]) > 0:
+        if record.name in self._records_by_name:
             # If this record exists and we want to overwrite, update the record.
             if overwrite:
-                records_list = [r for r in self.records if r.name != record.name]
-                records_list.append(record)
+                self.records[self.records.index(self._records_by_name[record.name])] = record
+                self._records_by_name[record.name] = record
                 added = True
         # Add the record.
         else:
             self.records.append(record)
+            self._records_by_name[record.name] = record
+            if self._search_index is not None:
+                self._add_to_search_index(name=record.name)
             added = True
 
         # Write to disk.
         if added:
+            self._num_modifications += 1
             if record.name in self.data["records"]:
                 self.data["records"][record.name] = record.get_serializable()
             else:
                 self.data["records"].update({record.name: record.get_serializable()})
         if write:
-            self.write()
+            self._write_or_defer()
 
         return added
 
@@ -446,36 +556,84 @@ class _Librarian(Generic[T]):
         Remove a record. Returns true if the record was removed.
 
         :param record: The record or the name of the record.
-        :param write: If true, write the library data to disk  (overwriting the existing file).
+        :param write: If true, write the library data to disk  (overwriting the existing file). If this is called within `with librarian.batch():`, the library will be written at the end of the batch.
         """
 
+        self._raise_if_read_only()
         if isinstance(record, str):
             record_name = record
         else:
             record_name = record.name
+        # Create every record so that the index is complete.
+        _ = self.records
 
         records_list = [r for r in self.records if r.name != record_name]
         removed = len(records_list) < len(self.records)
         if removed:
+            self._num_modifications += 1
             del self.data["records"][record_name]
-            self.records = records_list
+            self._records = records_list
+            del self._records_by_name[record_name]
+            if self._search_index is not None:
+                for substring in _Librarian._get_substrings(record_name):
+                    del self._search_index[substring][record_name]
         if write:
-            self.write()
+            self._write_or_defer()
 
         return removed
 
     def write(self, pretty=True) -> None:
         """
-        Write the data to disk.
+        Write the data to disk. The data is written to a temporary file, which then replaces the library file, so that other processes never read a partially written library.
 
         :param pretty: Pretty print.
         """
 
-        with open(self.library, "wt") as f:
-            if pretty:
-                json.dump(self.data, f, sort_keys=True, indent=4, cls=_Encoder)
-            else:
-                json.dump(self.data, f, cls=_Encoder)
+        self._raise_if_read_only()
+        library_path = Path(self.library)
+        temp_path = library_path.parent.joinpath(f"{library_path.name}.{getpid()}.tmp")
+        try:
+            with open(str(temp_path.resolve()), "wt") as f:
+                if pretty:
+                    json.dump(self.data, f, sort_keys=True, indent=4, cls=_Encoder)
+                else:
+                    json.dump(self.data, f, cls=_Encoder)
+        # Don't leave a partially written temporary file next to the library.
+        except BaseException:
+            if temp_path.exists():
+                temp_path.unlink()
+            raise
+        temp_path.replace(library_path)
+        self._write_pending = False
+
+    @contextmanager
+    def batch(self):
+        """
+        Add, update, or remove many records and then write the library once.
+
+        Within a batch, `add_or_update_record(record, overwrite, write=True)` and `remove_record(record, write=True)` don't write the library. Instead, the library is written once at the end of the batch, and only if a record was written. If an exception is raised within the batch, the library file isn't modified (but the records in memory are).
+
+        ```python
+        from tdw.librarian import ModelLibrarian
+
+        lib = ModelLibrarian("path/to/local/library.json")
+        with lib.batch():
+            for record in records:
+                lib.add_or_update_record(record=record, overwrite=False, write=True)
+        ```
+
+        Batches can be nested; the library is written at the end of the outermost batch.
+        """
+
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            raise
+        self._batch_depth -= 1
+        if self._batch_depth == 0 and self._write_pending:
+            self.write()
 
     def get_valid_record_name(self, name: str, overwrite: bool) -> Tuple[bool, str, List[str]]:
         """
@@ -485,7 +643,8 @@ class _Librarian(Generic[T]):
         :param overwrite: If true, raise an exception if the record doesn't exist. Otherwise, overwrite. If False: If the record exists, suggest a new name.
         """
 
-        record_names = [r.name for r in self.records]
+        _ = self.records
+        record_names = self._records_by_name
 
         if overwrite and name not in record_names:
             return False, name, [f"Can't override a record named {name} because no such record exists!"]
@@ -518,12 +677,261 @@ class _Librarian(Generic[T]):
 
         raise Exception("Not defined.")
 
+    def _write_or_defer(self) -> None:
+        """
+        Write the library now or, if this is within a batch, at the end of the batch.
+        """
+
+        if self._batch_depth > 0:
+            self._write_pending = True
+        else:
+            self.write()
+
+    def _get_cached_record(self, name: str) -> T:
+        """
+        Get a record. If the record hasn't been created yet, create it from the serialized record data.
+
+        :param name: The name of the record.
+
+        :return: The record.
+        """
+
+        if name not in self._records_by_name:
+            start, end = self._record_offsets[name]
+            self._records_by_name[name] = self._generate_record(json.loads(self._record_buffer[start: end]))
+        return self._records_by_name[name]
+
+    def _read_library(self) -> None:
+        """
+        Read the library .json file. Serialize each record with de-localized URLs.
+        """
+
+        buffer = bytearray()
+        for key in self.data["records"]:
+            data = dict(self.data["records"][key])
+            temp_urls = dict()
+            # De-localize URLs
+            for p in data["urls"]:
+                # Set an absolute path.
+                absolute = False
+                for prefix in ["file:///", "http://", "https://"]:
+                    if data["urls"][p].startswith(prefix):
+                        temp_urls[p] = data["urls"][p]
+                        absolute = True
+                # De-localize a local path.
+                if not absolute:
+                    temp_urls[p] = f"file:///{str(Path(self.library).parent.joinpath(data['urls'][p]).resolve())}"
+                temp_urls[p] = temp_urls[p].replace("\\", "/")
+            data["urls"] = temp_urls
+            serialized = json.dumps(data, cls=_Encoder).encode("utf-8")
+            name = data["name"] if "name" in data else key
+            if name not in self._record_offsets:
+                self._record_offsets[name] = (len(buffer), len(buffer) + len(serialized))
+            buffer.extend(serialized)
+        self._record_buffer = bytes(buffer)
+        self.description = self.data["description"]
+
+    def _get_cache_path(self) -> Path:
+        """
+        :return: The path to the cache file of this library.
+        """
+
+        key = sha1(str(Path(self.library).resolve()).encode("utf-8")).hexdigest()
+        return LIBRARIAN_CACHE_DIRECTORY.joinpath(f"{key}.bin")
+
+    def _read_cache(self) -> bool:
+        """
+        Try to memory-map the cached library. The cache is valid only if it was written by the same version of the cache format and if the path, modification time, and size of the library file haven't changed.
+
+        The cache file contains a header, a record index, the indices of the records sorted by name, the record names, and the serialized records.
+
+        :return: True if the cache was read.
+        """
+
+        try:
+            library_path = Path(self.library).resolve()
+            stat = library_path.stat()
+            with open(str(self._get_cache_path()), "rb") as f:
+                cache = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if cache[:4] != _CACHE_MAGIC:
+                return False
+            version, header_length = _CACHE_HEADER.unpack_from(cache, 4)
+            if version != _CACHE_VERSION:
+                return False
+            header_start = 4 + _CACHE_HEADER.size
+            header = json.loads(cache[header_start: header_start + header_length])
+            if header["path"] != str(library_path) or header["mtime"] != stat.st_mtime_ns or \
+                    header["size"] != stat.st_size:
+                return False
+            num_records: int = header["num_records"]
+            index_start = header_start + header_length
+            sorted_indices_start = index_start + num_records * _CACHE_INDEX_STRIDE * 8
+            view = memoryview(cache)
+            index = view[index_start: sorted_indices_start].cast("Q")
+            sorted_indices = view[sorted_indices_start: sorted_indices_start + num_records * 8].cast("Q")
+        except (OSError, ValueError, KeyError, TypeError, struct.error):
+            return False
+        self.description = header["description"]
+        self._cache = cache
+        self._cache_index = index
+        self._cache_sorted_indices = sorted_indices
+        self._shared = self.read_only
+        # Don't keep records in memory. If the library file was just read, free its serialized records.
+        if self._shared:
+            self._record_buffer = b""
+            self._record_offsets = dict()
+        # Index the records by name. Read the serialized records from the memory-mapped file.
+        else:
+            self._record_buffer = cache
+            self._record_offsets = dict()
+            for i in range(0, len(index), _CACHE_INDEX_STRIDE):
+                self._record_offsets[cache[index[i]: index[i + 1]].decode("utf-8")] = (index[i + 2], index[i + 3])
+        return True
+
+    def _write_cache(self) -> None:
+        """
+        Write the cached library. If the cache can't be written, this does nothing.
+        """
+
+        try:
+            library_path = Path(self.library).resolve()
+            stat = library_path.stat()
+            names = [name.encode("utf-8") for name in self._record_offsets]
+            header = json.dumps({"path": str(library_path),
+                                 "mtime": stat.st_mtime_ns,
+                                 "size": stat.st_size,
+                                 "description": self.description,
+                                 "num_records": len(names)}).encode("utf-8")
+            # Pad the header so that the record index is aligned to 8 bytes.
+            header_start = 4 + _CACHE_HEADER.size
+            header += b" " * (-(header_start + len(header)) % 8)
+            names_start = header_start + len(header) + len(names) * (_CACHE_INDEX_STRIDE + 1) * 8
+            records_start = names_start + sum([len(name) for name in names])
+            index: List[int] = list()
+            name_start = names_start
+            for name, (start, end) in zip(names, self._record_offsets.values()):
+                index.extend([name_start, name_start + len(name), records_start + start, records_start + end])
+                name_start += len(name)
+            sorted_indices = sorted(range(len(names)), key=lambda i: names[i])
+            cache_path = self._get_cache_path()
+            if not cache_path.parent.exists():
+                cache_path.parent.mkdir(parents=True)
+            # Write to a temporary file and then replace the cache so that other processes never read a partial file.
+            temp_path = cache_path.parent.joinpath(f"{cache_path.name}.{getpid()}.tmp")
+            with temp_path.open("wb") as f:
+                f.write(_CACHE_MAGIC + _CACHE_HEADER.pack(_CACHE_VERSION, len(header)) + header)
+                f.write(struct.pack(f"={len(index)}Q", *index))
+                f.write(struct.pack(f"={len(sorted_indices)}Q", *sorted_indices))
+                f.write(b"".join(names))
+                f.write(self._record_buffer)
+            temp_path.replace(cache_path)
+        except OSError:
+            pass
+
+    def _find_shared_record(self, name: str) -> int:
+        """
+        Binary-search the record names in the memory-mapped cache file.
+
+        :param name: The name of the record.
+
+        :return: The index of the record, or -1 if there is no record with this name.
+        """
+
+        encoded = name.encode("utf-8")
+        index = self._cache_index
+        sorted_indices = self._cache_sorted_indices
+        low = 0
+        high = len(sorted_indices)
+        while low < high:
+            middle = (low + high) // 2
+            i = sorted_indices[middle] * _CACHE_INDEX_STRIDE
+            if self._cache[index[i]: index[i + 1]] < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(sorted_indices):
+            i = sorted_indices[low] * _CACHE_INDEX_STRIDE
+            if self._cache[index[i]: index[i + 1]] == encoded:
+                return sorted_indices[low]
+        return -1
+
+    def _get_shared_record(self, index: int) -> T:
+        """
+        Create a new record from the memory-mapped cache file.
+
+        :param index: The index of the record.
+
+        :return: The record.
+        """
+
+        i = index * _CACHE_INDEX_STRIDE
+        return self._generate_record(json.loads(self._cache[self._cache_index[i + 2]: self._cache_index[i + 3]]))
+
+    def _raise_if_read_only(self) -> None:
+        """
+        Raise an exception if this librarian is read-only.
+        """
+
+        if self.read_only:
+            raise Exception(f"Can't modify {self.library} because the librarian is read-only.")
+
+    def _add_to_search_index(self, name: str) -> None:
+        """
+        Add a record name to the search index.
+
+        :param name: The name of the record.
+        """
+
+        for substring in _Librarian._get_substrings(name):
+            if substring not in self._search_index:
+                self._search_index[substring] = dict()
+            self._search_index[substring][name] = None
+
+    @staticmethod
+    def _get_substrings(name: str) -> Set[str]:
+        """
+        :param name: A record name or a search string.
+
+        :return: Each unique substring of the name of length `_Librarian._SEARCH_INDEX_LENGTH`.
+        """
+
+        return {name[i: i + _Librarian._SEARCH_INDEX_LENGTH]
+                for i in range(len(name) - _Librarian._SEARCH_INDEX_LENGTH + 1)}
+
 
 class ModelLibrarian(_Librarian[ModelRecord]):
     """
     Librarian class for model metadata.
     """
 
+    def __init__(self, library: str = "", read_only: bool = False):
+        """
+        :param library: The absolute path to the library .json file. If empty, a default path in the tdw module will be used.
+        :param read_only: If True, records are read from a memory-mapped cache file and aren't kept in memory. The cache file is shared by every process that reads it, so memory usage doesn't increase with the number of processes. Records can't be added, updated, or removed, and each call to `get_record(name)` or `records` creates new record objects.
+        """
+
+        super().__init__(library=library, read_only=read_only)
+        # The query index. This is created the first time that `get_query_index()` is called.
+        self._query_index: Optional["ModelQueryIndex"] = None
+        # The value of `self._num_modifications` when the query index was created.
+        self._query_index_num_modifications: int = -1
+
+    def get_query_index(self) -> "ModelQueryIndex":
+        """
+        Get a [`ModelQueryIndex`](../model_query_index.md), which stores the numeric and categorical data of each record as numpy arrays and can select records with vectorized filters.
+
+        The query index is created the first time that this is called, and is created again if records were added, replaced, or removed since then.
+
+        :return: The query index.
+        """
+
+        if self._query_index is None or self._query_index_num_modifications != self._num_modifications:
+            # Import here to avoid a circular import.
+            from tdw.model_query_index import ModelQueryIndex
+            self._query_index = ModelQueryIndex(librarian=self)
+            self._query_index_num_modifications = self._num_modifications
+        return self._query_index
+
     def get_model_wnids_and_wcategories(self) -> Dict[str, str]:
         """
         Returns a dictionary of all model wnids and categories.
@@ -0,0 +1,188 @@
+from platform import system
+from typing import List, Dict, Tuple, TYPE_CHECKING
+import numpy as np
+from tdw.tdw_utils import TDWUtils
+if TYPE_CHECKING:
+    from tdw.librarian import ModelLibrarian, ModelRecord
+
+
+class ModelQueryIndex:
+    """
+    Numeric and categorical data of every model in a [`ModelLibrarian`](librarian/model_librarian.md), stored as numpy arrays. This can be used to select models with vectorized filters rather than iterating through every record.
+
+    Don't create a `ModelQueryIndex` directly. Instead, call `librarian.get_query_index()`:
+
+    ```python
+    from tdw.librarian import ModelLibrarian
+
+    librarian = ModelLibrarian()
+    index = librarian.get_query_index()
+    # Get every chair and table that fits within a 0.8x0.6 rectangle.
+    mask = index.get_mask(wcategories=["chair", "table"], footprint=(0.8, 0.6))
+    for record in index.get_records(mask):
+        print(record.name)
+    ```
+
+    Each array has one element per record, in the same order as `librarian.records`.
+    """
+
+    def __init__(self, librarian: "ModelLibrarian"):
+        """
+        :param librarian: The model librarian.
+        """
+
+        # The model librarian.
+        self._librarian: "ModelLibrarian" = librarian
+        records: List["ModelRecord"] = librarian.records
+        """:field
+        The name of each model.
+        """
+        self.names: np.ndarray = np.array([record.name for record in records], dtype=str)
+        # Key = A model name. Value = The index of the model.
+        self._indices: Dict[str, int] = dict()
+        for i, record in enumerate(records):
+            if record.name not in self._indices:
+                self._indices[record.name] = i
+        """:field
+        The extents of each model as a 2D array of shape `(n, 3)`: The width (left to right), height (top to bottom), and length (front to back). These are the same values as `TDWUtils.get_bounds_extents(record.bounds)`.
+        """
+        self.extents: np.ndarray = np.array([TDWUtils.get_bounds_extents(bounds=record.bounds) for record in records],
+                                            dtype=np.float64).reshape((-1, 3))
+        """:field
+        The volume of each model.
+        """
+        self.volumes: np.ndarray = np.array([record.volume for record in records], dtype=np.float64)
+        """:field
+        The scale factor of each model.
+        """
+        self.scale_factors: np.ndarray = np.array([record.scale_factor for record in records], dtype=np.float64)
+        """:field
+        The physics quality of each model.
+        """
+        self.physics_qualities: np.ndarray = np.array([record.physics_quality for record in records], dtype=np.float64)
+        platform = system()
+        """:field
+        The size of each model's asset bundle for this platform in bytes.
+        """
+        self.asset_bundle_sizes: np.ndarray = np.array([record.asset_bundle_sizes.get(platform, -1) for record in records],
+                                                       dtype=np.int64)
+        """:field
+        Whether each model is Flex-compatible.
+        """
+        self.flex: np.ndarray = np.array([record.flex for record in records], dtype=bool)
+        """:field
+        Whether each model is a composite object.
+        """
+        self.composite_objects: np.ndarray = np.array([record.composite_object for record in records], dtype=bool)
+        """:field
+        Whether each model is flagged as `do_not_use`.
+        """
+        self.do_not_use: np.ndarray = np.array([record.do_not_use for record in records], dtype=bool)
+        """:field
+        A list of every unique wnid, sorted alphabetically.
+        """
+        self.wnids: List[str] = sorted(set([record.wnid for record in records]))
+        # Key = A wnid. Value = The index of the wnid in `self.wnids`.
+        self._wnid_indices: Dict[str, int] = {wnid: i for i, wnid in enumerate(self.wnids)}
+        """:field
+        The wnid of each model as an index in `self.wnids`.
+        """
+        self.wnid_codes: np.ndarray = np.array([self._wnid_indices[record.wnid] for record in records], dtype=np.int32)
+        """:field
+        A list of every unique wcategory, sorted alphabetically.
+        """
+        self.wcategories: List[str] = sorted(set([record.wcategory for record in records]))
+        # Key = A wcategory. Value = The index of the wcategory in `self.wcategories`.
+        self._wcategory_indices: Dict[str, int] = {wcategory: i for i, wcategory in enumerate(self.wcategories)}
+        """:field
+        The wcategory of each model as an index in `self.wcategories`.
+        """
+        self.wcategory_codes: np.ndarray = np.array([self._wcategory_indices[record.wcategory] for record in records],
+                                                    dtype=np.int32)
+
+    def get_indices(self, names: List[str]) -> np.ndarray:
+        """
+        :param names: A list of model names.
+
+        :return: The index of each model, in the same order as `names`.
+        """
+
+        return np.array([self._indices[name] for name in names], dtype=np.int64)
+
+    def get_mask(self, names: List[str] = None, wnids: List[str] = None, wcategories: List[str] = None,
+                 min_extents: Tuple[float, float, float] = None, max_extents: Tuple[float, float, float] = None,
+                 footprint: Tuple[float, float] = None, rotate: bool = True, min_volume: float = None,
+                 max_volume: float = None, flex: bool = None, composite_object: bool = None,
+                 do_not_use: bool = None) -> np.ndarray:
+        """
+        Get a boolean mask of every model that passes all of the filters. If a filter is None, it is ignored.
+
+        :param names: If not None, include only models with these names.
+        :param wnids: If not None, include only models with these wnids.
+        :param wcategories: If not None, include only models with these wcategories.
+        :param min_extents: If not None, include only models whose extents (width, height, length) are greater than or equal to these values.
+        :param max_extents: If not None, include only models whose extents (width, height, length) are less than or equal to these values.
+        :param footprint: If not None, include only models whose footprint (width and length) fits within this rectangle (width, length).
+        :param rotate: If True, a model's footprint also fits if it fits when it is rotated by 90 degrees. Ignored if `footprint` is None.
+        :param min_volume: If not None, include only models whose volume is greater than or equal to this value.
+        :param max_volume: If not None, include only models whose volume is less than or equal to this value.
+        :param flex: If not None, include only models that are (or aren't) Flex-compatible.
+        :param composite_object: If not None, include only models that are (or aren't) composite objects.
+        :param do_not_use: If not None, include only models that are (or aren't) flagged as `do_not_use`.
+
+        :return: A boolean numpy array with one element per model.
+        """
+
+        mask = np.ones(shape=len(self.names), dtype=bool)
+        if names is not None:
+            mask &= np.isin(self.names, names)
+        if wnids is not None:
+            mask &= np.isin(self.wnid_codes, [self._wnid_indices[wnid] for wnid in wnids if wnid in self._wnid_indices])
+        if wcategories is not None:
+            mask &= np.isin(self.wcategory_codes, [self._wcategory_indices[wcategory] for wcategory in wcategories
+                                                   if wcategory in self._wcategory_indices])
+        if min_extents is not None:
+            mask &= np.all(self.extents >= np.array(min_extents), axis=1)
+        if max_extents is not None:
+            mask &= np.all(self.extents <= np.array(max_extents), axis=1)
+        if footprint is not None:
+            widths = self.extents[:, 0]
+            lengths = self.extents[:, 2]
+            fits = (widths <= footprint[0]) & (lengths <= footprint[1])
+            if rotate:
+                fits |= (widths <= footprint[1]) & (lengths <= footprint[0])
+            mask &= fits
+        if min_volume is not None:
+            mask &= self.volumes >= min_volume
+        if max_volume is not None:
+            mask &= self.volumes <= max_volume
+        if flex is not None:
+            mask &= self.flex == flex
+        if composite_object is not None:
+            mask &= self.composite_objects == composite_object
+        if do_not_use is not None:
+            mask &= self.do_not_use == do_not_use
+        return mask
+
+    def get_names(self, mask: np.ndarray) -> List[str]:
+        """
+        :param mask: A boolean mask, for example from `get_mask()`.
+
+        :return: The name of each model in the mask.
+        """
+
+        return self.names[mask].tolist()
+
+    def get_records(self, mask: np.ndarray) -> List["ModelRecord"]:
+        """
+        :param mask: A boolean mask, for example from `get_mask()`.
+
+        :return: The record of each model in the mask.
+        """
+
+        # A read-only librarian creates new records every time, so create only the records in the mask.
+        if self._librarian.read_only:
+            return [self._librarian.get_record(name) for name in self.names[mask]]
+        records = self._librarian.records
+        return [records[i] for i in np.flatnonzero(mask)]
+
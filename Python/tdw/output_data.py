@@ -64,6 +64,7 @@ from tdw.FBOutput import ReplicantSegmentationColors as RepSepCo
 from tdw.vr_data.oculus_touch_button import OculusTouchButton
 from tdw.container_data.container_tag import ContainerTag
 from tdw.replicant.action_status import ActionStatus
+from tdw.flatbuffers.table_layout import TableLayout
 import numpy as np
 from typing import Tuple, Optional, List
 
@@ -74,7 +75,12 @@ class OutputDataUndefinedError(Exception):
 
 class OutputData(object):
     def __init__(self, b):
-        self.bytes = bytearray(b)
+        # Copy bytes so that numpy arrays are writable.
+        if isinstance(b, (bytes, bytearray)):
+            self.bytes = bytearray(b)
+        # Zero-copy: Read directly from the memory of a memoryview or a zmq.Frame. Numpy arrays are read-only views.
+        else:
+            self.bytes = memoryview(b)
         self.data = self.get_data()
 
     def get_data(self):
@@ -87,7 +93,7 @@ class OutputData(object):
         :param b: A byte array.
         """
 
-        return b[4:8].decode('utf-8')
+        return bytes(b[4:8]).decode('utf-8')
 
     @staticmethod
     def _get_vector3(constructor) -> Tuple[float, float, float]:
@@ -148,6 +154,18 @@ class OutputData(object):
         """
         return color.R(), color.G(), color.B()
 
+    @staticmethod
+    def _get_read_only(a: np.ndarray) -> np.ndarray:
+        """
+        Returns a read-only view of a numpy array. The underlying data isn't copied.
+
+        :param a: The numpy array.
+        """
+
+        v = a.view()
+        v.flags.writeable = False
+        return v
+
 
 class SceneRegions(OutputData):
     def get_data(self) -> SceRegs.SceneRegions:
@@ -192,6 +210,18 @@ class Transforms(OutputData):
     def get_rotation(self, index: int) -> np.ndarray:
         return self._rotations[index]
 
+    def get_ids(self) -> np.ndarray:
+        return OutputData._get_read_only(self._ids)
+
+    def get_positions(self) -> np.ndarray:
+        return OutputData._get_read_only(self._positions)
+
+    def get_forwards(self) -> np.ndarray:
+        return OutputData._get_read_only(self._forwards)
+
+    def get_rotations(self) -> np.ndarray:
+        return OutputData._get_read_only(self._rotations)
+
 
 class Rigidbodies(OutputData):
     def __init__(self, b):
@@ -219,6 +249,18 @@ class Rigidbodies(OutputData):
     def get_sleeping(self, index: int) -> bool:
         return bool(self._sleeping[index])
 
+    def get_ids(self) -> np.ndarray:
+        return OutputData._get_read_only(self._ids)
+
+    def get_velocities(self) -> np.ndarray:
+        return OutputData._get_read_only(self._velocities)
+
+    def get_angular_velocities(self) -> np.ndarray:
+        return OutputData._get_read_only(self._angular_velocities)
+
+    def get_sleepings(self) -> np.ndarray:
+        return OutputData._get_read_only(self._sleeping)
+
 
 class StaticRigidbodies(OutputData):
     def __init__(self, b):
@@ -251,6 +293,24 @@ class StaticRigidbodies(OutputData):
     def get_bounciness(self, index: int) -> float:
         return float(self._physics_values[index][3])
 
+    def get_ids(self) -> np.ndarray:
+        return OutputData._get_read_only(self._ids)
+
+    def get_masses(self) -> np.ndarray:
+        return OutputData._get_read_only(self._physics_values[:, 0])
+
+    def get_kinematics(self) -> np.ndarray:
+        return OutputData._get_read_only(self._kinematic)
+
+    def get_dynamic_frictions(self) -> np.ndarray:
+        return OutputData._get_read_only(self._physics_values[:, 1])
+
+    def get_static_frictions(self) -> np.ndarray:
+        return OutputData._get_read_only(self._physics_values[:, 2])
+
+    def get_bouncinesses(self) -> np.ndarray:
+        return OutputData._get_read_only(self._physics_values[:, 3])
+
 
 class Bounds(OutputData):
     def __init__(self, b):
@@ -288,6 +348,30 @@ class Bounds(OutputData):
     def get_center(self, index: int) -> np.ndarray:
         return self._bounds_positions[index][6]
 
+    def get_ids(self) -> np.ndarray:
+        return OutputData._get_read_only(self._ids)
+
+    def get_fronts(self) -> np.ndarray:
+        return OutputData._get_read_only(self._bounds_positions[:, 0])
+
+    def get_backs(self) -> np.ndarray:
+        return OutputData._get_read_only(self._bounds_positions[:, 1])
+
+    def get_lefts(self) -> np.ndarray:
+        return OutputData._get_read_only(self._bounds_positions[:, 3])
+
+    def get_rights(self) -> np.ndarray:
+        return OutputData._get_read_only(self._bounds_positions[:, 2])
+
+    def get_tops(self) -> np.ndarray:
+        return OutputData._get_read_only(self._bounds_positions[:, 4])
+
+    def get_bottoms(self) -> np.ndarray:
+        return OutputData._get_read_only(self._bounds_positions[:, 5])
+
+    def get_centers(self) -> np.ndarray:
+        return OutputData._get_read_only(self._bounds_positions[:, 6])
+
 
 class Images(OutputData):
     PASS_MASKS = {PassMask.PassMask._img: "_img",
@@ -395,6 +479,12 @@ class SegmentationColors(OutputData):
     def get_object_category(self, index: int) -> str:
         return self.data.Categories(index).decode('utf-8')
 
+    def get_object_ids(self) -> np.ndarray:
+        return OutputData._get_read_only(self._ids)
+
+    def get_object_colors(self) -> np.ndarray:
+        return OutputData._get_read_only(self._colors)
+
 
 class AvatarSegmentationColor(OutputData):
     def get_data(self) -> AvSC.AvatarSegmentationColor:
@@ -436,38 +526,57 @@ class IdPassGrayscale(OutputData):
 
 
 class Collision(OutputData):
+    # Collider ID, collidee ID, relative velocity, impulse, state, contacts (normal xyz, point xyz).
+    _LAYOUT: TableLayout = TableLayout([(0, "int32", 0),
+                                        (1, "int32", 0),
+                                        (2, "vector3", (0.0, 0.0, 0.0)),
+                                        (3, "vector3", (0.0, 0.0, 0.0)),
+                                        (4, "uint8", 1),
+                                        (5, "vector", 6)])
+
+    def __init__(self, b):
+        super().__init__(b)
+        self._collider_id, self._collidee_id, self._relative_velocity, self._impulse, self._state, contacts = \
+            Collision._LAYOUT.decode(self.bytes)
+        self._contacts: np.ndarray = contacts.reshape(-1, 2, 3)
+
     def get_data(self) -> Col.Collision:
         return Col.Collision.GetRootAsCollision(self.bytes, 0)
 
     def get_collider_id(self) -> int:
-        return self.data.ColliderId()
+        return self._collider_id
 
     def get_collidee_id(self) -> int:
-        return self.data.CollideeId()
+        return self._collidee_id
 
     def get_relative_velocity(self) -> Tuple[float, float, float]:
-        return OutputData._get_xyz(self.data.RelativeVelocity())
+        return self._relative_velocity
 
     def get_impulse(self) -> Tuple[float, float, float]:
-        return OutputData._get_xyz(self.data.Impulse())
+        return self._impulse
 
     def get_state(self) -> str:
-        state = self.data.State()
-        if state == 1:
+        if self._state == 1:
             return "enter"
-        elif state == 2:
+        elif self._state == 2:
             return "stay"
         else:
             return "exit"
 
     def get_num_contacts(self) -> int:
-        return self.data.ContactsLength()
+        return self._contacts.shape[0]
 
     def get_contact_normal(self, index: int) -> Tuple[float, float, float]:
-        return OutputData._get_vector3(self.data.Contacts(index).Normal)
+        return tuple(self._contacts[index][0].tolist())
 
     def get_contact_point(self, index: int) -> Tuple[float, float, float]:
-        return OutputData._get_vector3(self.data.Contacts(index).Point)
+        return tuple(self._contacts[index][1].tolist())
+
+    def get_contact_normals(self) -> np.ndarray:
+        return self._contacts[:, 0]
+
+    def get_contact_points(self) -> np.ndarray:
+        return self._contacts[:, 1]
 
 
 class ImageSensors(OutputData):
@@ -530,6 +639,9 @@ class IdPassSegmentationColors(OutputData):
     def get_segmentation_color(self, index: int) -> np.ndarray:
         return self._colors[index]
 
+    def get_segmentation_colors(self) -> np.ndarray:
+        return OutputData._get_read_only(self._colors)
+
 
 class FlexParticles(OutputData):
     def get_data(self) -> Flex.FlexParticles:
@@ -722,32 +834,48 @@ class Version(OutputData):
 
 
 class EnvironmentCollision(OutputData):
+    # Object ID, state, contacts (normal xyz, point xyz), floor.
+    _LAYOUT: TableLayout = TableLayout([(0, "int32", 0),
+                                        (1, "uint8", 1),
+                                        (2, "vector", 6),
+                                        (3, "bool", False)])
+
+    def __init__(self, b):
+        super().__init__(b)
+        self._object_id, self._state, contacts, self._floor = EnvironmentCollision._LAYOUT.decode(self.bytes)
+        self._contacts: np.ndarray = contacts.reshape(-1, 2, 3)
+
     def get_data(self) -> EnvCol.EnvironmentCollision:
         return EnvCol.EnvironmentCollision.GetRootAsEnvironmentCollision(self.bytes, 0)
 
     def get_object_id(self) -> int:
-        return self.data.ObjectId()
+        return self._object_id
 
     def get_state(self) -> str:
-        state = self.data.State()
-        if state == 1:
+        if self._state == 1:
             return "enter"
-        elif state == 2:
+        elif self._state == 2:
             return "stay"
         else:
             return "exit"
 
     def get_num_contacts(self) -> int:
-        return self.data.ContactsLength()
+        return self._contacts.shape[0]
 
     def get_contact_normal(self, index: int) -> Tuple[float, float, float]:
-        return OutputData._get_vector3(self.data.Contacts(index).Normal)
+        return tuple(self._contacts[index][0].tolist())
 
     def get_contact_point(self, index: int) -> Tuple[float, float, float]:
-        return OutputData._get_vector3(self.data.Contacts(index).Point)
+        return tuple(self._contacts[index][1].tolist())
+
+    def get_contact_normals(self) -> np.ndarray:
+        return self._contacts[:, 0]
+
+    def get_contact_points(self) -> np.ndarray:
+        return self._contacts[:, 1]
 
     def get_floor(self) -> bool:
-        return self.data.Floor()
+        return self._floor
 
 
 class Volumes(OutputData):
@@ -768,6 +896,12 @@ class Volumes(OutputData):
     def get_volume(self, index: int) -> float:
         return float(self._volumes[index])
 
+    def get_object_ids(self) -> np.ndarray:
+        return OutputData._get_read_only(self._ids)
+
+    def get_volumes(self) -> np.ndarray:
+        return OutputData._get_read_only(self._volumes)
+
 
 class AudioSources(OutputData):
     def get_data(self) -> Audi.AudioSources:
@@ -795,26 +929,39 @@ class AudioSourceDone(OutputData):
 
 
 class Raycast(OutputData):
+    # Hit, hit object, raycast ID, object ID, normal, point.
+    _LAYOUT: TableLayout = TableLayout([(0, "bool", False),
+                                        (1, "bool", False),
+                                        (2, "int32", 0),
+                                        (3, "int32", 0),
+                                        (4, "vector3", (0.0, 0.0, 0.0)),
+                                        (5, "vector3", (0.0, 0.0, 0.0))])
+
+    def __init__(self, b):
+        super().__init__(b)
+        self._hit, self._hit_object, self._raycast_id, self._object_id, self._normal, self._point = \
+            Raycast._LAYOUT.decode(self.bytes)
+
     def get_data(self) -> Ray.Raycast:
         return Ray.Raycast.GetRootAsRaycast(self.bytes, 0)
 
     def get_raycast_id(self) -> int:
-        return self.data.RaycastId()
+        return self._raycast_id
 
     def get_hit(self) -> bool:
-        return self.data.Hit()
+        return self._hit
 
     def get_hit_object(self) -> bool:
-        return self.data.HitObject()
+        return self._hit_object
 
     def get_object_id(self) -> Optional[int]:
-        return self.data.ObjectId()
+        return self._object_id
 
     def get_normal(self) -> Tuple[float, float, float]:
-        return OutputData._get_xyz(self.data.Normal())
+        return self._normal
 
     def get_point(self) -> Tuple[float, float, float]:
-        return OutputData._get_xyz(self.data.Point())
+        return self._point
 
 
 class Overlap(OutputData):
@@ -1019,6 +1166,27 @@ class DynamicRobots(OutputData):
     def get_joint_sleeping(self, index: int) -> bool:
         return bool(self._sleeping[index])
 
+    def get_immovables(self) -> np.ndarray:
+        return OutputData._get_read_only(self._immovable)
+
+    def get_robot_positions(self) -> np.ndarray:
+        return OutputData._get_read_only(self._transforms[:, :3])
+
+    def get_robot_rotations(self) -> np.ndarray:
+        return OutputData._get_read_only(self._transforms[:, 3:7])
+
+    def get_robot_forwards(self) -> np.ndarray:
+        return OutputData._get_read_only(self._transforms[:, 7:])
+
+    def get_joint_positions(self) -> np.ndarray:
+        return OutputData._get_read_only(self._joints[:, 0])
+
+    def get_joint_angles_array(self) -> np.ndarray:
+        return OutputData._get_read_only(np.degrees(self._joints[:, 1]))
+
+    def get_joint_sleeping_array(self) -> np.ndarray:
+        return OutputData._get_read_only(self._sleeping)
+
 
 class Keyboard(OutputData):
     def get_data(self) -> Key.Keyboard:
@@ -1081,23 +1249,32 @@ class Magnebot(OutputData):
 
 
 class TriggerCollision(OutputData):
+    # Collider ID, collidee ID, trigger ID, state.
+    _LAYOUT: TableLayout = TableLayout([(0, "int32", 0),
+                                        (1, "int32", 0),
+                                        (2, "int32", 0),
+                                        (3, "uint8", 1)])
+
+    def __init__(self, b):
+        super().__init__(b)
+        self._collider_id, self._collidee_id, self._trigger_id, self._state = TriggerCollision._LAYOUT.decode(self.bytes)
+
     def get_data(self) -> Trigger.TriggerCollision:
         return Trigger.TriggerCollision.GetRootAsTriggerCollision(self.bytes, 0)
 
     def get_collidee_id(self) -> int:
-        return self.data.CollideeId()
+        return self._collidee_id
 
     def get_collider_id(self) -> int:
-        return self.data.ColliderId()
+        return self._collider_id
 
     def get_trigger_id(self) -> int:
-        return self.data.TriggerId()
+        return self._trigger_id
 
     def get_state(self) -> str:
-        state = self.data.State()
-        if state == 1:
+        if self._state == 1:
             return "enter"
-        elif state == 2:
+        elif self._state == 2:
             return "stay"
         else:
             return "exit"
@@ -1133,6 +1310,18 @@ class LocalTransforms(OutputData):
     def get_euler_angles(self, index: int) -> np.ndarray:
         return self._euler_angles[index]
 
+    def get_ids(self) -> np.ndarray:
+        return OutputData._get_read_only(self._ids)
+
+    def get_positions(self) -> np.ndarray:
+        return OutputData._get_read_only(self._positions)
+
+    def get_forwards(self) -> np.ndarray:
+        return OutputData._get_read_only(self._forwards)
+
+    def get_rotations(self) -> np.ndarray:
+        return OutputData._get_read_only(self._rotations)
+
 
 class QuitSignal(OutputData):
     def get_data(self) -> QuitSig.QuitSignal:
@@ -1230,6 +1419,12 @@ class StaticEmptyObjects(OutputData):
     def get_empty_object_id(self, index: int) -> int:
         return int(self._ids[index][1])
 
+    def get_object_ids(self) -> np.ndarray:
+        return OutputData._get_read_only(self._ids[:, 0])
+
+    def get_empty_object_ids(self) -> np.ndarray:
+        return OutputData._get_read_only(self._ids[:, 1])
+
 
 class DynamicEmptyObjects(OutputData):
     def __init__(self, b):
@@ -1245,6 +1440,9 @@ class DynamicEmptyObjects(OutputData):
     def get_position(self, index: int) -> np.ndarray:
         return self._positions[index]
 
+    def get_positions(self) -> np.ndarray:
+        return OutputData._get_read_only(self._positions)
+
 
 class ObjectColliderIntersection(OutputData):
     def get_data(self) -> ObjColInt.ObjectColliderIntersection:
@@ -1565,6 +1763,30 @@ class Replicants(OutputData):
     def get_status(self, index: int) -> ActionStatus:
         return ActionStatus(self._statuses[index])
 
+    def get_ids(self) -> np.ndarray:
+        return OutputData._get_read_only(self._ids[:, 0])
+
+    def get_positions(self) -> np.ndarray:
+        return OutputData._get_read_only(self._positions[:, 0])
+
+    def get_forwards(self) -> np.ndarray:
+        return OutputData._get_read_only(self._forwards[:, 0])
+
+    def get_rotations(self) -> np.ndarray:
+        return OutputData._get_read_only(self._rotations[:, 0])
+
+    def get_body_part_ids(self) -> np.ndarray:
+        return OutputData._get_read_only(self._ids[:, 1:])
+
+    def get_body_part_positions(self) -> np.ndarray:
+        return OutputData._get_read_only(self._positions[:, 1:])
+
+    def get_body_part_rotations(self) -> np.ndarray:
+        return OutputData._get_read_only(self._rotations[:, 1:])
+
+    def get_body_part_forwards(self) -> np.ndarray:
+        return OutputData._get_read_only(self._forwards[:, 1:])
+
 
 class ReplicantSegmentationColors(OutputData):
     def __init__(self, b):
@@ -117,16 +117,21 @@ class Arrangement(ABC):
         model_sizes: Dict[str, float] = dict()
         model_cell_sizes: List[int] = list()
         models_and_categories: Dict[str, str] = dict()
+        query_index = Controller.MODEL_LIBRARIANS["models_core.json"].get_query_index()
         for category in categories:
             # Get objects small enough to fit within the rectangle.
-            for model_name in Arrangement.MODEL_CATEGORIES[category]:
-                record = Controller.MODEL_LIBRARIANS["models_core.json"].get_record(model_name)
-                model_size = TDWUtils.get_bounds_extents(bounds=record.bounds)
-                model_semi_major_axis = model_size[0] if model_size[0] > model_size[2] else model_size[2]
-                if model_semi_major_axis < semi_minor_axis:
-                    model_sizes[model_name] = model_semi_major_axis
-                    model_cell_sizes.append(int(model_semi_major_axis / cell_size) + 1)
-                    models_and_categories[model_name] = category
+            category_model_names = Arrangement.MODEL_CATEGORIES[category]
+            extents = query_index.extents[query_index.get_indices(category_model_names)]
+            semi_major_axes = np.maximum(extents[:, 0], extents[:, 2])
+            for i in np.flatnonzero(semi_major_axes < semi_minor_axis):
+                model_name = category_model_names[i]
+                model_semi_major_axis = float(semi_major_axes[i])
+                model_sizes[model_name] = model_semi_major_axis
+                model_cell_sizes.append(int(model_semi_major_axis / cell_size) + 1)
+                models_and_categories[model_name] = category
+        # The names and the semi-major axes (in occupancy map space) of each valid object.
+        valid_model_names: np.ndarray = np.array(list(model_sizes.keys()), dtype=str)
+        valid_model_cell_sizes: np.ndarray = (np.array(list(model_sizes.values()), dtype=np.float64) / cell_size).astype(int)
         object_ids: List[int] = list()
         # Get all sizes in occupancy map space.
         model_cell_sizes = list(set(model_cell_sizes))
@@ -154,11 +159,11 @@ class Arrangement(ABC):
                     else:
                         sma = mcs
             # Get all objects that fit.
-            model_names = [m for m in model_sizes if int(model_sizes[m] / cell_size) <= sma]
+            model_names = valid_model_names[valid_model_cell_sizes <= sma]
             if len(model_names) == 0:
                 continue
             # Choose a random model.
-            model_name: str = model_names[self._rng.randint(0, len(model_names))]
+            model_name: str = str(model_names[self._rng.randint(0, len(model_names))])
             # Get the position. Perturb it slightly.
             x = (ix * cell_size) + self._rng.uniform(-cell_size * perturbation_distance,
                                                      cell_size * perturbation_distance)
@@ -1,4 +1,5 @@
 from typing import List
+import numpy as np
 from tdw.tdw_utils import TDWUtils
 from tdw.controller import Controller
 from tdw.cardinal_direction import CardinalDirection
@@ -62,13 +63,12 @@ class Stove(ArrangementAlongWall):
                                                               z_scale=Stove.DEPTH_SCALE)
         # Get all possible models that can be enclosed by the stove.
         enclose_by_model_names = []
+        query_index = Controller.MODEL_LIBRARIANS["models_core.json"].get_query_index()
         for category in Stove.ENCLOSED_BY["stove"]:
-            for model_name in Stove.MODEL_CATEGORIES[category]:
-                record = Controller.MODEL_LIBRARIANS["models_core.json"].get_record(model_name)
-                model_size = TDWUtils.get_bounds_extents(bounds=record.bounds)
-                model_semi_major_axis = model_size[0] if model_size[0] > model_size[2] else model_size[2]
-                if model_semi_major_axis < 0.3:
-                    enclose_by_model_names.append(model_name)
+            category_model_names = Stove.MODEL_CATEGORIES[category]
+            extents = query_index.extents[query_index.get_indices(category_model_names)]
+            semi_major_axes = np.maximum(extents[:, 0], extents[:, 2])
+            enclose_by_model_names.extend([category_model_names[i] for i in np.flatnonzero(semi_major_axes < 0.3)])
         # Try to add a model in each shelf.
         for shape in self._record.container_shapes:
             # Use all of the "enclosed" shapes.
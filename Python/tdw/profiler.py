@@ -0,0 +1,185 @@
+import json
+from time import perf_counter
+from collections import deque
+from pathlib import Path
+from typing import List, Dict, Tuple, Union, Deque
+import numpy as np
+
+
+class Profiler:
+    """
+    Measure how long each phase of `communicate(commands)` takes.
+
+    The profiler is disabled by default. To enable it, set `c.profiler`:
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.profiler import Profiler
+    from tdw.add_ons.object_manager import ObjectManager
+
+    c = Controller()
+    c.add_ons.append(ObjectManager())
+    c.profiler = Profiler()
+    for i in range(100):
+        c.communicate([])
+    for phase, summary in c.profiler.get_summary().items():
+        print(phase, summary["p50"], summary["p95"], summary["p99"])
+    c.profiler.write_chrome_trace("trace.json")
+    c.communicate({"$type": "terminate"})
+    ```
+
+    Phases:
+
+    | Phase | Description |
+    | --- | --- |
+    | `communicate` | The total time of the `communicate(commands)` call. |
+    | `commands:<AddOn>` | Getting the initialization commands or the commands of an add-on, for example `commands:ObjectManager`. |
+    | `before_send:<AddOn>` | An add-on's `before_send(commands)`. |
+    | `serialize` | Serializing the commands. |
+    | `round_trip` | Sending the commands and waiting for the response. |
+    | `ftre` | Checking for, and re-sending commands after, a failed-to-receive response. |
+    | `quit_signal` | Indexing the output data and checking for a quit signal. |
+    | `on_send:<AddOn>` | An add-on's `on_send(resp)`. |
+
+    All times are in milliseconds.
+
+    To disable the profiler, set `c.profiler = None`. When the profiler is disabled, the overhead per phase is a single `is not None` check.
+    """
+
+    def __init__(self, max_frames: int = 1000):
+        """
+        :param max_frames: The maximum number of frames that will be stored. Older frames are discarded.
+        """
+
+        """:field
+        The maximum number of frames that will be stored. Older frames are discarded.
+        """
+        self.max_frames: int = max_frames
+        """:field
+        The number of frames that have been profiled, including frames that were discarded.
+        """
+        self.num_frames: int = 0
+        # The time when the profiler was created. Trace timestamps are relative to this.
+        self._t0: float = perf_counter()
+        # Key = A phase. Value = A rolling window of durations in seconds.
+        self._durations: Dict[str, Deque[float]] = dict()
+        # A rolling window of frames. Each frame is a list of (phase, start time, duration) tuples, in seconds.
+        self._frames: Deque[List[Tuple[str, float, float]]] = deque(maxlen=max_frames)
+        # The phases of the current frame.
+        self._frame: List[Tuple[str, float, float]] = list()
+        # The start time of the current frame.
+        self._frame_t0: float = 0
+
+    def start_frame(self) -> None:
+        """
+        Start profiling a frame. This is called automatically at the start of `communicate(commands)`.
+        """
+
+        self._frame = list()
+        self._frame_t0 = perf_counter()
+
+    def end_frame(self) -> None:
+        """
+        Stop profiling a frame. This is called automatically at the end of `communicate(commands)`.
+        """
+
+        self.add(phase="communicate", t0=self._frame_t0)
+        self._frames.append(self._frame)
+        self.num_frames += 1
+
+    def add(self, phase: str, t0: float) -> None:
+        """
+        Record the duration of a phase. The phase ends now.
+
+        :param phase: The name of the phase.
+        :param t0: The start time of the phase, from `time.perf_counter()`.
+        """
+
+        duration = perf_counter() - t0
+        if phase not in self._durations:
+            self._durations[phase] = deque(maxlen=self.max_frames)
+        self._durations[phase].append(duration)
+        self._frame.append((phase, t0 - self._t0, duration))
+
+    def get_summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        :return: A dictionary. Key = A phase. Value = A dictionary of statistics in milliseconds: `"count"`, `"mean"`, `"p50"`, `"p95"`, `"p99"`, and `"max"`. The statistics are calculated over the rolling window of frames.
+        """
+
+        summary: Dict[str, Dict[str, float]] = dict()
+        for phase in self._durations:
+            durations = np.array(self._durations[phase]) * 1000
+            p50, p95, p99 = np.percentile(durations, [50, 95, 99])
+            summary[phase] = {"count": len(durations),
+                              "mean": float(np.mean(durations)),
+                              "p50": float(p50),
+                              "p95": float(p95),
+                              "p99": float(p99),
+                              "max": float(np.max(durations))}
+        return summary
+
+    def get_frames(self) -> List[List[dict]]:
+        """
+        :return: The rolling window of frames. Each frame is a list of phases. Each phase is a dictionary: `{"phase": str, "start": float, "duration": float}`, in milliseconds. `start` is relative to when the profiler was created.
+        """
+
+        return [[{"phase": phase, "start": t0 * 1000, "duration": duration * 1000} for phase, t0, duration in frame]
+                for frame in self._frames]
+
+    def write_json(self, path: Union[str, Path]) -> None:
+        """
+        Write the summary and the rolling window of frames to a JSON file.
+
+        :param path: The path to the output file.
+        """
+
+        Profiler._write(path=path, data={"summary": self.get_summary(),
+                                         "frames": self.get_frames()})
+
+    def write_chrome_trace(self, path: Union[str, Path]) -> None:
+        """
+        Write the rolling window of frames to a JSON file in the Chrome trace event format. To view the trace, open `chrome://tracing` or [Perfetto](https://ui.perfetto.dev) and load the file.
+
+        :param path: The path to the output file.
+        """
+
+        events: List[dict] = list()
+        frame_number = self.num_frames - len(self._frames)
+        for frame in self._frames:
+            for phase, t0, duration in frame:
+                events.append({"name": phase,
+                               "cat": phase.split(":")[0],
+                               "ph": "X",
+                               "ts": t0 * 1000000,
+                               "dur": duration * 1000000,
+                               "pid": 0,
+                               "tid": 0,
+                               "args": {"frame": frame_number}})
+            frame_number += 1
+        Profiler._write(path=path, data={"traceEvents": events,
+                                         "displayTimeUnit": "ms"})
+
+    def clear(self) -> None:
+        """
+        Clear all of the recorded frames.
+        """
+
+        self.num_frames = 0
+        self._durations.clear()
+        self._frames.clear()
+        self._frame = list()
+
+    @staticmethod
+    def _write(path: Union[str, Path], data: dict) -> None:
+        """
+        Write a JSON file.
+
+        :param path: The path to the output file.
+        :param data: The JSON data.
+        """
+
+        if isinstance(path, str):
+            path = Path(path)
+        if not path.parent.exists():
+            path.parent.mkdir(parents=True)
+        path.write_text(json.dumps(data))
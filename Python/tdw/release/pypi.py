@@ -12,6 +12,11 @@ class PyPi:
     Compare the version of the installed tdw Python module to the PyPi version.
     """
 
+    """:class_var
+    The maximum time in seconds that a request to PyPi can take before it is cancelled.
+    """
+    TIMEOUT: float = 3
+
     @staticmethod
     def strip_post_release(v: str) -> str:
         """
@@ -43,7 +48,7 @@ class PyPi:
         :return: A list of all available PyPi releases.
         """
 
-        resp = get("https://pypi.org/pypi/tdw/json")
+        resp = get("https://pypi.org/pypi/tdw/json", timeout=PyPi.TIMEOUT)
         data = loads(resp.content)
         versions = list(data["releases"].keys())
         versions.sort(key=lambda s: list(map(int, s.split('.'))))
@@ -0,0 +1,49 @@
+from json import loads, dumps
+from time import time
+from os import getpid
+from tdw.version import __version__
+from tdw.backend.paths import VERSION_CHECK_CACHE_PATH
+
+
+class VersionCheckCache:
+    """
+    Remember when the version of the installed tdw module was last compared to PyPi (see: [`PyPi`](pypi.md)) so that the controller doesn't check it every time that it launches.
+
+    This module only imports the standard library, so it's fast to import. The controller uses it to decide whether to start a version check before importing `PyPi`, which is slow to import.
+    """
+
+    """:class_var
+    After a version check, another version check won't occur until this many seconds have passed. See: `VersionCheckCache.is_cached()`.
+    """
+    CACHE_TTL: float = 60 * 60 * 24
+
+    @staticmethod
+    def is_cached() -> bool:
+        """
+        :return: True if the version of the installed tdw module was checked less than `VersionCheckCache.CACHE_TTL` seconds ago. The cache is at `~/.tdw/version_check.json`.
+        """
+
+        if not VERSION_CHECK_CACHE_PATH.exists():
+            return False
+        try:
+            cache = loads(VERSION_CHECK_CACHE_PATH.read_text())
+            return cache["version"] == __version__ and 0 <= time() - cache["time"] < VersionCheckCache.CACHE_TTL
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+    @staticmethod
+    def cache() -> None:
+        """
+        Remember that the version of the installed tdw module was just checked. Until `VersionCheckCache.CACHE_TTL` seconds have passed, `VersionCheckCache.is_cached()` will return True.
+        """
+
+        try:
+            if not VERSION_CHECK_CACHE_PATH.parent.exists():
+                VERSION_CHECK_CACHE_PATH.parent.mkdir(parents=True)
+            # Write to a temporary file and then replace the cache so that other processes never read a partial file.
+            temp_path = VERSION_CHECK_CACHE_PATH.parent.joinpath(f"{VERSION_CHECK_CACHE_PATH.name}.{getpid()}.tmp")
+            temp_path.write_text(dumps({"version": __version__,
+                                        "time": time()}))
+            temp_path.replace(VERSION_CHECK_CACHE_PATH)
+        except OSError:
+            pass
@@ -0,0 +1,175 @@
+import sys
+from bisect import bisect_right
+from json import loads
+from argparse import ArgumentParser
+from pathlib import Path
+from subprocess import Popen
+from threading import Thread
+from typing import List, Dict, Union, Optional
+import zmq
+from tdw.add_ons.response_recorder import ResponseRecorder
+
+
+class ReplayBuild:
+    """
+    A stand-in for the build that replays responses recorded by a [`ResponseRecorder`](add_ons/response_recorder.md). It speaks the same network protocol as the build, so a controller can connect to it with `launch_build=False`.
+
+    This makes it possible to benchmark and regression-test Python-side code (add-ons, serialization, deserialization, etc.) deterministically and without a GPU or a Unity build.
+
+    The replay build ignores the commands that it receives, except for `terminate`. It replies to the controller's first message (the startup commands) with an empty response. After that, it replies with recorded responses by frame number, the same way that the build counts frames: The first message is replied to with the first recorded frame, and each message after that advances the frame by one. If no response was recorded for the current frame (for example, because the recorder skipped a frame), the replay build replies with the most recent response recorded before the current frame, and it stays in sync with the recording's frame numbers afterwards.
+
+    The replay build can run in a background thread (`start()`) or, to avoid sharing the Python interpreter lock with the controller, in a separate process (`ReplayBuild.launch(path, port)`):
+
+    ```python
+    from tdw.controller import Controller
+    from tdw.replay_build import ReplayBuild
+    from tdw.add_ons.object_manager import ObjectManager
+    from tdw.add_ons.benchmark import Benchmark
+
+    process = ReplayBuild.launch(path="recording.tdwe", port=1071)
+    c = Controller(port=1071, launch_build=False)
+    om = ObjectManager()
+    b = Benchmark()
+    c.add_ons.extend([om, b])
+    b.start()
+    for i in range(1000):
+        c.communicate([])
+    b.stop()
+    print(b.fps)
+    c.communicate({"$type": "terminate"})
+    ```
+
+    It's also possible to run a replay build from the command line: `python3 -m tdw.replay_build recording.tdwe --port 1071`
+    """
+
+    def __init__(self, path: Union[str, Path], port: int = 1071, address: str = "localhost", loop: bool = True):
+        """
+        :param path: The path to the recording file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+        :param port: The port number.
+        :param address: The address of the controller.
+        :param loop: If True, start again from the first recorded response after replaying the last recorded response. If False, keep replying with the last recorded response.
+        """
+
+        """:field
+        The recorded responses.
+        """
+        self.frames: List[List[bytes]] = ResponseRecorder.read(path)
+        if len(self.frames) == 0:
+            raise Exception(f"There are no frames in the recording: {path}")
+        # Key = A recorded frame number. Value = The index of the recorded response. If a frame was recorded more than once, use the last response.
+        frame_indices: Dict[int, int] = {int.from_bytes(resp[-1], byteorder="big"): i for i, resp in enumerate(self.frames)}
+        # The recorded frame numbers, in order.
+        self._frame_numbers: List[int] = sorted(frame_indices)
+        # The index of the recorded response of each frame number in `self._frame_numbers`.
+        self._frame_indices: List[int] = [frame_indices[f] for f in self._frame_numbers]
+        """:field
+        The port number.
+        """
+        self.port: int = port
+        """:field
+        The address of the controller.
+        """
+        self.address: str = address
+        """:field
+        If True, start again from the first recorded response after replaying the last recorded response.
+        """
+        self.loop: bool = loop
+        """:field
+        The number of messages that the replay build has replied to.
+        """
+        self.num_messages: int = 0
+        """:field
+        The current frame number. The replay build replies with the response recorded at this frame.
+        """
+        self.frame: int = self._frame_numbers[0]
+        # The background thread, if any.
+        self._thread: Optional[Thread] = None
+
+    def run(self) -> None:
+        """
+        Connect to the controller and reply to messages until the controller sends `terminate`. This blocks until then.
+        """
+
+        context = zmq.Context()
+        # noinspection PyUnresolvedReferences
+        socket = context.socket(zmq.REQ)
+        socket.connect(f"tcp://{self.address}:{self.port}")
+        # Tell the controller that the "build" is ready.
+        socket.send(b"0")
+        first_frame = self._frame_numbers[0]
+        last_frame = self._frame_numbers[-1]
+        empty: List[bytes] = [(0).to_bytes(4, byteorder="big")]
+        while True:
+            msg = socket.recv()
+            # Reply to the startup commands.
+            if self.num_messages == 0:
+                resp = empty
+            else:
+                # Advance to the next frame. The first message after the startup commands is the first recorded frame.
+                if self.num_messages > 1:
+                    self.frame += 1
+                if self.frame > last_frame:
+                    self.frame = first_frame if self.loop else last_frame
+                resp = self.get_response(self.frame)
+            socket.send_multipart(resp)
+            self.num_messages += 1
+            # Only deserialize the message if it might include a terminate command.
+            if b'"terminate"' in msg and any(command["$type"] == "terminate" for command in loads(msg)):
+                break
+        socket.close()
+        context.term()
+
+    def get_response(self, frame: int) -> List[bytes]:
+        """
+        :param frame: The frame number.
+
+        :return: The response recorded at `frame`. If no response was recorded at `frame`, this is the most recent response recorded before `frame`. If `frame` is before the first recorded frame, this is the first recorded response.
+        """
+
+        return self.frames[self._frame_indices[max(bisect_right(self._frame_numbers, frame) - 1, 0)]]
+
+    def start(self) -> None:
+        """
+        Call `run()` in a background thread.
+        """
+
+        self._thread = Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for the background thread to end.
+
+        :param timeout: The timeout in seconds. If None, wait indefinitely.
+        """
+
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    @staticmethod
+    def launch(path: Union[str, Path], port: int = 1071, address: str = "localhost", loop: bool = True) -> Popen:
+        """
+        Launch a replay build in a separate process.
+
+        :param path: The path to the recording file as a string or [`Path`](https://docs.python.org/3/library/pathlib.html).
+        :param port: The port number.
+        :param address: The address of the controller.
+        :param loop: If True, start again from the first recorded response after replaying the last recorded response. If False, keep replying with the last recorded response.
+
+        :return: The process.
+        """
+
+        args = [sys.executable, "-m", "tdw.replay_build", str(path), "--port", str(port), "--address", address]
+        if not loop:
+            args.append("--no_loop")
+        return Popen(args)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument("path", type=str, help="The path to the recording file.")
+    parser.add_argument("--port", type=int, default=1071, help="The port number.")
+    parser.add_argument("--address", type=str, default="localhost", help="The address of the controller.")
+    parser.add_argument("--no_loop", action="store_true", help="Don't loop the recording.")
+    args = parser.parse_args()
+    ReplayBuild(path=args.path, port=args.port, address=args.address, loop=not args.no_loop).run()
@@ -62,7 +62,7 @@ class Animate(Action):
         # Download the animation if needed. Play the animation.
         commands.extend([{"$type": "add_humanoid_animation",
                           "name": self.record.name,
-                          "url": self.record.get_url()},
+                          "url": Controller.get_asset_bundle_url(self.record.get_url())},
                          {"$type": "play_replicant_animation",
                           "name": self.record.name,
                           "id": static.replicant_id,
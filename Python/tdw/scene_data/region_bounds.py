@@ -1,6 +1,7 @@
-from typing import Tuple, List
+from typing import Tuple, List, TYPE_CHECKING
 from tdw.cardinal_direction import CardinalDirection
-from tdw.output_data import SceneRegions
+if TYPE_CHECKING:
+    from tdw.output_data import SceneRegions
 
 
 class RegionBounds:
@@ -99,7 +100,7 @@ class RegionBounds:
             return [CardinalDirection.north, CardinalDirection.south], x
 
 
-def get_from_scene_regions(scene_regions: SceneRegions, i: int) -> RegionBounds:
+def get_from_scene_regions(scene_regions: "SceneRegions", i: int) -> RegionBounds:
     """
     :param scene_regions: The scene regions output data.
     :param i: The index of this scene in env.get_num()
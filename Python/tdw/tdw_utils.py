@@ -2,9 +2,6 @@ import numpy as np
 import random
 import math
 from platform import system
-from requests import get
-from tqdm import tqdm
-from scipy.spatial import distance
 from tdw.output_data import IsOnNavMesh, Images, Bounds
 from PIL import Image
 import io
@@ -15,9 +12,8 @@ from tdw.librarian import ModelRecord, ModelLibrarian, SceneLibrarian, MaterialL
     RobotLibrarian, HumanoidLibrarian, HumanoidAnimationLibrarian
 from tdw.cardinal_direction import CardinalDirection
 from tdw.ordinal_direction import OrdinalDirection
+from tdw.asset_bundle_downloader import AssetBundleDownloader
 from pathlib import Path
-import boto3
-from botocore.exceptions import ProfileNotFound, ClientError
 import base64
 
 
@@ -159,7 +155,7 @@ class TDWUtils:
             p1[1] = 0
 
         # Get the distance between the two points.
-        d0 = distance.euclidean(p0, p1)
+        d0 = float(np.linalg.norm(p1 - p0))
         # Get the total distance.
         d_total = d0 + d
 
@@ -176,7 +172,7 @@ class TDWUtils:
         :return The distance.
         """
 
-        return distance.euclidean(TDWUtils.vector3_to_array(vector3_0), TDWUtils.vector3_to_array(vector3_1))
+        return float(np.linalg.norm(TDWUtils.vector3_to_array(vector3_1) - TDWUtils.vector3_to_array(vector3_0)))
 
     @staticmethod
     def get_box(width: int, length: int) -> List[Dict[str, int]]:
@@ -558,6 +554,10 @@ class TDWUtils:
         :return True if everything is OK.
         """
 
+        # boto3 is slow to import, so it's imported only when it's needed.
+        import boto3
+        from botocore.exceptions import ProfileNotFound, ClientError
+
         config_path = Path.home().joinpath(".aws/config")
         new_config_path = not config_path.exists()
         # Generate a valid config file.
@@ -778,7 +778,8 @@ class TDWUtils:
     def download_asset_bundles(path: Union[str, Path], models: Dict[str, List[str]] = None, scenes: Dict[str, List[str]] = None,
                                materials: Dict[str, List[str]] = None, hdri_skyboxes: Dict[str, List[str]] = None,
                                robots: Dict[str, List[str]] = None, humanoids: Dict[str, List[str]] = None,
-                               humanoid_animations: Dict[str, List[str]] = None) -> None:
+                               humanoid_animations: Dict[str, List[str]] = None, max_workers: int = 8,
+                               verify_size: bool = True) -> None:
         """
         Download asset bundles from TDW's remote S3 server. Create local librarian .json files for each type (models, scenes, etc.).
         This can be useful to speed up the process of scene creation; it is always faster to load local asset bundles though it still takes time to load them into memory.
@@ -789,6 +790,8 @@ class TDWUtils:
 
         Asset bundles will only be downloaded for your operating system. For example, if you want Linux asset bundles, call this function on Linux.
 
+        Asset bundles are downloaded in parallel with an [`AssetBundleDownloader`](asset_bundle_downloader.md). If a download is interrupted, calling this function again will resume it. If any asset bundles can't be downloaded, the other asset bundles are still downloaded and added to the local librarians, and then an exception is raised.
+
         :param path: The root directory of all of the asset bundles and librarian files.
         :param models: A dictionary of models. Key = The model library, for example `"models_core.json"`. Value = A list of model names.
         :param scenes: A dictionary of scenes. Key = The model library, for example `"scenes.json"`. Value = A list of scene names.
@@ -797,6 +800,8 @@ class TDWUtils:
         :param robots: A dictionary of robots. Key = The robot library, for example `"robots.json"`. Value = A list of robot names.
         :param humanoids: A dictionary of humanoids. Key = The model library, for example `"humanoids.json"`. Value = A list of humanoid names.
         :param humanoid_animations: A dictionary of humanoid animations. Key = The model library, for example `"humanoid_animations.json"`. Value = A list of humanoid animation names.
+        :param max_workers: The maximum number of asset bundles that are downloaded at the same time.
+        :param verify_size: If True, verify that the size of each downloaded asset bundle is the size listed in its record.
         """
 
         if isinstance(path, str):
@@ -805,7 +810,8 @@ class TDWUtils:
             output_directory = path
         if not output_directory.exists():
             output_directory.mkdir(parents=True)
-        private_bucket_prefix: str = "https://tdw-private.s3.amazonaws.com/"
+        downloader = AssetBundleDownloader(max_workers=max_workers, verify_size=verify_size)
+        failures: Dict[Path, Exception] = dict()
         validated_s3: bool = False
         for asset_bundles, librarian_type, filename in zip([models, scenes, materials, hdri_skyboxes, robots,
                                                             humanoids, humanoid_animations],
@@ -821,7 +827,6 @@ class TDWUtils:
                 num_total += len(asset_bundles[remote_librarian_key])
             if num_total == 0:
                 continue
-            pbar = tqdm(total=num_total)
             librarian_path = output_directory.joinpath(filename + ".json")
             # Create the library.
             if not librarian_path.exists():
@@ -832,45 +837,55 @@ class TDWUtils:
             asset_bundles_directory = output_directory.joinpath(filename)
             if not asset_bundles_directory.exists():
                 asset_bundles_directory.mkdir(parents=True)
-            # Load each remote librarian.
-            for remote_librarian_key in asset_bundles:
-                remote_librarian = librarian_type(remote_librarian_key)
-                # Download each asset bundle.
-                for asset_bundle_name in asset_bundles[remote_librarian_key]:
-                    remote_record = remote_librarian.get_record(asset_bundle_name)
-                    asset_bundle_path = asset_bundles_directory.joinpath(asset_bundle_name)
-                    # This asset bundle already exists.
-                    if asset_bundle_path.exists():
-                        pbar.update(1)
-                        continue
-                    pbar.set_description(asset_bundle_name)
-                    url = remote_record.urls[system()]
-                    if private_bucket_prefix in url:
+            # Write the local library once, after every asset bundle has been downloaded.
+            with local_librarian.batch():
+                downloads: List[Tuple[str, Path, int]] = list()
+                # Key = The path to the asset bundle. Value = The remote record.
+                remote_records = dict()
+                # Load each remote librarian.
+                for remote_librarian_key in asset_bundles:
+                    remote_librarian = librarian_type(remote_librarian_key)
+                    # Get each asset bundle that needs to be downloaded.
+                    for asset_bundle_name in asset_bundles[remote_librarian_key]:
+                        remote_record = remote_librarian.get_record(asset_bundle_name)
+                        asset_bundle_path = asset_bundles_directory.joinpath(asset_bundle_name)
+                        # This asset bundle already exists.
+                        if asset_bundle_path.exists():
+                            # Add the record if a previous download stopped before the library was written.
+                            if local_librarian.get_record(asset_bundle_name) is None:
+                                remote_record.urls = {system(): "file:///" + str(asset_bundle_path.resolve()).replace("\\", "/")}
+                                local_librarian.add_or_update_record(remote_record, overwrite=False, write=True)
+                            continue
+                        url = remote_record.urls[system()]
                         # Make sure we can download from tdw-private.
-                        if not validated_s3:
+                        if AssetBundleDownloader.PRIVATE_BUCKET_PREFIX in url and not validated_s3:
                             if not TDWUtils.validate_amazon_s3():
                                 print(asset_bundle_name, remote_librarian_key)
+                                downloader.close()
                                 return
                             validated_s3 = True
-                        s3_key = url.split(private_bucket_prefix)[1]
-                        session = boto3.Session(profile_name="tdw")
-                        s3 = session.resource("s3")
-                        resp = s3.meta.client.get_object(Bucket='tdw-private', Key=s3_key)
-                        status_code = resp["ResponseMetadata"]["HTTPStatusCode"]
-                        assert status_code == 200, (url, status_code)
-                        # Save the asset bundle.
-                        asset_bundle_path.write_bytes(resp["Body"].read())
-                    else:
-                        resp = get(url)
-                        assert resp.status_code == 200, (url, resp.status_code)
-                        # Save the asset bundle.
-                        asset_bundle_path.write_bytes(resp.content)
-                    pbar.update(1)
-                    # Update and write the record.
+                        # Only model records have asset bundle sizes.
+                        if isinstance(remote_record, ModelRecord):
+                            size = remote_record.asset_bundle_sizes.get(system(), -1)
+                        else:
+                            size = -1
+                        downloads.append((url, asset_bundle_path, size))
+                        remote_records[asset_bundle_path] = remote_record
+                # Download the asset bundles.
+                librarian_failures = downloader.download_all(downloads=downloads)
+                failures.update(librarian_failures)
+                # Update and write the records.
+                for asset_bundle_path in remote_records:
+                    if asset_bundle_path in librarian_failures:
+                        continue
+                    remote_record = remote_records[asset_bundle_path]
                     remote_record.urls = {system(): "file:///" + str(asset_bundle_path.resolve()).replace("\\", "/")}
-                    local_record = local_librarian.get_record(asset_bundle_name)
+                    local_record = local_librarian.get_record(remote_record.name)
                     local_librarian.add_or_update_record(remote_record, overwrite=local_record is not None, write=True)
-            pbar.close()
+        downloader.close()
+        if len(failures) > 0:
+            raise Exception("Failed to download asset bundles:\n" +
+                            "\n".join([f"{path}: {exception}" for path, exception in failures.items()]))
 
     @staticmethod
     def set_default_libraries(model_library: Union[str, Path] = None, scene_library: Union[str, Path] = None,